@@ -1,10 +1,13 @@
 from django.contrib import admin
 from django.contrib.auth import get_user_model
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from django.template.loader import render_to_string
+from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
 
 from project.utils import admin as admin_utils
+from search.admin import SearchIndexMixin
+
+from . import avatars
 
 User = get_user_model()
 
@@ -19,7 +22,10 @@ class UserPhotoFilter(admin.SimpleListFilter):
         return (("yes", _("Tak")), ("no", _("Nie")))
 
     def queryset(self, request, queryset):
-        return queryset.filter(photo__isnull=self.value() == "no")
+        if self.value() == "yes":
+            return queryset.filter(photo__isnull=False).exclude(photo="")
+        if self.value() == "no":
+            return queryset.filter(Q(photo__isnull=True) | Q(photo=""))
 
 
 class UserEmployeeFilter(UserPhotoFilter):
@@ -29,17 +35,12 @@ class UserEmployeeFilter(UserPhotoFilter):
     parameter_name = "has_employee"
 
     def queryset(self, request, queryset):
-        users = list(
-            filter(
-                lambda user: user.has_employee() == ("no" == "yes"),
-                User.objects.all(),
-            )
-        )
-        return queryset.filter(id__in=[user.id for user in users])
+        if self.value() in ("yes", "no"):
+            return queryset.filter(employee__isnull=self.value() == "no")
 
 
 @admin.register(User)
-class UserAdmin(BaseUserAdmin, admin_utils.ModelAdmin):
+class UserAdmin(SearchIndexMixin, BaseUserAdmin, admin_utils.ModelAdmin):
     """A class to represent admin options for the User model."""
 
     model_accusative = _("użytkownika")
@@ -81,15 +82,18 @@ class UserAdmin(BaseUserAdmin, admin_utils.ModelAdmin):
     )
     list_display_links = ("id", "username", "icon_tag")
     ordering = ("id",)
+    keyset_pagination = True
+    estimated_count = True
+
+    def get_changelist_instance(self, request):
+        changelist = super().get_changelist_instance(request)
+        avatars.prefetch_avatars(changelist.result_list)
+        return changelist
 
     @admin.display(description=_("Zdjęcie"), ordering="id")
     def icon_tag(self, obj):
+        if obj.photo and not obj.is_photo_ready():
+            return obj.get_photo_status_display()
         if obj.icon:
-            attrs = {
-                "src": obj.icon.url,
-                "alt": f'{_("Zdjęcie użytkownika")}: {obj.get_full_name()}',
-            }
-            return render_to_string(
-                template_name="snippets/tag.html",
-                context={"name": "img", "attrs": attrs},
-            )
+            _, html = avatars.get_avatar(obj)
+            return html
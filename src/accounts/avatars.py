@@ -0,0 +1,160 @@
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.safestring import mark_safe
+from django.utils.translation import gettext_lazy as _
+
+from project.utils import render_tag
+from project.utils.cache import make_key
+
+from . import utils
+
+AVATAR_KEY_PREFIX = "avatar"
+AVATAR_TIMEOUT = 60 * 60 * 24
+
+# Maximum number of the avatars held by the in-process cache
+
+AVATAR_CACHE_SIZE = 4096
+
+# Fields of the users the avatars are rendered from
+
+AVATAR_FIELDS = frozenset({"username", "first_name", "last_name", "icon", "photo_hash"})
+
+
+class AvatarCache:
+    """A class to represent the in-process LRU cache of the users' avatars."""
+
+    def __init__(self, maxsize=AVATAR_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+avatar_cache = AvatarCache()
+
+
+def _get_key(pk):
+    return make_key(AVATAR_KEY_PREFIX, pk)
+
+
+def _get_signature(user):
+    return user.icon.name, user.photo_hash, user.get_full_name()
+
+
+def render_avatar(user):
+    """Return the `img` tag (or the `picture` one, with the derivatives) of the icon."""
+    attrs = {
+        "src": user.icon.url,
+        "alt": f'{_("Zdjęcie użytkownika")}: {user.get_full_name()}',
+    }
+    if not user.photo_hash:
+        return render_tag("img", attrs=attrs)
+
+    # Let the browser choose the smallest adequate derivative of the photo
+    sizes = f"{utils.MEDIA_ICONS_SIZE[0]}px"
+    attrs.update({"srcset": user.get_photo_srcset(), "sizes": sizes})
+    sources = [
+        render_tag(
+            "source",
+            attrs={
+                "type": f"image/{format.lower()}",
+                "srcset": user.get_photo_srcset(format),
+                "sizes": sizes,
+            },
+        )
+        for format in settings.ACCOUNTS_PHOTO_FORMATS[1:]
+    ]
+    return render_tag(
+        "picture",
+        content=mark_safe("".join(sources) + render_tag("img", attrs=attrs)),
+        closing_tag=True,
+    )
+
+
+def get_avatars(users):
+    """
+    Return the {user PK: (icon URL, HTML)} dictionary of the avatars of the users.
+
+    The avatars (of the users with icons) are looked up in the in-process cache
+    first, then in the Django cache (by a single query), and rendered only if
+    missing from both, so that neither the storage of the icons nor the template
+    engine is queried per user. The cached avatars are valid for the icons,
+    photos and names of the users they were rendered for only, so that the stale
+    copies left in the caches of the other processes are never served, and are
+    removed by the changes of the users (see `invalidate_avatar`).
+    """
+    users = [user for user in users if user.icon]
+
+    avatars, missing = {}, {}
+    for user in users:
+        key = _get_key(user.pk)
+        value = avatar_cache.get(key)
+        if value is not None and value[0] == _get_signature(user):
+            avatars[user.pk] = value[1:]
+        else:
+            missing[key] = user
+
+    if missing:
+        cached = cache.get_many(missing)
+        rendered = {}
+        for key, user in missing.items():
+            value = cached.get(key)
+            if value is None or value[0] != _get_signature(user):
+                value = rendered[key] = (
+                    _get_signature(user),
+                    user.icon.url,
+                    render_avatar(user),
+                )
+            avatar_cache.set(key, value)
+            avatars[user.pk] = value[1:]
+
+        if rendered:
+            cache.set_many(rendered, AVATAR_TIMEOUT)
+
+    return avatars
+
+
+def prefetch_avatars(users):
+    """Attach the avatars of the users to them (see `get_avatar`)."""
+    users = list(users)
+    avatars = get_avatars(users)
+    for user in users:
+        user._avatar = avatars.get(user.pk)
+
+
+def get_avatar(user):
+    """Return the (icon URL, HTML) pair of the avatar of the user (None if no icon)."""
+    if "_avatar" not in user.__dict__:
+        prefetch_avatars([user])
+    return user._avatar
+
+
+def invalidate_avatar(user):
+    """Remove the avatar of the user from the caches."""
+    key = _get_key(user.pk)
+    avatar_cache.delete(key)
+    cache.delete(key)
@@ -0,0 +1,110 @@
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from accounts import tasks
+from accounts.models import User
+
+
+def process_profile_photo(user_id):
+    """Process the user's photo in the pool worker and release its connections."""
+    try:
+        return tasks.process_profile_photo(user_id)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    """A command to run the worker processing the users' profile photos."""
+
+    help = "Process the users' profile photos pending processing."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.ACCOUNTS_PHOTO_WORKERS,
+            help=(
+                "Number of the photos processed concurrently "
+                "(0 to process them one by one in the main thread)."
+            ),
+        )
+        parser.add_argument(
+            "--processes",
+            action="store_true",
+            help="Use the pool of processes instead of the pool of threads.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Time (in seconds) between the checks for the pending photos.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Process the photos pending at the moment and exit.",
+        )
+        parser.add_argument(
+            "--retry-failed",
+            action="store_true",
+            help="Mark the photos whose processing has failed as pending first.",
+        )
+        parser.add_argument(
+            "--processing-timeout",
+            type=int,
+            default=settings.ACCOUNTS_PHOTO_PROCESSING_TIMEOUT,
+            help=(
+                "Time (in seconds) after which the photos still processing are "
+                "considered abandoned by their workers and processed again."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        if options["retry_failed"]:
+            User.objects.filter(photo_status=User.PhotoStatusChoices.FAILED).update(
+                photo_status=User.PhotoStatusChoices.PENDING
+            )
+
+        if not options["workers"]:
+            executor = nullcontext()
+            process_all = map
+            process = tasks.process_profile_photo
+        else:
+            if options["processes"]:
+                # The connections must not be shared with the forked processes
+                connections.close_all()
+                executor = ProcessPoolExecutor(max_workers=options["workers"])
+            else:
+                executor = ThreadPoolExecutor(max_workers=options["workers"])
+            process_all = executor.map
+            process = process_profile_photo
+
+        with executor:
+            while True:
+                released = tasks.release_abandoned_profile_photos(
+                    options["processing_timeout"]
+                )
+                if released:
+                    self.stdout.write(f"Released {released} abandoned photo(s).")
+
+                user_ids = list(
+                    User.objects.filter(
+                        photo_status=User.PhotoStatusChoices.PENDING,
+                    ).values_list("pk", flat=True)
+                )
+                if options["processes"]:
+                    connections.close_all()
+
+                processed = sum(process_all(process, user_ids))
+                if processed:
+                    self.stdout.write(f"Processed {processed} photo(s).")
+
+                if options["once"]:
+                    break
+                if not user_ids:
+                    time.sleep(options["interval"])
@@ -19,6 +19,14 @@ class User(AbstractUser):
         WOMAN = "W", _("kobieta")
         MAN = "M", _("mężczyzna")
 
+    class PhotoStatusChoices(models.TextChoices):
+        """A class to represent choices for the photo_status field."""
+
+        PENDING = "P", _("oczekuje na przetworzenie")
+        PROCESSING = "T", _("w trakcie przetwarzania")
+        READY = "G", _("gotowe")
+        FAILED = "B", _("błąd przetwarzania")
+
     sex = models.CharField(
         _("płeć"),
         max_length=1,
@@ -36,6 +44,8 @@ class User(AbstractUser):
     photo = models.ImageField(
         _("zdjęcie profilowe"),
         upload_to=utils.photo_upload_path,
+        storage=utils.get_photo_storage,
+        validators=[utils.validate_photo_pixels],
         blank=True,
         null=True,
         help_text=_(
@@ -47,6 +57,27 @@ class User(AbstractUser):
     icon = models.ImageField(
         _("ikona"),
         upload_to=utils.icon_upload_path,
+        storage=utils.get_photo_storage,
+        blank=True,
+        null=True,
+        editable=False,
+    )
+    photo_hash = models.CharField(
+        _("skrót zdjęcia"),
+        max_length=64,
+        blank=True,
+        editable=False,
+        db_index=True,
+    )
+    photo_status = models.CharField(
+        _("stan zdjęcia"),
+        max_length=1,
+        choices=PhotoStatusChoices.choices,
+        default=PhotoStatusChoices.READY,
+        editable=False,
+    )
+    photo_claimed_at = models.DateTimeField(
+        _("czas podjęcia przetwarzania zdjęcia"),
         blank=True,
         null=True,
         editable=False,
@@ -84,5 +115,30 @@ class User(AbstractUser):
     def has_photo(self):
         return self.photo is not None
 
+    def is_photo_ready(self):
+        return self.photo_status == self.PhotoStatusChoices.READY
+
+    def get_photo_srcset(self, format=None):
+        return utils.get_photo_srcset(self, format)
+
     def has_employee(self):
         return hasattr(self, "employee")
+
+
+class PhotoDerivatives(models.Model):
+    """
+    A class to represent the PhotoDerivatives objects.
+
+    The row of the hash of the photo is locked by the creation and the deletion
+    of its derivatives (shared by the users who uploaded the same photo), see
+    `utils.lock_photo_derivatives`.
+    """
+
+    photo_hash = models.CharField(_("skrót zdjęcia"), max_length=64, unique=True)
+
+    class Meta:
+        verbose_name = _("pochodne zdjęcia")
+        verbose_name_plural = _("pochodne zdjęć")
+
+    def __str__(self):
+        return self.photo_hash
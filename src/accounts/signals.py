@@ -1,62 +1,62 @@
-from io import BytesIO
-
-from django.core.files.base import ContentFile
+from django.db import transaction
 from django.db.models import signals
 from django.dispatch import receiver
 
-from PIL import Image
-
-from . import utils
+from . import avatars, tasks, utils
 from .models import User
 
 
-@receiver(signals.post_save, sender=User)
-def crop_and_resize_profile_photo(sender, instance, **kwargs):
-    """Post-process the photo submitted by the user."""
-    if not instance.photo:
-        return None
-
-    with Image.open(instance.photo.path) as photo:
-        # Determine the cropping area coordinates depending on the photo shape
-        width, height = photo.size
-        if height > width:  # portrait
-            box = (0, int((height - width) / 2), width, int((height + width) / 2))
-        elif height < width:  # landscape
-            box = (int((width - height) / 2), 0, int((width + height) / 2), height)
-        else:
-            box = (0, 0, width, height)
-
-        # Crop & resize, then overwrite the original photo
-        new_photo = photo.crop(box=box).resize(size=utils.MEDIA_PHOTOS_SIZE)
-        new_photo.save(instance.photo.path)
+@receiver(signals.pre_save, sender=User)
+def mark_profile_photo_pending(sender, instance, **kwargs):
+    """Mark the photo just submitted by the user as pending processing."""
+    if instance.photo and not instance.photo._committed:
+        instance.photo_status = User.PhotoStatusChoices.PENDING
 
 
 @receiver(signals.post_save, sender=User)
-def create_profile_icon(sender, instance, **kwargs):
-    """Create and save the icon of the user."""
+def process_profile_photo(sender, instance, **kwargs):
+    """Post-process the photo submitted by the user and create their icon."""
     if instance.photo:
-        if instance.icon:
-            return None
-
-        with Image.open(instance.photo.path) as photo:
-            icon = photo.resize(size=utils.MEDIA_ICONS_SIZE)
-
-            with BytesIO() as icon_file:
-                icon.save(icon_file, format=photo.format)
-                icon_file.seek(0)
-
-                if not instance.icon:
-                    instance.icon.save(
-                        instance.photo.name,  # only to retrieve the file extension
-                        ContentFile(icon_file.read()),
-                        save=True,
-                    )
-                else:
-                    # Note that instance has been just saved within post_save
-                    # signal. Therefore, do nothing if the icon field has been
-                    # already populated. Otherwise, RecursionError is raised.
-                    pass
-    else:
-        # If there is no photo but icon, remove the icon file as well
-        if instance.icon:
-            instance.icon.delete(save=True)
+        if instance.photo_status == User.PhotoStatusChoices.PENDING:
+            tasks.enqueue_profile_photo(instance)
+    elif instance.icon or instance.photo_hash:
+        # If there is no photo but icon, remove the icon (and the derivatives of
+        # the photo, unless they are shared with other users) as well
+        storage, photo_hash = instance.icon.storage, instance.photo_hash
+        if instance.icon and instance.icon.name.startswith(utils.MEDIA_ICONS_DIR):
+            storage.delete(instance.icon.name)
+
+        instance.icon = None
+        instance.photo_hash = ""
+        instance.save(update_fields=["icon", "photo_hash"])
+
+        if photo_hash:
+            utils.delete_unused_photo_derivatives(photo_hash, storage)
+
+
+@receiver(signals.post_delete, sender=User)
+def delete_profile_photo(sender, instance, **kwargs):
+    """Remove the files of the photo of the user deleted (unless shared)."""
+    storage, photo_hash = instance.photo.storage, instance.photo_hash
+    names = [
+        field.name
+        for field in (instance.photo, instance.icon)
+        if field and not field.name.startswith(utils.MEDIA_DERIVATIVES_DIR)
+    ]
+
+    def delete_files():
+        for name in names:
+            storage.delete(name)
+        if photo_hash:
+            utils.delete_unused_photo_derivatives(photo_hash, storage)
+
+    transaction.on_commit(delete_files)
+
+
+@receiver(signals.post_save, sender=User)
+@receiver(signals.post_delete, sender=User)
+def invalidate_avatar(sender, instance, update_fields=None, **kwargs):
+    """Remove the avatar of the user saved or deleted from the caches."""
+    # The updates of the other fields (e.g. `last_login`) keep the avatar
+    if update_fields is None or avatars.AVATAR_FIELDS & update_fields:
+        avatars.invalidate_avatar(instance)
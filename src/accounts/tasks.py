@@ -0,0 +1,106 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import utils
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+# Modes of the profile photos processing
+
+SYNC = "sync"  # within the request
+THREAD = "thread"  # in the background thread pool of the web server process
+QUEUE = "queue"  # by the `process_photos` command worker
+
+_executor = None
+
+
+def get_executor():
+    """Return the thread pool processing the photos in the background."""
+    global _executor
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.ACCOUNTS_PHOTO_WORKERS,
+            thread_name_prefix="photos",
+        )
+    return _executor
+
+
+def process_profile_photo(user_id, user=None):
+    """
+    Create the derivatives of the photo of the user, including their icon.
+
+    Return True if the photo has been processed by the call, i.e. if the user's
+    photo was pending processing and no other worker has claimed it. If the
+    user instance is given, it is updated in place instead of being fetched.
+    """
+    claimed = User.objects.filter(
+        pk=user_id,
+        photo_status=User.PhotoStatusChoices.PENDING,
+    ).update(
+        photo_status=User.PhotoStatusChoices.PROCESSING,
+        photo_claimed_at=timezone.now(),
+    )
+    if not claimed:
+        return False
+
+    if user is None:
+        user = User.objects.get(pk=user_id)
+    try:
+        utils.create_photo_derivatives(user)
+    except Exception:
+        logger.exception("Processing of the photo of the user %s failed.", user_id)
+        user.photo_status = User.PhotoStatusChoices.FAILED
+    else:
+        user.photo_status = User.PhotoStatusChoices.READY
+    user.save(update_fields=["photo", "icon", "photo_hash", "photo_status"])
+
+    return True
+
+
+def release_abandoned_profile_photos(timeout=None):
+    """
+    Mark the photos processing for longer than the timeout as pending again.
+
+    The photos claimed by the workers which have not finished them (e.g. killed
+    by the restart) are processed again. Return the number of the photos.
+    """
+    if timeout is None:
+        timeout = settings.ACCOUNTS_PHOTO_PROCESSING_TIMEOUT
+
+    return (
+        User.objects.filter(photo_status=User.PhotoStatusChoices.PROCESSING)
+        .filter(
+            Q(photo_claimed_at__isnull=True)
+            | Q(photo_claimed_at__lt=timezone.now() - timedelta(seconds=timeout))
+        )
+        .update(photo_status=User.PhotoStatusChoices.PENDING)
+    )
+
+
+def _process_profile_photo_in_thread(user_id):
+    try:
+        process_profile_photo(user_id)
+    finally:
+        connections.close_all()
+
+
+def enqueue_profile_photo(user):
+    """Schedule the processing of the user's photo according to the settings."""
+    mode = settings.ACCOUNTS_PHOTO_PROCESSING
+
+    if mode == SYNC:
+        process_profile_photo(user.pk, user=user)
+    elif mode == THREAD:
+        transaction.on_commit(
+            lambda: get_executor().submit(_process_profile_photo_in_thread, user.pk)
+        )
+    elif mode != QUEUE:
+        raise ValueError(f"Unknown photo processing mode: '{mode}'.")
@@ -0,0 +1,519 @@
+import functools
+import multiprocessing
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.storage import FileSystemStorage, Storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import signals
+from django.test import SimpleTestCase, TestCase, override_settings, tag
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from employees.models import Employee
+from project.test_runner import BENCHMARK_TAG
+
+from PIL import Image
+
+from . import avatars, utils
+
+User = get_user_model()
+
+
+class UserAdminFiltersTests(TestCase):
+    """Tests of the User admin changelist filters."""
+
+    USERS_COUNT = 60
+    EMPLOYEES_COUNT = 20
+    QUERIES_BUDGET = 10
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "pw")
+        User.objects.bulk_create(
+            [
+                User(
+                    username=f"user{i}",
+                    slug=f"user{i}",
+                    photo=("accounts/photos/photo.jpg", "", None)[i % 3],
+                )
+                for i in range(cls.USERS_COUNT)
+            ],
+            batch_size=1000,
+        )
+        Employee.objects.bulk_create(
+            [
+                Employee(user=user)
+                for user in User.objects.order_by("pk")[: cls.EMPLOYEES_COUNT]
+            ]
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+        self.client.get(reverse("admin:accounts_user_changelist"))  # warm up
+
+    def get_changelist(self, **params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                reverse("admin:accounts_user_changelist"), params
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(len(context), self.QUERIES_BUDGET)
+        return response.context["cl"]
+
+    def test_employee_filter(self):
+        self.assertEqual(
+            self.get_changelist(has_employee="yes").result_count, self.EMPLOYEES_COUNT
+        )
+        self.assertEqual(
+            self.get_changelist(has_employee="no").result_count,
+            self.USERS_COUNT + 1 - self.EMPLOYEES_COUNT,
+        )
+
+    def test_photo_filter(self):
+        with_photo = User.objects.filter(photo="accounts/photos/photo.jpg").count()
+
+        self.assertEqual(self.get_changelist(has_photo="yes").result_count, with_photo)
+        self.assertEqual(
+            self.get_changelist(has_photo="no").result_count,
+            self.USERS_COUNT + 1 - with_photo,
+        )
+
+    def test_no_filter(self):
+        self.assertEqual(self.get_changelist().result_count, self.USERS_COUNT + 1)
+
+
+@tag(BENCHMARK_TAG)
+class UserAdminFiltersBenchmarkTests(UserAdminFiltersTests):
+    """
+    Tests of the User admin changelist filters on the large number of users.
+
+    Run by `manage.py test --tag benchmark` only.
+    """
+
+    USERS_COUNT = 50_000
+    EMPLOYEES_COUNT = 100
+
+    def test_no_per_row_work(self):
+        instances = []
+
+        def receiver(sender, instance, **kwargs):
+            instances.append(instance)
+
+        signals.post_init.connect(receiver, sender=User)
+        self.addCleanup(signals.post_init.disconnect, receiver, sender=User)
+
+        # Only the users of the page displayed are loaded, whatever the filter
+        for params in ({}, {"has_photo": "no"}, {"has_employee": "no"}):
+            with self.subTest(**params):
+                instances.clear()
+                cl = self.get_changelist(**params)
+                self.assertLessEqual(len(instances), cl.list_per_page + 1)
+
+
+def make_image_file(
+    size=(800, 600),
+    format="JPEG",
+    name="photo.jpg",
+    color=(200, 100, 50),
+):
+    """Return the uploaded image file of the given size and format."""
+    with BytesIO() as image_file:
+        Image.new("RGB", size, color=color).save(image_file, format=format)
+        return SimpleUploadedFile(name, image_file.getvalue())
+
+
+class RemoteStorage(Storage):
+    """
+    A class to represent the fake of the remote storage (e.g. the S3 one).
+
+    The files are kept in the temporary directory, but, like in the remote
+    storages, they have no local paths (`path` raises NotImplementedError).
+    """
+
+    def __init__(self):
+        self.local_storage = FileSystemStorage()
+
+    def _open(self, name, mode="rb"):
+        return self.local_storage._open(name, mode)
+
+    def _save(self, name, content):
+        return self.local_storage._save(name, content)
+
+    def delete(self, name):
+        self.local_storage.delete(name)
+
+    def exists(self, name):
+        return self.local_storage.exists(name)
+
+    def listdir(self, path):
+        return self.local_storage.listdir(path)
+
+    def size(self, name):
+        return self.local_storage.size(name)
+
+    def url(self, name):
+        return self.local_storage.url(name)
+
+
+class PhotoProcessingTests(TestCase):
+    """Tests of the processing of the users' profile photos."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(
+            MEDIA_ROOT=media_root,
+            ACCOUNTS_PHOTO_STORAGE="accounts.tests.RemoteStorage",
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user("user")
+
+    def upload_photo(self, user=None, **kwargs):
+        user = user or self.user
+        user.photo = make_image_file(**kwargs)
+        user.save()
+
+    def assertPhotoProcessed(self, user):
+        self.assertEqual(user.photo_status, User.PhotoStatusChoices.READY)
+        self.assertIsInstance(user.photo.storage._wrapped, RemoteStorage)
+        for field, size in (
+            (user.photo, utils.MEDIA_PHOTOS_SIZE),
+            (user.icon, utils.MEDIA_ICONS_SIZE),
+        ):
+            with field.storage.open(field.name) as file, Image.open(file) as image:
+                self.assertEqual(image.size, size)
+
+    @override_settings(ACCOUNTS_PHOTO_PROCESSING="sync")
+    def test_sync_processing(self):
+        self.upload_photo()
+
+        self.assertPhotoProcessed(self.user)
+        self.user.refresh_from_db()
+        self.assertPhotoProcessed(self.user)
+
+    @override_settings(ACCOUNTS_PHOTO_PROCESSING="sync")
+    def test_processing_spooled_to_disk(self):
+        with mock.patch.object(utils, "PHOTO_SPOOL_MAX_SIZE", 1024):
+            self.upload_photo(size=(1200, 900))
+
+        self.assertPhotoProcessed(self.user)
+
+    @override_settings(ACCOUNTS_PHOTO_PROCESSING="sync")
+    def test_new_photo_replaces_icon(self):
+        self.upload_photo()
+        old_icon_name = self.user.icon.name
+
+        self.upload_photo(size=(300, 600))
+
+        self.assertNotEqual(self.user.icon.name, old_icon_name)
+        self.assertFalse(self.user.icon.storage.exists(old_icon_name))
+
+    @override_settings(ACCOUNTS_PHOTO_PROCESSING="queue")
+    def test_queue_processing(self):
+        self.upload_photo()
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.photo_status, User.PhotoStatusChoices.PENDING)
+        self.assertFalse(self.user.icon)
+
+        call_command("process_photos", once=True, workers=0, stdout=StringIO())
+
+        self.user.refresh_from_db()
+        self.assertPhotoProcessed(self.user)
+
+    @override_settings(ACCOUNTS_PHOTO_PROCESSING="queue")
+    def test_abandoned_processing(self):
+        self.upload_photo()
+
+        # The worker claiming the photo dies before finishing it
+        User.objects.filter(pk=self.user.pk).update(
+            photo_status=User.PhotoStatusChoices.PROCESSING,
+            photo_claimed_at=timezone.now(),
+        )
+        call_command("process_photos", once=True, workers=0, stdout=StringIO())
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.photo_status, User.PhotoStatusChoices.PROCESSING)
+
+        call_command(
+            "process_photos",
+            once=True,
+            workers=0,
+            processing_timeout=0,
+            stdout=StringIO(),
+        )
+        self.user.refresh_from_db()
+        self.assertPhotoProcessed(self.user)
+
+    @override_settings(ACCOUNTS_PHOTO_PROCESSING="sync")
+    def test_photo_removal_removes_icon(self):
+        self.upload_photo()
+
+        self.user.photo = None
+        self.user.save()
+
+        self.assertFalse(self.user.icon)
+
+    @override_settings(ACCOUNTS_PHOTO_PROCESSING="sync")
+    def test_derivatives(self):
+        self.upload_photo(size=(600, 900), format="PNG", name="photo.png")
+
+        storage = self.user.photo.storage
+        for size in settings.ACCOUNTS_PHOTO_SIZES:
+            for format in settings.ACCOUNTS_PHOTO_FORMATS:
+                name = utils.derivative_path(self.user.photo_hash, size, format)
+                with storage.open(name) as file, Image.open(file) as image:
+                    self.assertEqual(image.format, format)
+                    self.assertEqual(image.size, (size, size))
+
+        srcset = self.user.get_photo_srcset("WEBP")
+        self.assertEqual(srcset.count(".webp"), len(settings.ACCOUNTS_PHOTO_SIZES))
+        self.assertIn(f"{min(settings.ACCOUNTS_PHOTO_SIZES)}w", srcset)
+
+    @override_settings(ACCOUNTS_PHOTO_PROCESSING="sync")
+    def test_identical_photos_share_derivatives(self):
+        other_user = User.objects.create_user("other")
+        self.upload_photo()
+        self.upload_photo(user=other_user)
+
+        self.assertEqual(self.user.photo.name, other_user.photo.name)
+        self.assertEqual(self.user.icon.name, other_user.icon.name)
+        storage = self.user.photo.storage
+        self.assertEqual(storage.listdir(utils.MEDIA_PHOTOS_DIR)[1], [])
+
+        # The derivatives are deleted once no user refers to them
+        icon_name = self.user.icon.name
+        self.user.photo = None
+        self.user.save()
+        self.assertTrue(other_user.icon.storage.exists(icon_name))
+
+        other_user.photo = None
+        other_user.save()
+        self.assertFalse(other_user.icon.storage.exists(icon_name))
+
+    @override_settings(ACCOUNTS_PHOTO_PROCESSING="sync")
+    def test_deleted_users_release_derivatives(self):
+        other_user = User.objects.create_user("other")
+        self.upload_photo()
+        self.upload_photo(user=other_user)
+        icon_name = self.user.icon.name
+        storage = self.user.icon.storage
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        self.assertTrue(storage.exists(icon_name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other_user.delete()
+        self.assertFalse(storage.exists(icon_name))
+
+    @override_settings(ACCOUNTS_PHOTO_PROCESSING="queue")
+    def test_derivatives_hash_recorded(self):
+        # Another user dropping the same photo sees the hash before the save
+        other_user = User.objects.create_user("other")
+        self.upload_photo()
+        self.upload_photo(user=other_user)
+        utils.create_photo_derivatives(self.user)
+        utils.create_photo_derivatives(other_user)
+        storage = self.user.icon.storage
+
+        utils.delete_unused_photo_derivatives(
+            other_user.photo_hash, storage, exclude=other_user
+        )
+
+        self.assertTrue(storage.exists(self.user.icon.name))
+        self.assertEqual(
+            User.objects.get(pk=self.user.pk).photo_hash, self.user.photo_hash
+        )
+
+    def test_derivative_saved_once(self):
+        storage = utils.get_photo_storage()
+        name = utils.derivative_path("0" * 64, utils.MEDIA_ICONS_SIZE, "PNG")
+        image = Image.new("RGB", utils.MEDIA_ICONS_SIZE)
+
+        utils.save_derivative(storage, name, image, "PNG")
+        utils.save_derivative(storage, name, image, "PNG")
+
+        directory, basename = name.rsplit("/", 1)
+        self.assertEqual(storage.listdir(directory)[1], [basename])
+
+    @override_settings(ACCOUNTS_PHOTO_PROCESSING="sync")
+    def test_admin_icon_srcset(self):
+        self.upload_photo()
+        admin = User.objects.create_superuser("admin", "admin@example.com", "pw")
+        self.client.force_login(admin)
+
+        response = self.client.get(reverse("admin:accounts_user_changelist"))
+
+        self.assertContains(response, self.user.get_photo_srcset("WEBP"))
+        self.assertContains(response, 'type="image/webp"')
+
+    @override_settings(ACCOUNTS_PHOTO_PROCESSING="sync")
+    def test_admin_avatar_cache(self):
+        self.upload_photo()
+        admin = User.objects.create_superuser("admin", "admin@example.com", "pw")
+        self.client.force_login(admin)
+        url = reverse("admin:accounts_user_changelist")
+
+        with mock.patch.object(
+            FileSystemStorage,
+            "url",
+            autospec=True,
+            side_effect=FileSystemStorage.url,
+        ) as storage_url:
+            self.client.get(url)
+            self.assertGreater(count_media_urls(storage_url), 0)
+
+            # The URLs of the media are not built once the avatars are cached
+            storage_url.reset_mock()
+            avatars.avatar_cache.clear()
+            response = self.client.get(url)
+            self.assertEqual(count_media_urls(storage_url), 0)
+            self.assertContains(response, self.user.get_photo_srcset("WEBP"))
+
+        # The change of the user invalidates their avatar
+        self.user.first_name = "Anna"
+        self.user.save()
+        response = self.client.get(url)
+        self.assertContains(response, "Zdjęcie użytkownika: Anna")
+
+        # The updates of the other fields keep the avatar in the caches
+        key = avatars._get_key(self.user.pk)
+        self.user.save(update_fields=["last_login"])
+        self.assertIsNotNone(avatars.avatar_cache.get(key))
+
+        # The avatars changed by the other processes are not served stale
+        User.objects.filter(pk=self.user.pk).update(first_name="Ewa")
+        cache.delete(key)
+        response = self.client.get(url)
+        self.assertContains(response, "Zdjęcie użytkownika: Ewa")
+
+    def test_avatar_cache_eviction(self):
+        cache = avatars.AvatarCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual((cache.get("a"), cache.get("b"), cache.get("c")), (1, None, 3))
+
+
+def count_media_urls(storage_url):
+    """Return the number of the calls of the mocked `url` of the users' media."""
+    return sum(
+        1 for call in storage_url.call_args_list if call.args[1].startswith("accounts")
+    )
+
+
+def measure_in_subprocess(function, *args):
+    """Return the time (s) and the peak memory growth (MB) of the function call."""
+
+    def target(connection):
+        import resource
+
+        peak_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start = time.perf_counter()
+        function(*args)
+        duration = time.perf_counter() - start
+        peak_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        connection.send((duration, (peak_after - peak_before) / 1024))
+
+    context = multiprocessing.get_context("fork")
+    parent_connection, child_connection = context.Pipe()
+    process = context.Process(target=target, args=(child_connection,))
+    process.start()
+    result = parent_connection.recv()
+    process.join()
+
+    return result
+
+
+@functools.lru_cache(maxsize=None)
+def make_large_photo(size):
+    """Return the data of the JPEG photo of the given size (built once)."""
+    with BytesIO() as image_file:
+        Image.linear_gradient("L").resize(size).convert("RGB").save(
+            image_file, format="JPEG", quality=90
+        )
+        return image_file.getvalue()
+
+
+def decode_full_resolution(data, size):
+    """Decode the photo the way it was done before the draft mode was used."""
+    with Image.open(BytesIO(data)) as photo:
+        photo.crop(utils.get_crop_box(*photo.size)).resize(size=(size, size))
+
+
+def decode_reduced(data, size):
+    """Decode the photo by the draft mode."""
+    with Image.open(BytesIO(data)) as photo:
+        utils.decode_square_photo(photo, size)
+
+
+class LargePhotoTests(SimpleTestCase):
+    """
+    Tests of the decoding of large photos.
+
+    The benchmark of the latency and the peak memory on the 12 and 24 MP photos
+    (forking a process per photo) is run by `manage.py test --tag benchmark`
+    only.
+    """
+
+    SIZES = ((1600, 1200), (1200, 1600))
+    BENCHMARK_SIZES = ((4000, 3000), (6000, 4000), (4000, 6000))  # 12, 24 MP (x 2)
+    MAX_PEAK_MEMORY = 32  # MB, while the 24 MP RGB image takes ~70 MB
+
+    @tag(BENCHMARK_TAG)
+    @unittest.skipUnless(sys.platform == "linux", "requires Linux resource usage")
+    def test_peak_memory_and_time_bounded(self):
+        for size in self.BENCHMARK_SIZES:
+            with self.subTest(size=size):
+                data = make_large_photo(size)
+                full_time, full_memory = measure_in_subprocess(
+                    decode_full_resolution, data, 512
+                )
+                reduced_time, reduced_memory = measure_in_subprocess(
+                    decode_reduced, data, 512
+                )
+                message = (
+                    f"full resolution decoding {full_time * 1000:.0f} ms, "
+                    f"{full_memory:.0f} MB; "
+                    f"reduced decoding {reduced_time * 1000:.0f} ms, "
+                    f"{reduced_memory:.0f} MB"
+                )
+                self.assertLess(reduced_memory, self.MAX_PEAK_MEMORY, message)
+                self.assertLess(reduced_time, full_time, message)
+
+    def test_decoded_square(self):
+        for size in self.SIZES:
+            with self.subTest(size=size):
+                with Image.open(BytesIO(make_large_photo(size))) as photo:
+                    square = utils.decode_square_photo(photo, 512)
+                self.assertEqual(square.size, (512, 512))
+                self.assertEqual(square.mode, "RGB")
+
+    @override_settings(ACCOUNTS_PHOTO_MAX_PIXELS=1_000_000)
+    def test_pixels_limit(self):
+        data = make_large_photo(self.SIZES[0])
+        with Image.open(BytesIO(data)) as photo:
+            with self.assertRaises(ValueError):
+                utils.decode_square_photo(photo, 512)
+
+        user = User(username="user", photo=SimpleUploadedFile("photo.jpg", data))
+        with self.assertRaises(ValidationError) as context:
+            user.clean_fields()
+        self.assertIn("photo", context.exception.message_dict)
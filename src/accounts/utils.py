@@ -1,13 +1,73 @@
+import hashlib
+import math
 import os
+import tempfile
 import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import File
+from django.core.files.storage import default_storage
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils.functional import LazyObject, empty
+from django.utils.module_loading import import_string
+from django.utils.translation import gettext_lazy as _
+
+from PIL import Image
 
 # User photo and icon dirs and sizes
 
 MEDIA_PHOTOS_DIR = os.path.join(__package__, "photos")
-MEDIA_PHOTOS_SIZE = (512, 512)
+MEDIA_PHOTOS_SIZE = (max(settings.ACCOUNTS_PHOTO_SIZES),) * 2
 
 MEDIA_ICONS_DIR = os.path.join(__package__, "icons")
-MEDIA_ICONS_SIZE = (32, 32)
+MEDIA_ICONS_SIZE = (min(settings.ACCOUNTS_PHOTO_SIZES),) * 2
+
+# Dir of the photo derivatives (shared by the users who uploaded the same photo)
+
+MEDIA_DERIVATIVES_DIR = os.path.join(__package__, "derivatives")
+
+FORMATS_EXTENSIONS = {"JPEG": ".jpg", "PNG": ".png", "WEBP": ".webp"}
+
+# Size (in bytes) of the photo files held in memory by the processing before
+# they are spilled to the temporary files on disk
+
+PHOTO_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+
+class PhotoStorage(LazyObject):
+    """
+    A class to represent the storage of the users' photos and icons.
+
+    The storage is the instance of the class set by `ACCOUNTS_PHOTO_STORAGE`
+    (the default storage if not set), created on the first access. The photos
+    are processed through the Storage API only (never by the local paths of
+    the files), so any backend may be used, e.g. the S3-compatible one.
+    """
+
+    def _setup(self):
+        if settings.ACCOUNTS_PHOTO_STORAGE is None:
+            self._wrapped = default_storage
+        else:
+            self._wrapped = import_string(settings.ACCOUNTS_PHOTO_STORAGE)()
+
+
+photo_storage = PhotoStorage()
+
+
+def get_photo_storage():
+    """Return the storage of the users' photos and icons (see `PhotoStorage`)."""
+    return photo_storage
+
+
+@receiver(setting_changed)
+def reset_photo_storage_on_setting_change(*, setting, **kwargs):
+    """Recreate the storage of the photos when its setting is changed."""
+    if setting == "ACCOUNTS_PHOTO_STORAGE":
+        photo_storage._wrapped = empty
 
 
 def photo_upload_path(instance, file_name):
@@ -22,3 +82,201 @@ def icon_upload_path(instance, file_name):
     _, file_ext = os.path.splitext(file_name)
 
     return os.path.join(MEDIA_ICONS_DIR, str(uuid.uuid4()) + file_ext)
+
+
+def derivative_path(photo_hash, size, format):
+    """Return path of the derivative of the photo of the given content hash."""
+    return os.path.join(
+        MEDIA_DERIVATIVES_DIR,
+        photo_hash[:2],
+        f"{photo_hash}_{size}{FORMATS_EXTENSIONS[format]}",
+    )
+
+
+@contextmanager
+def lock_photo_derivatives(photo_hash):
+    """
+    Lock the derivatives of the photo of the given hash within the transaction.
+
+    The creation of the derivatives (along with the recording of their hash by
+    the user) and their deletion once unused are serialized this way, so that
+    no derivatives are deleted while another user is about to refer to them.
+    """
+    from .models import PhotoDerivatives
+
+    with transaction.atomic():
+        PhotoDerivatives.objects.get_or_create(photo_hash=photo_hash)
+        PhotoDerivatives.objects.select_for_update().get(photo_hash=photo_hash)
+        yield
+
+
+def spool_photo(file):
+    """
+    Return the copy of the photo file read in chunks, along with its content hash.
+
+    The copy is the temporary file held in memory up to `PHOTO_SPOOL_MAX_SIZE`,
+    so that the file of the remote storage is downloaded once, and the photo is
+    never read into memory as a whole.
+    """
+    photo_hash = hashlib.sha256()
+    spooled_file = tempfile.SpooledTemporaryFile(max_size=PHOTO_SPOOL_MAX_SIZE)
+    for chunk in file.chunks():
+        photo_hash.update(chunk)
+        spooled_file.write(chunk)
+    spooled_file.seek(0)
+
+    return spooled_file, photo_hash.hexdigest()
+
+
+def validate_photo_pixels(photo):
+    """Validate the number of pixels of the photo (based on its header only)."""
+    if photo.width * photo.height > settings.ACCOUNTS_PHOTO_MAX_PIXELS:
+        raise ValidationError(
+            _("Zdjęcie może mieć co najwyżej %(max_pixels)s pikseli."),
+            params={"max_pixels": settings.ACCOUNTS_PHOTO_MAX_PIXELS},
+        )
+
+
+def get_crop_box(width, height):
+    """Return the box of the largest centered square of the image."""
+    if height > width:  # portrait
+        return (0, int((height - width) / 2), width, int((height + width) / 2))
+    elif height < width:  # landscape
+        return (int((width - height) / 2), 0, int((width + height) / 2), height)
+    else:
+        return (0, 0, width, height)
+
+
+def decode_square_photo(photo, size):
+    """
+    Return the centered square of the photo decoded and resized to the size.
+
+    The photo is never decoded at full resolution unless necessary: JPEG files
+    are decoded by the draft mode at the lowest scale (1/2, 1/4 or 1/8) that is
+    still larger than the size, and the square is cropped and resized in the
+    single operation (without an intermediate copy), using the reduction of
+    the image by the integer factor first.
+    """
+    width, height = photo.size
+    if width * height > settings.ACCOUNTS_PHOTO_MAX_PIXELS:
+        raise ValueError(f"The photo of {width} x {height} px is too large.")
+
+    side = min(width, height)
+    photo.draft(
+        "RGB",
+        (math.ceil(width * size / side), math.ceil(height * size / side)),
+    )
+    if photo.mode not in ("RGB", "RGBA", "L", "LA"):
+        photo = photo.convert("RGB")
+
+    square = photo.resize(
+        size=(size, size),
+        box=get_crop_box(*photo.size),
+        reducing_gap=3.0,
+    )
+    return square if square.mode == "RGB" else square.convert("RGB")
+
+
+def create_photo_derivatives(user):
+    """
+    Create the derivatives of the user's photo and assign them to the user.
+
+    The centered square of the photo is decoded once (see `decode_square_photo`)
+    at the largest of `ACCOUNTS_PHOTO_SIZES`, then resized to the other sizes
+    (each one from the previous, larger one) and all the sizes are encoded to
+    all the formats of `ACCOUNTS_PHOTO_FORMATS`. The files are named after the
+    hash of the uploaded photo, so the users who upload the same photo share
+    the derivatives, which are written only once. The uploaded photo is read
+    once (see `spool_photo`) and the derivatives are written in chunks, all by
+    the Storage API of the photo field.
+    The hash of the photo is recorded by the user while the derivatives are
+    locked (see `lock_photo_derivatives`). The photo and icon fields of the
+    user are set to the largest and smallest derivative, respectively, and the
+    uploaded file is deleted (the other fields of the user are not saved).
+    """
+    storage = user.photo.storage
+    upload_name = user.photo.name
+
+    with user.photo.open("rb") as upload_file:
+        photo_file, photo_hash = spool_photo(upload_file)
+
+    with photo_file, lock_photo_derivatives(photo_hash):
+        names = {
+            (size, format): derivative_path(photo_hash, size, format)
+            for size in settings.ACCOUNTS_PHOTO_SIZES
+            for format in settings.ACCOUNTS_PHOTO_FORMATS
+        }
+        missing_names = {
+            key: name for key, name in names.items() if not storage.exists(name)
+        }
+
+        if missing_names:
+            sizes = sorted(settings.ACCOUNTS_PHOTO_SIZES, reverse=True)
+            with Image.open(photo_file) as photo:
+                image = decode_square_photo(photo, sizes[0])
+
+            for size in sizes:
+                if image.size != (size, size):
+                    image = image.resize(size=(size, size))
+                for format in settings.ACCOUNTS_PHOTO_FORMATS:
+                    if (size, format) in missing_names:
+                        save_derivative(
+                            storage, missing_names[(size, format)], image, format
+                        )
+
+        type(user).objects.filter(pk=user.pk).update(photo_hash=photo_hash)
+
+    old_photo_hash = user.photo_hash
+    primary_format = settings.ACCOUNTS_PHOTO_FORMATS[0]
+
+    user.photo_hash = photo_hash
+    user.photo.name = names[(max(settings.ACCOUNTS_PHOTO_SIZES), primary_format)]
+    user.icon.name = names[(min(settings.ACCOUNTS_PHOTO_SIZES), primary_format)]
+
+    if not upload_name.startswith(MEDIA_DERIVATIVES_DIR):
+        storage.delete(upload_name)
+    if old_photo_hash and old_photo_hash != photo_hash:
+        delete_unused_photo_derivatives(old_photo_hash, storage, exclude=user)
+
+
+def save_derivative(storage, name, image, format):
+    """Encode the image to the format and save it by the storage in chunks."""
+    with tempfile.SpooledTemporaryFile(max_size=PHOTO_SPOOL_MAX_SIZE) as file:
+        image.save(file, format=format)
+        file.seek(0)
+        saved_name = storage.save(name, File(file, name=name))
+
+    # The derivative of the same name written meanwhile (e.g. not under the lock
+    # of its photo) has the same content, so the copy of another name is removed
+    if saved_name != name:
+        storage.delete(saved_name)
+
+
+def delete_unused_photo_derivatives(photo_hash, storage, exclude=None):
+    """Delete the derivatives of the photo unless another user still uses it."""
+    from .models import User
+
+    with lock_photo_derivatives(photo_hash):
+        users = User.objects.filter(photo_hash=photo_hash)
+        if exclude is not None:
+            users = users.exclude(pk=exclude.pk)
+        if users.exists():
+            return None
+
+        for size in settings.ACCOUNTS_PHOTO_SIZES:
+            for format in settings.ACCOUNTS_PHOTO_FORMATS:
+                storage.delete(derivative_path(photo_hash, size, format))
+
+
+def get_photo_srcset(user, format=None):
+    """Return the `srcset` attribute value listing the derivatives of the photo."""
+    if not user.photo_hash:
+        return ""
+
+    storage = user.photo.storage
+    format = format or settings.ACCOUNTS_PHOTO_FORMATS[0]
+
+    return ", ".join(
+        f"{storage.url(derivative_path(user.photo_hash, size, format))} {size}w"
+        for size in sorted(settings.ACCOUNTS_PHOTO_SIZES)
+    )
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+from django.utils.translation import gettext_lazy as _
+
+
+class BenchmarksConfig(AppConfig):
+    """A class to represent the benchmarks app configuration."""
+
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "benchmarks"
+    verbose_name = _("Testy wydajności")
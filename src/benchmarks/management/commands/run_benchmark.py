@@ -0,0 +1,102 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks import runner
+
+BENCHMARK_USERNAME = "benchmark"
+
+
+class Command(BaseCommand):
+    """A command to run the benchmark of the admin pages."""
+
+    help = (
+        "Time the changelists, change forms, searches and filters of all the "
+        "registered model admins and write the results as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            default="-",
+            help="Path of the output file ('-' for the standard output).",
+        )
+        parser.add_argument("--repeat", type=int, default=10)
+        parser.add_argument("--warmup", type=int, default=1)
+        parser.add_argument(
+            "--match",
+            help="Run only the cases of the names including the given text.",
+        )
+        parser.add_argument(
+            "--label",
+            help="Label of the run (e.g. the commit hash) stored in the results.",
+        )
+        parser.add_argument(
+            "--username",
+            help=(
+                "Username of the superuser requesting the pages (created as "
+                f"'{BENCHMARK_USERNAME}' if not given)."
+            ),
+        )
+        parser.add_argument(
+            "--host",
+            default="localhost",
+            help="Host of the requests (one of the ALLOWED_HOSTS).",
+        )
+        parser.add_argument(
+            "--compare",
+            help="Path of the results of the previous run to compare with.",
+        )
+
+    def get_user(self, username):
+        User = get_user_model()
+        if username:
+            try:
+                return User.objects.get(username=username, is_superuser=True)
+            except User.DoesNotExist:
+                raise CommandError(f"There is no superuser '{username}'.")
+
+        user, created = User.objects.get_or_create(
+            username=BENCHMARK_USERNAME,
+            defaults={"is_staff": True, "is_superuser": True},
+        )
+        return user
+
+    def handle(self, *args, **options):
+        benchmark = runner.BenchmarkRunner(
+            self.get_user(options["username"]),
+            repeat=options["repeat"],
+            warmup=options["warmup"],
+            match=options["match"],
+            host=options["host"],
+        )
+        report = benchmark.run(label=options["label"])
+
+        data = json.dumps(report, indent=2, ensure_ascii=False)
+        if options["output"] == "-":
+            self.stdout.write(data)
+        else:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                output.write(data)
+
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as baseline_file:
+                baseline = json.load(baseline_file)
+
+            # The comparison goes to the standard error, not to mix with the JSON
+            for comparison in runner.compare_reports(baseline, report):
+                (
+                    name,
+                    kind,
+                    baseline_time,
+                    time_ms,
+                    ratio,
+                    baseline_queries,
+                    queries,
+                ) = comparison
+                self.stderr.write(
+                    f"{name} {kind}: {baseline_time:.1f} -> {time_ms:.1f} ms"
+                    + (f" (x{ratio:.2f})" if ratio is not None else "")
+                    + f", {baseline_queries} -> {queries} queries"
+                )
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks import seed
+from employees.models import Employee
+from units.models import University
+
+
+class Command(BaseCommand):
+    """A command to generate the dataset of the benchmark."""
+
+    help = (
+        "Generate the deterministic dataset of the benchmark of the admin pages "
+        "in the empty database."
+    )
+
+    def add_arguments(self, parser):
+        for name, default, help in (
+            ("universities", 2, "Number of the universities."),
+            ("faculties", 5, "Number of the faculties per university."),
+            ("departments", 6, "Number of the departments per faculty."),
+            ("groups", 4, "Number of the groups."),
+            ("subgroups", 3, "Number of the subgroups per group."),
+            ("positions", 20, "Number of the positions."),
+            ("employees", 10_000, "Number of the employees."),
+            ("max-employments", 3, "Maximum number of employments per employee."),
+            ("photos", 0, "Number of the users with the profile photos."),
+            ("seed", 0, "Seed of the random number generator."),
+            ("batch-size", seed.SEED_BATCH_SIZE, "Number of the objects per batch."),
+        ):
+            parser.add_argument(f"--{name}", type=int, default=default, help=help)
+
+    def handle(self, *args, **options):
+        if University.objects.exists() or Employee.objects.exists():
+            raise CommandError(
+                "The database already has units or employees; "
+                "seed the empty database (see the `flush` command)."
+            )
+
+        created = seed.seed(
+            universities=options["universities"],
+            faculties=options["faculties"],
+            departments=options["departments"],
+            groups=options["groups"],
+            subgroups=options["subgroups"],
+            positions=options["positions"],
+            employees=options["employees"],
+            max_employments=options["max_employments"],
+            photos=options["photos"],
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+        )
+
+        for label, count in sorted(created.items()):
+            self.stdout.write(f"{label}: {count}")
+        self.stdout.write(self.style.SUCCESS("Generated the benchmark dataset."))
@@ -0,0 +1,236 @@
+import datetime
+import math
+import platform
+import statistics
+import time
+import tracemalloc
+
+import django
+from django.contrib import admin
+from django.contrib.admin.utils import quote
+from django.db import connection
+from django.http import QueryDict
+from django.test import Client, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+PERCENTILES = (50, 90, 95, 99)
+
+# Case kinds
+
+CHANGELIST = "changelist"
+CHANGE_FORM = "change_form"
+SEARCH = "search"
+FILTER = "filter"
+FILTERS = "filters"
+
+SEARCH_FIELD_PREFIXES = "^=@"
+
+
+class BenchmarkCase:
+    """A class to represent the admin page timed by the benchmark."""
+
+    def __init__(self, name, kind, url):
+        self.name = name
+        self.kind = kind
+        self.url = url
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}: {self.name}>"
+
+
+def get_percentile(values, percentile):
+    """Return the percentile of the values by the nearest-rank method."""
+    values = sorted(values)
+    return values[max(math.ceil(percentile / 100 * len(values)) - 1, 0)]
+
+
+class BenchmarkRunner:
+    """
+    A class to represent the runner of the benchmark of the admin pages.
+
+    The cases are generated for every registered model admin: the changelist,
+    the change form of the first object, the search by the term taken from the
+    first object, every filter (by its first choice other than the default one)
+    and all the filters combined. Each page is requested by the test client
+    logged in as the given user, `warmup` times to fill the caches, once to
+    count the queries, `repeat` times to time the requests and once more to
+    measure the peak of the memory allocated by `tracemalloc`.
+    """
+
+    def __init__(self, user, repeat=10, warmup=1, match=None, host=None):
+        self.user = user
+        self.repeat = repeat
+        self.warmup = warmup
+        self.match = match
+
+        self.client = Client(**({"SERVER_NAME": host} if host else {}))
+        self.client.force_login(user)
+        self.request_factory = RequestFactory()
+
+    def get_model_admins(self):
+        return sorted(
+            admin.site._registry.items(), key=lambda item: item[0]._meta.label
+        )
+
+    def get_cases(self):
+        """Yield the cases of all the registered model admins."""
+        for model, model_admin in self.get_model_admins():
+            for case in self.get_model_admin_cases(model, model_admin):
+                if self.match is None or self.match in case.name:
+                    yield case
+
+    def get_model_admin_cases(self, model, model_admin):
+        info = model._meta.app_label, model._meta.model_name
+        name = model._meta.label
+        url = reverse("admin:%s_%s_changelist" % info)
+        request = self.get_request(url)
+
+        yield BenchmarkCase(name, CHANGELIST, url)
+
+        pk = (
+            model_admin.get_queryset(request)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+            .first()
+        )
+        if pk is not None:
+            yield BenchmarkCase(
+                name,
+                CHANGE_FORM,
+                reverse("admin:%s_%s_change" % info, args=(quote(pk),)),
+            )
+
+        search_term = self.get_search_term(model, model_admin, request, pk)
+        if search_term:
+            yield BenchmarkCase(
+                name,
+                SEARCH,
+                f"{url}?{QueryDict.fromkeys(['q'], search_term).urlencode()}",
+            )
+
+        params = QueryDict(mutable=True)
+        for title, query_string in self.get_filter_choices(model_admin, request):
+            yield BenchmarkCase(f"{name} [{title}]", FILTER, f"{url}{query_string}")
+            params.update(QueryDict(query_string.lstrip("?")))
+        if len(params) > 1:
+            yield BenchmarkCase(name, FILTERS, f"{url}?{params.urlencode()}")
+
+    def get_request(self, url):
+        request = self.request_factory.get(url)
+        request.user = self.user
+        return request
+
+    def get_search_term(self, model, model_admin, request, pk):
+        """Return the prefix of the first word of the first object's search field."""
+        search_fields = model_admin.get_search_fields(request)
+        if not search_fields or pk is None:
+            return None
+
+        value = (
+            model._default_manager.filter(pk=pk)
+            .values_list(search_fields[0].lstrip(SEARCH_FIELD_PREFIXES), flat=True)
+            .first()
+        )
+        words = str(value or "").split()
+        return words[0][:4] if words else None
+
+    def get_filter_choices(self, model_admin, request):
+        """Yield the (title, query string) pairs of the first choices of the filters."""
+        changelist = model_admin.get_changelist_instance(request)
+        for spec in changelist.filter_specs:
+            for choice in spec.choices(changelist):
+                if not choice["selected"] and choice["query_string"] != "?":
+                    yield str(spec.title), choice["query_string"]
+                    break
+
+    def run_case(self, case):
+        """Return the results of the case."""
+        for i in range(self.warmup):
+            self.client.get(case.url)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(case.url)
+        queries = len(context)  # the log of the queries is reset by the requests
+
+        timings = []
+        for i in range(self.repeat):
+            start = time.perf_counter()
+            self.client.get(case.url)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        tracemalloc.start()
+        try:
+            self.client.get(case.url)
+            size, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return {
+            "name": case.name,
+            "kind": case.kind,
+            "url": case.url,
+            "status": response.status_code,
+            "queries": queries,
+            "time_ms": {
+                "min": min(timings),
+                "mean": statistics.mean(timings),
+                **{f"p{p}": get_percentile(timings, p) for p in PERCENTILES},
+                "max": max(timings),
+            }
+            if timings
+            else None,
+            "peak_memory_kb": peak / 1024,
+        }
+
+    def run(self, label=None):
+        """Run all the cases and return the report."""
+        return {
+            "label": label,
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "environment": {
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+            },
+            "options": {"repeat": self.repeat, "warmup": self.warmup},
+            "dataset": {
+                model._meta.label: model._default_manager.count()
+                for model, model_admin in self.get_model_admins()
+            },
+            "results": [self.run_case(case) for case in self.get_cases()],
+        }
+
+
+def _get_case_key(result):
+    return (result["name"], result["kind"])
+
+
+def compare_reports(baseline, report, percentile=50):
+    """
+    Yield the comparisons of the results of the cases of the two reports.
+
+    The comparisons are the (name, kind, baseline time, time, time ratio,
+    baseline queries, queries) tuples of the cases of both reports, with the
+    times as the given percentiles (in milliseconds).
+    """
+    key = f"p{percentile}"
+    baseline_results = {_get_case_key(result): result for result in baseline["results"]}
+    for result in report["results"]:
+        baseline_result = baseline_results.get(_get_case_key(result))
+        if baseline_result is None or not result["time_ms"]:
+            continue
+        if not baseline_result["time_ms"]:
+            continue
+
+        baseline_time = baseline_result["time_ms"][key]
+        time_ms = result["time_ms"][key]
+        yield (
+            result["name"],
+            result["kind"],
+            baseline_time,
+            time_ms,
+            time_ms / baseline_time if baseline_time else None,
+            baseline_result["queries"],
+            result["queries"],
+        )
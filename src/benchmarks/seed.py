@@ -0,0 +1,296 @@
+import random
+from collections import Counter
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.db import transaction
+
+from accounts import tasks as accounts_tasks
+from employees.models import (
+    Degree,
+    Discipline,
+    Domain,
+    Employee,
+    Employment,
+    Group,
+    Position,
+    Status,
+    Subgroup,
+)
+from project.utils.cache import bump_model_version
+from reports import evaluation
+from search import index as search_index
+from units.models import Department, Faculty, University
+
+from PIL import Image
+
+User = get_user_model()
+
+USERNAME_PREFIX = "bench"
+
+SEED_BATCH_SIZE = 2000
+
+FIRST_NAMES = (
+    "Anna Maria Katarzyna Małgorzata Agnieszka Barbara Ewa Krystyna Elżbieta Zofia "
+    "Jan Andrzej Piotr Krzysztof Stanisław Tomasz Paweł Józef Marcin Łukasz"
+).split()
+
+LAST_NAMES = (
+    "Nowak Kowalski Wiśniewski Wójcik Kowalczyk Kamiński Lewandowski Zieliński "
+    "Szymański Woźniak Dąbrowski Kozłowski Jankowski Mazur Kwiatkowski Krawczyk "
+    "Piotrowski Grabowski Nowakowski Pawłowski Michalski Król Wieczorek Jabłoński"
+).split()
+
+DEGREES = ("mgr", "mgr inż.", "dr", "dr inż.", "dr hab.", "prof. dr hab.")
+
+STATUSES = (("Pracownik", "P"), ("Doktorant", "D"), ("Emeryt", "E"))
+
+DOMAINS = (
+    ("Dziedzina nauk ścisłych i przyrodniczych", "NS", 8),
+    ("Dziedzina nauk inżynieryjno-technicznych", "NT", 10),
+    ("Dziedzina nauk humanistycznych", "NH", 6),
+)
+
+
+class BenchmarkSeeder:
+    """
+    A class to represent the generator of the benchmark dataset.
+
+    The dataset is generated by the random number generator of the given seed,
+    so the same options give the same data (apart from the primary keys). The
+    units are saved one by one (their full names and codes are materialized
+    by `save`), the users, employees and employments are created in batches by
+    `bulk_create`, then the search indexes and the evaluation counters are
+    rebuilt and the versions of the data of the models are bumped. The users
+    with photos are saved one by one and their photos are processed as
+    configured by `ACCOUNTS_PHOTO_PROCESSING` (synchronously, if still pending
+    after the save).
+    """
+
+    def __init__(
+        self,
+        universities=2,
+        faculties=5,
+        departments=6,
+        groups=4,
+        subgroups=3,
+        positions=20,
+        employees=10_000,
+        max_employments=3,
+        photos=0,
+        seed=0,
+        batch_size=SEED_BATCH_SIZE,
+    ):
+        self.options = {
+            "universities": universities,
+            "faculties": faculties,
+            "departments": departments,
+            "groups": groups,
+            "subgroups": subgroups,
+            "positions": positions,
+            "employees": employees,
+            "max_employments": max_employments,
+            "photos": photos,
+        }
+        self.random = random.Random(seed)
+        self.batch_size = batch_size
+        self.created = Counter()
+
+    def run(self):
+        """Generate the dataset and return the numbers of the objects created."""
+        with transaction.atomic():
+            self.create_references()
+            self.create_units()
+            self.create_positions()
+            self.create_employees()
+
+            for index in search_index.get_indexes():
+                index.rebuild()
+            evaluation.reconcile()
+
+        for model in (User, Employee, Employment, Position, Subgroup):
+            bump_model_version(model)
+
+        self.create_photos()
+
+        return self.created
+
+    def create(self, model, objects):
+        """Create the objects of the model in batches; return them with the keys."""
+        objects = model.objects.bulk_create(objects, batch_size=self.batch_size)
+        if objects and objects[0].pk is None:
+            # The backend does not return the primary keys of the objects created
+            objects = list(model.objects.order_by("-pk")[: len(objects)])[::-1]
+
+        self.created[model._meta.label] += len(objects)
+        return objects
+
+    def create_references(self):
+        self.degrees = self.create(Degree, [Degree(code=code) for code in DEGREES])
+        self.statuses = self.create(
+            Status, [Status(name=name, code=code) for name, code in STATUSES]
+        )
+
+        self.disciplines = []
+        for name, code, count in DOMAINS:
+            domain = Domain.objects.create(name=name, code=code)
+            self.created[Domain._meta.label] += 1
+            self.disciplines += self.create(
+                Discipline,
+                [
+                    Discipline(
+                        name=f"Dyscyplina {code}{i + 1}",
+                        code=f"{code[1]}{i}",
+                        domain=domain,
+                    )
+                    for i in range(count)
+                ],
+            )
+
+    def create_units(self):
+        self.departments = []
+        for i in range(self.options["universities"]):
+            university = University.objects.create(
+                name=f"Uczelnia {i + 1}", code=f"U{i + 1}"
+            )
+            self.created[University._meta.label] += 1
+
+            for j in range(self.options["faculties"]):
+                faculty = Faculty.objects.create(
+                    name=f"Wydział {j + 1} Uczelni {i + 1}",
+                    code=f"W{j + 1}",
+                    university=university,
+                )
+                self.created[Faculty._meta.label] += 1
+
+                for k in range(self.options["departments"]):
+                    self.departments.append(
+                        Department.objects.create(
+                            name=f"Katedra {k + 1} Wydziału {j + 1}",
+                            code=f"K{k + 1}",
+                            faculty=faculty,
+                        )
+                    )
+                    self.created[Department._meta.label] += 1
+
+    def create_positions(self):
+        groups = self.create(
+            Group,
+            [
+                Group(name=f"Grupa {i + 1}", code=f"{i + 1:02d}")
+                for i in range(self.options["groups"])
+            ],
+        )
+        self.subgroups = self.create(
+            Subgroup,
+            [
+                Subgroup(group=group, name=f"Podgrupa {j + 1}", code=f"{j + 1:02d}")
+                for group in groups
+                for j in range(self.options["subgroups"])
+            ],
+        )
+        self.positions = self.create(
+            Position,
+            [
+                Position(name=f"Stanowisko {i + 1}")
+                for i in range(self.options["positions"])
+            ],
+        )
+
+        # Each position belongs to one or two subgroups
+        self.position_subgroups = {}
+        through = Position.subgroup_set.through
+        links = []
+        for position in self.positions:
+            subgroups = self.random.sample(
+                self.subgroups, min(len(self.subgroups), self.random.randint(1, 2))
+            )
+            self.position_subgroups[position.pk] = subgroups
+            links += [
+                through(position_id=position.pk, subgroup_id=subgroup.pk)
+                for subgroup in subgroups
+            ]
+        through.objects.bulk_create(links, batch_size=self.batch_size)
+
+    def create_employees(self):
+        count = self.options["employees"]
+        for start in range(0, count, self.batch_size):
+            numbers = range(start, min(start + self.batch_size, count))
+            users = self.create(User, [self.build_user(i) for i in numbers])
+            employees = self.create(
+                Employee,
+                [self.build_employee(i, user) for i, user in zip(numbers, users)],
+            )
+            self.create(
+                Employment,
+                [
+                    employment
+                    for employee in employees
+                    for employment in self.build_employments(employee)
+                ],
+            )
+
+    def build_user(self, number):
+        username = f"{USERNAME_PREFIX}{number + 1:06d}"
+        user = User(
+            username=username,
+            slug=username,
+            first_name=self.random.choice(FIRST_NAMES),
+            last_name=self.random.choice(LAST_NAMES),
+            email=f"{username}@example.com",
+        )
+        user.set_unusable_password()
+        return user
+
+    def build_employee(self, number, user):
+        return Employee(
+            user=user,
+            status=self.random.choice(self.statuses),
+            degree=self.random.choice(self.degrees),
+            discipline=(
+                self.random.choice(self.disciplines)
+                if self.random.random() < 0.9
+                else None
+            ),
+            orcid=(
+                f"0000-0002-{number // 10_000:04d}-{number % 10_000:04d}"
+                if self.random.random() < 0.7
+                else None
+            ),
+            in_evaluation=self.random.random() < 0.6,
+        )
+
+    def build_employments(self, employee):
+        for i in range(self.random.randint(0, self.options["max_employments"])):
+            position = self.random.choice(self.positions)
+            yield Employment(
+                employee=employee,
+                position=position,
+                subgroup=self.random.choice(self.position_subgroups[position.pk]),
+                department=(
+                    self.random.choice(self.departments) if self.departments else None
+                ),
+            )
+
+    def create_photos(self):
+        users = User.objects.filter(username__startswith=USERNAME_PREFIX).order_by(
+            "username"
+        )[: self.options["photos"]]
+        for user in users:
+            with BytesIO() as photo:
+                Image.new(
+                    "RGB",
+                    (self.random.randint(300, 600), self.random.randint(300, 600)),
+                    color=tuple(self.random.randrange(256) for i in range(3)),
+                ).save(photo, format="JPEG")
+                user.photo = ContentFile(photo.getvalue(), name="photo.jpg")
+                user.save()
+
+            accounts_tasks.process_profile_photo(user.pk)
+            self.created["photos"] += 1
+
+
+def seed(**options):
+    """Generate the benchmark dataset and return the numbers of the objects."""
+    return BenchmarkSeeder(**options).run()
@@ -0,0 +1,188 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import transaction
+from django.test import TestCase, override_settings, tag
+
+from employees.models import Employee, Employment
+from project.test_runner import BENCHMARK_TAG
+from search.models import SearchToken
+from units.models import Department
+
+from . import runner, seed
+
+User = get_user_model()
+
+SEED_OPTIONS = {
+    "universities": 1,
+    "faculties": 2,
+    "departments": 2,
+    "groups": 2,
+    "subgroups": 2,
+    "positions": 4,
+    "employees": 30,
+    "max_employments": 2,
+    "batch_size": 7,
+}
+
+
+class SeedBenchmarkTests(TestCase):
+    """Tests of the generator of the benchmark dataset."""
+
+    def get_snapshot(self):
+        return [
+            (
+                employee.user.username,
+                employee.user.last_name,
+                employee.orcid,
+                employee.discipline and employee.discipline.code,
+                sorted(
+                    (employment.position.name, employment.department.full_code)
+                    for employment in employee.employment_set.all()
+                ),
+            )
+            for employee in Employee.objects.select_related(
+                "user", "discipline"
+            ).prefetch_related("employment_set__position", "employment_set__department")
+        ]
+
+    def seed_snapshot(self, **options):
+        with transaction.atomic():
+            created = seed.seed(**SEED_OPTIONS, **options)
+            snapshot = self.get_snapshot()
+            transaction.set_rollback(True)
+
+        return created, snapshot
+
+    def test_seed(self):
+        created, snapshot = self.seed_snapshot()
+
+        self.assertEqual(created["accounts.User"], 30)
+        self.assertEqual(created["employees.Employee"], 30)
+        self.assertEqual(created["units.Department"], 4)
+        self.assertEqual(len(snapshot), 30)
+        self.assertTrue(any(employments for *data, employments in snapshot))
+
+        self.assertEqual(self.seed_snapshot(), (created, snapshot))
+        self.assertNotEqual(self.seed_snapshot(seed=1)[1], snapshot)
+
+    def test_search_index(self):
+        seed.seed(**SEED_OPTIONS)
+
+        self.assertTrue(
+            SearchToken.objects.filter(token=f"{seed.USERNAME_PREFIX}000001").exists()
+        )
+
+    @override_settings(ACCOUNTS_PHOTO_PROCESSING="sync")
+    def test_photos(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+
+        with self.settings(MEDIA_ROOT=media_root):
+            created = seed.seed(**SEED_OPTIONS, photos=2)
+
+            self.assertEqual(created["photos"], 2)
+            users = User.objects.exclude(icon="")
+            self.assertEqual(users.count(), 2)
+            for user in users:
+                self.assertEqual(user.photo_status, User.PhotoStatusChoices.READY)
+                self.assertTrue(user.icon.storage.exists(user.icon.name))
+
+    def test_command(self):
+        call_command("seed_benchmark", "--employees=5", stdout=StringIO())
+
+        self.assertEqual(Employee.objects.count(), 5)
+        self.assertEqual(Department.objects.count(), 60)
+        with self.assertRaises(CommandError):
+            call_command("seed_benchmark", "--employees=5", stdout=StringIO())
+
+
+class RunBenchmarkTests(TestCase):
+    """Tests of the runner of the benchmark of the admin pages."""
+
+    @classmethod
+    def setUpTestData(cls):
+        seed.seed(**SEED_OPTIONS)
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "pw")
+
+    def test_run(self):
+        report = runner.BenchmarkRunner(
+            self.admin, repeat=1, warmup=0, match="employees.Employee"
+        ).run(label="test")
+
+        self.assertEqual(report["label"], "test")
+        self.assertEqual(
+            report["dataset"]["employees.Employment"], Employment.objects.count()
+        )
+        results = {
+            (result["name"], result["kind"]): result for result in report["results"]
+        }
+        for kind in (
+            runner.CHANGELIST,
+            runner.CHANGE_FORM,
+            runner.SEARCH,
+            runner.FILTERS,
+        ):
+            self.assertIn(("employees.Employee", kind), results)
+        self.assertTrue(
+            any(result["kind"] == runner.FILTER for result in report["results"])
+        )
+        for result in report["results"]:
+            with self.subTest(name=result["name"], kind=result["kind"]):
+                self.assertEqual(result["status"], 200)
+                self.assertGreater(result["queries"], 0)
+                self.assertLessEqual(result["time_ms"]["p50"], result["time_ms"]["p99"])
+                self.assertGreater(result["peak_memory_kb"], 0)
+
+        comparisons = list(runner.compare_reports(report, report))
+        self.assertEqual(len(comparisons), len(report["results"]))
+        self.assertTrue(all(ratio == 1 for *data, ratio, q1, q2 in comparisons))
+
+    @tag(BENCHMARK_TAG)
+    def test_run_all(self):
+        report = runner.BenchmarkRunner(self.admin, repeat=1, warmup=0).run()
+
+        self.assertEqual(
+            {result["name"].split(" [")[0] for result in report["results"]},
+            {model._meta.label for model in admin.site._registry},
+        )
+        for result in report["results"]:
+            with self.subTest(name=result["name"], kind=result["kind"]):
+                self.assertEqual(result["status"], 200)
+
+    def test_command(self):
+        output = tempfile.NamedTemporaryFile(suffix=".json", delete=False)
+        output.close()
+        self.addCleanup(os.remove, output.name)
+
+        stderr = StringIO()
+        call_command(
+            "run_benchmark",
+            "--repeat=1",
+            "--match=units.University",
+            f"--output={output.name}",
+            "--host=testserver",
+            stdout=StringIO(),
+        )
+        call_command(
+            "run_benchmark",
+            "--repeat=1",
+            "--match=units.University",
+            "--host=testserver",
+            f"--compare={output.name}",
+            stdout=StringIO(),
+            stderr=stderr,
+        )
+
+        with open(output.name, encoding="utf-8") as output_file:
+            report = json.load(output_file)
+        self.assertEqual(
+            {result["name"] for result in report["results"]}, {"units.University"}
+        )
+        self.assertIn("units.University changelist", stderr.getvalue())
@@ -1,17 +1,30 @@
-from django.contrib import admin
+import csv
+import io
+
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
 from django.contrib.auth import get_user_model
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+from django.template.response import TemplateResponse
+from django.urls import path
 from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 
 from project.utils import admin as admin_utils
+from search.admin import SearchIndexMixin
 from units.models import Department
 
+from . import exports, imports, reassign
 from .forms import (
     DegreeAdminForm,
     DisciplineAdminForm,
     DomainAdminForm,
     EmployeeAdminForm,
+    EmployeeImportForm,
     EmploymentAdminForm,
+    EmploymentReassignForm,
     GroupAdminForm,
     PositionAdminForm,
     StatusAdminForm,
@@ -128,6 +141,7 @@ class DisciplineAdmin(admin_utils.ModelAdmin):
         "code",
         admin_utils.related_object_link(Domain),
     )
+    list_select_related = ("domain",)
     list_filter = ("domain",)
     search_fields = ("name", "code", "domain__name", "domain__code")
 
@@ -192,12 +206,13 @@ class SubgroupAdmin(admin_utils.ModelAdmin):
         "code",
         admin_utils.related_object_link(Group),
     )
+    list_select_related = ("group",)
     list_filter = ("group",)
     search_fields = ("name", "code", "group__name", "group__code")
 
 
 @admin.register(Position)
-class PositionAdmin(admin_utils.ModelAdmin):
+class PositionAdmin(SearchIndexMixin, admin_utils.ModelAdmin):
     """A class to represent admin options for the Position model."""
 
     form = PositionAdminForm
@@ -216,7 +231,7 @@ class PositionAdmin(admin_utils.ModelAdmin):
     list_display = (
         "id",
         "name",
-        admin_utils.related_object_link(Group),
+        admin_utils.related_object_link(Group, ordering_lookup="group_name"),
         "subgroups",
     )
     list_filter = (
@@ -233,6 +248,9 @@ class PositionAdmin(admin_utils.ModelAdmin):
     )
     search_fields = ("name", "subgroup_set__name", "subgroup_set__code")
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_group()
+
     @admin.display(description=Subgroup._meta.verbose_name_plural.capitalize())
     def subgroups(self, obj):
         links = admin_utils.related_objects_links(
@@ -263,7 +281,7 @@ User = get_user_model()
 
 
 @admin.register(Employee)
-class EmployeeAdmin(admin_utils.ModelAdmin):
+class EmployeeAdmin(SearchIndexMixin, admin_utils.ModelAdmin):
     """A class to represent admin options for the Employee model."""
 
     form = EmployeeAdminForm
@@ -320,17 +338,96 @@ class EmployeeAdmin(admin_utils.ModelAdmin):
         admin_utils.RelatedModelFilter.as_filter(
             model=Department,
             lookup="employment__department",
-            field="get_full_code",
+            field="full_code",
             null=True,
         ),
     )
     list_editable = ("in_evaluation",)
+    bulk_list_editable = True
     search_fields = (
         "user__username",
         "user__last_name",
         "user__first_name",
         "orcid",
     )
+    actions = ("export_roster",)
+    keyset_pagination = True
+    estimated_count = True
+
+    def get_queryset(self, request):
+        """Return the queryset with the whole graph displayed in the list loaded."""
+        return (
+            super()
+            .get_queryset(request)
+            .select_related("user", "degree", "status")
+            .prefetch_related(
+                Prefetch(
+                    "employment_set",
+                    queryset=Employment.objects.with_group().select_related(
+                        "position",
+                        "department__faculty__university",
+                    ),
+                )
+            )
+        )
+
+    def get_urls(self):
+        return [
+            path(
+                "import/",
+                self.admin_site.admin_view(self.import_view),
+                name="employees_employee_import",
+            ),
+        ] + super().get_urls()
+
+    def import_view(self, request):
+        """Display the form of the import of the employees and its report."""
+        if not (
+            self.has_add_permission(request) and self.has_change_permission(request)
+        ):
+            raise PermissionDenied
+
+        roster_import = None
+        form = EmployeeImportForm(request.POST or None, request.FILES or None)
+        if form.is_valid():
+            lines = io.TextIOWrapper(
+                form.cleaned_data["file"].file,
+                encoding="utf-8-sig",
+                newline="",
+            )
+            try:
+                roster_import = imports.import_roster(
+                    lines,
+                    dry_run=form.cleaned_data["dry_run"],
+                )
+            except ValidationError as error:
+                form.add_error("file", error)
+            except UnicodeDecodeError:
+                form.add_error("file", _("Plik nie jest zakodowany w UTF-8."))
+            except csv.Error as error:
+                form.add_error("file", str(error))
+
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": _("Import pracowników"),
+            "form": form,
+            "roster_import": roster_import,
+        }
+
+        return TemplateResponse(
+            request, "admin/employees/employee/import.html", context
+        )
+
+    @admin.action(description=_("Eksportuj wybranych pracowników do pliku CSV"))
+    def export_roster(self, request, queryset):
+        response = StreamingHttpResponse(
+            exports.iter_roster_csv(queryset),
+            content_type="text/csv; charset=utf-8",
+        )
+        response["Content-Disposition"] = 'attachment; filename="pracownicy.csv"'
+
+        return response
 
     @admin.display(
         description=Position._meta.verbose_name.capitalize(),
@@ -367,13 +464,13 @@ class EmployeeAdmin(admin_utils.ModelAdmin):
 
     @admin.display(
         description=Department._meta.verbose_name.capitalize(),
-        ordering="employment__department__code",
+        ordering="employment__department__full_code",
     )
     def departments__code(self, obj):
         return format_html(
             "<br>".join(
                 [
-                    department.get_full_code() if department else "-"
+                    department.full_code if department else "-"
                     for department in obj.departments
                 ]
             )
@@ -381,7 +478,7 @@ class EmployeeAdmin(admin_utils.ModelAdmin):
 
 
 @admin.register(Employment)
-class EmploymentAdmin(admin_utils.ModelAdmin):
+class EmploymentAdmin(SearchIndexMixin, admin_utils.ModelAdmin):
     """A class to represent admin options for the Employment model."""
 
     form = EmploymentAdminForm
@@ -408,7 +505,7 @@ class EmploymentAdmin(admin_utils.ModelAdmin):
         ),
         admin_utils.related_object_link(Subgroup, content_field="code"),
         admin_utils.related_object_link(Position, content_field="name"),
-        admin_utils.related_object_link(Department, content_field="get_full_code"),
+        admin_utils.related_object_link(Department, content_field="full_code"),
     )
     list_filter = (
         admin_utils.RelatedModelFilter.as_filter(
@@ -422,7 +519,7 @@ class EmploymentAdmin(admin_utils.ModelAdmin):
         admin_utils.RelatedModelFilter.as_filter(
             model=Department,
             lookup="department",
-            field="get_full_code",
+            field="full_code",
             null=True,
         ),
     )
@@ -435,3 +532,63 @@ class EmploymentAdmin(admin_utils.ModelAdmin):
         "subgroup__group__name",
         "subgroup__group__code",
     )
+    actions = ("reassign_employments",)
+    keyset_pagination = True
+    estimated_count = True
+
+    def get_queryset(self, request):
+        return (
+            super()
+            .get_queryset(request)
+            .with_group()
+            .select_related("employee__user", "position", "department")
+        )
+
+    @admin.action(
+        description=_("Przenieś wybrane zatrudnienia"),
+        permissions=("change",),
+    )
+    def reassign_employments(self, request, queryset):
+        """
+        Display the form of the reassignment of the employments and apply it.
+
+        The reassignment is previewed first (with the number of the employments
+        it changes), and applied once confirmed (see `reassign`).
+        """
+        submitted = "_preview" in request.POST or "_confirm" in request.POST
+        form = EmploymentReassignForm(
+            request.POST if submitted else None, queryset=queryset
+        )
+
+        count = None
+        if form.is_valid():
+            changes = form.get_changes()
+            if "_confirm" in request.POST:
+                count = reassign.reassign_employments(
+                    queryset, changes, user=request.user
+                )
+                self.message_user(
+                    request,
+                    _("Zmieniono zatrudnienia: %(count)d.") % {"count": count},
+                    messages.SUCCESS,
+                )
+                return None
+
+            count = reassign.get_changed_employments(queryset, changes).count()
+
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": _("Przeniesienie zatrudnień"),
+            "form": form,
+            "count": count,
+            "selected_count": queryset.count(),
+            "action": "reassign_employments",
+            "action_checkbox_name": ACTION_CHECKBOX_NAME,
+            "selected": request.POST.getlist(ACTION_CHECKBOX_NAME),
+            "select_across": request.POST.get("select_across", "0"),
+        }
+
+        return TemplateResponse(
+            request, "admin/employees/employment/reassign.html", context
+        )
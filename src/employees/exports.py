@@ -0,0 +1,56 @@
+import csv
+
+# Columns of the roster of the employees: (column name, field lookup) pairs
+
+ROSTER_COLUMNS = (
+    ("employee_id", "id"),
+    ("username", "user__username"),
+    ("last_name", "user__last_name"),
+    ("first_name", "user__first_name"),
+    ("degree", "degree__code"),
+    ("status", "status__code"),
+    ("orcid", "orcid"),
+    ("in_evaluation", "in_evaluation"),
+    ("discipline", "discipline__code"),
+    ("employment_id", "employment__id"),
+    ("group", "employment__subgroup__group__code"),
+    ("subgroup", "employment__subgroup__code"),
+    ("position", "employment__position__name"),
+    ("department", "employment__department__full_code"),
+)
+
+ROSTER_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """A class to represent the file-like object returning what is written."""
+
+    def write(self, value):
+        return value
+
+
+def iter_roster_rows(queryset, chunk_size=ROSTER_CHUNK_SIZE):
+    """
+    Yield the header and rows of the roster of the employees of the queryset.
+
+    There is one row per employment (or a single row for the employee with no
+    employment). All the data, including the full codes of the departments,
+    is fetched by a single query and iterated over in chunks, so the memory
+    used does not depend on the number of the employees.
+    """
+    yield [name for name, _ in ROSTER_COLUMNS]
+
+    yield from (
+        queryset.select_related(None)
+        .prefetch_related(None)
+        .order_by("id", "employment__id")
+        .values_list(*[lookup for _, lookup in ROSTER_COLUMNS])
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def iter_roster_csv(queryset, chunk_size=ROSTER_CHUNK_SIZE):
+    """Yield the lines of the CSV file with the roster of the employees."""
+    writer = csv.writer(Echo())
+    for row in iter_roster_rows(queryset, chunk_size=chunk_size):
+        yield writer.writerow(row)
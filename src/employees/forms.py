@@ -1,5 +1,9 @@
 from django import forms
+from django.utils.translation import gettext_lazy as _
 
+from units.models import Department
+
+from . import reassign
 from .models import (
     Degree,
     Discipline,
@@ -83,3 +87,55 @@ class EmploymentAdminForm(forms.ModelForm):
     class Meta:
         model = Employment
         fields = "__all__"
+
+
+class EmployeeImportForm(forms.Form):
+    """A class to represent admin form of the import of the employees."""
+
+    file = forms.FileField(
+        label=_("plik CSV"),
+        help_text=_("Plik w formacie eksportu pracowników (kodowanie UTF-8)."),
+    )
+    dry_run = forms.BooleanField(
+        label=_("próbny import"),
+        help_text=_("Sprawdź plik bez zapisywania zmian."),
+        required=False,
+        initial=True,
+    )
+
+
+class EmploymentReassignForm(forms.Form):
+    """A class to represent admin form of the reassignment of the employments."""
+
+    subgroup = forms.ModelChoiceField(
+        queryset=Subgroup.objects.order_by("code"),
+        label=Subgroup._meta.verbose_name,
+        required=False,
+    )
+    position = forms.ModelChoiceField(
+        queryset=Position.objects.order_by("name"),
+        label=Position._meta.verbose_name,
+        required=False,
+    )
+    department = forms.ModelChoiceField(
+        queryset=Department.objects.order_by("full_code"),
+        label=Department._meta.verbose_name,
+        required=False,
+    )
+
+    def __init__(self, *args, queryset=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.employments = queryset
+
+    def clean(self):
+        cleaned_data = super().clean()
+        reassign.validate_changes(self.get_changes(), self.employments)
+        return cleaned_data
+
+    def get_changes(self):
+        """Return the {field: object} dictionary of the fields chosen to change."""
+        return {
+            name: self.cleaned_data[name]
+            for name in reassign.REASSIGN_FIELDS
+            if self.cleaned_data.get(name) is not None
+        }
@@ -0,0 +1,410 @@
+import csv
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils.translation import gettext_lazy as _
+
+from project.utils.cache import bump_model_version
+from reports import evaluation
+from search import index as search_index
+from units.models import Department
+
+from .exports import ROSTER_COLUMNS
+from .models import Degree, Discipline, Employee, Employment, Position, Status, Subgroup
+
+User = get_user_model()
+
+# Columns required in the file imported (the ones of the exported roster, except
+# the group, which follows the subgroup)
+
+REQUIRED_COLUMNS = ("username",)
+IGNORED_COLUMNS = ("employee_id", "group")
+
+# Related objects referred to by the columns: (column, model, field) triples
+
+REFERENCES = (
+    ("status", Status, "code"),
+    ("degree", Degree, "code"),
+    ("discipline", Discipline, "code"),
+    ("subgroup", Subgroup, "code"),
+    ("position", Position, "name"),
+    ("department", Department, "full_code"),
+)
+
+EMPLOYEE_FIELDS = ("status", "degree", "orcid", "in_evaluation", "discipline")
+EMPLOYMENT_FIELDS = ("subgroup", "position", "department")
+
+TRUE_VALUES = ("1", "true", "t", "yes", "y", "tak")
+FALSE_VALUES = ("", "0", "false", "f", "no", "n", "nie")
+
+IMPORT_BATCH_SIZE = 500
+
+_AMBIGUOUS = object()
+
+
+class RosterImport:
+    """
+    A class to represent the import of the roster of the employees.
+
+    The file has the columns of the exported roster (see `exports.ROSTER_COLUMNS`)
+    and is read row by row. The employees are identified by the usernames of
+    their users (created if missing), the employments by their IDs (created if
+    empty) and the related objects by their codes (names of the positions, full
+    codes of the departments), resolved by the dictionaries loaded up front.
+    The rows are written in batches by `bulk_create` and `bulk_update`, all
+    within a single transaction, rolled back in the dry-run mode. The invalid
+    rows are skipped (as a whole, validated before any write) and reported in
+    `errors`; the conflicts of the unique values not detected up front abort
+    the import.
+    """
+
+    def __init__(self, batch_size=IMPORT_BATCH_SIZE, dry_run=False):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+
+        self.created = Counter()
+        self.updated = Counter()
+        self.errors = []  # (line number, message) pairs
+
+        self.columns = []
+        self.references = {}
+        self.orcids = {}  # ORCID: username of the employee in the file
+
+    def run(self, lines):
+        """Import the rows of the CSV file given as the iterable of lines."""
+        reader = csv.DictReader(lines)
+        self.columns = reader.fieldnames or []
+        self.validate_columns(self.columns)
+
+        try:
+            with transaction.atomic():
+                self.load_references()
+
+                batch = []
+                for row in reader:
+                    try:
+                        batch.append((reader.line_num, self.parse_row(row)))
+                    except ValidationError as error:
+                        self.add_error(reader.line_num, error)
+
+                    if len(batch) >= self.batch_size:
+                        self.write_batch(batch)
+                        batch = []
+
+                if batch:
+                    self.write_batch(batch)
+
+                if self.dry_run:
+                    transaction.set_rollback(True)
+        except IntegrityError as error:
+            # E.g. the unique values differing by the case only, equal for the
+            # collation of the database
+            raise ValidationError(
+                _("Import przerwany przez konflikt wartości unikalnych: %(error)s"),
+                params={"error": error},
+            )
+
+        if not self.dry_run:
+            for model in (User, Employee, Employment):
+                bump_model_version(model)
+
+        return self
+
+    def validate_columns(self, columns):
+        """Validate the header of the file."""
+        known_columns = [name for name, _ in ROSTER_COLUMNS]
+
+        missing_columns = [name for name in REQUIRED_COLUMNS if name not in columns]
+        if missing_columns:
+            raise ValidationError(
+                _("Brak wymaganych kolumn: %(columns)s."),
+                params={"columns": ", ".join(missing_columns)},
+            )
+
+        unknown_columns = [name for name in columns if name not in known_columns]
+        if unknown_columns:
+            raise ValidationError(
+                _("Nieznane kolumny: %(columns)s."),
+                params={"columns": ", ".join(unknown_columns)},
+            )
+
+    def load_references(self):
+        """Load the dictionaries of the primary keys of the related objects."""
+        for column, model, field in REFERENCES:
+            references = self.references[column] = {}
+            for pk, value in model.objects.values_list("pk", field).iterator():
+                references[value] = _AMBIGUOUS if value in references else pk
+
+    def resolve(self, column, value):
+        """Return the primary key of the object referred to by the value."""
+        if not value:
+            return None
+
+        pk = self.references[column].get(value)
+        if pk is None:
+            raise ValidationError(
+                _("Nieznana wartość '%(value)s' w kolumnie %(column)s."),
+                params={"value": value, "column": column},
+            )
+        if pk is _AMBIGUOUS:
+            raise ValidationError(
+                _("Niejednoznaczna wartość '%(value)s' w kolumnie %(column)s."),
+                params={"value": value, "column": column},
+            )
+
+        return pk
+
+    def parse_row(self, row):
+        """Return the data of the row, validated and with the references resolved."""
+        values = {
+            column: (value or "").strip()
+            for column, value in row.items()
+            if column not in IGNORED_COLUMNS
+        }
+
+        if not values.get("username"):
+            raise ValidationError(_("Brak nazwy użytkownika."))
+
+        employee = {}
+        if "orcid" in values:
+            employee["orcid"] = values["orcid"] or None
+            if employee["orcid"] is not None:
+                Employee._meta.get_field("orcid").run_validators(employee["orcid"])
+        if "in_evaluation" in values:
+            in_evaluation = values["in_evaluation"].lower()
+            if in_evaluation not in TRUE_VALUES + FALSE_VALUES:
+                raise ValidationError(
+                    _("Nieprawidłowa wartość '%(value)s' w kolumnie in_evaluation."),
+                    params={"value": values["in_evaluation"]},
+                )
+            employee["in_evaluation"] = in_evaluation in TRUE_VALUES
+        for column in ("status", "degree", "discipline"):
+            if column in values:
+                employee[f"{column}_id"] = self.resolve(column, values[column])
+
+        employment = None
+        if values.get("employment_id") or any(
+            values.get(column) for column in EMPLOYMENT_FIELDS
+        ):
+            employment_id = values.get("employment_id") or None
+            if employment_id is not None and not employment_id.isdigit():
+                raise ValidationError(
+                    _("Nieprawidłowe ID zatrudnienia '%(value)s'."),
+                    params={"value": employment_id},
+                )
+            employment = {
+                "id": employment_id and int(employment_id),
+                **{
+                    f"{column}_id": self.resolve(column, values[column])
+                    for column in EMPLOYMENT_FIELDS
+                    if column in values
+                },
+            }
+
+        return {
+            "username": values["username"],
+            "last_name": values.get("last_name"),
+            "first_name": values.get("first_name"),
+            "employee": employee,
+            "employment": employment,
+        }
+
+    def add_error(self, line_number, error):
+        """Record the error of the row of the given line number."""
+        for message in error.messages:
+            self.errors.append((line_number, message))
+
+    def write_batch(self, batch):
+        """Write the users, employees and employments of the batch of the rows."""
+        batch = self.check_employments(self.check_orcids(batch))
+        users = self.write_users(batch)
+        employees = self.write_employees(batch, users)
+        self.write_employments(batch, employees)
+
+        # The bulk operations do not send the signals updating the search index
+        # and the evaluation counters
+        search_index.update_objects(User, [user.pk for user in users.values()])
+        evaluation.refresh([employee.pk for employee in employees.values()])
+
+    def check_orcids(self, batch):
+        """Return the batch without the rows of the ORCIDs of the other employees."""
+        orcids = {row["employee"].get("orcid") for line_number, row in batch} - {None}
+        self.orcids.update(
+            (orcid, username)
+            for orcid, username in Employee.objects.filter(
+                orcid__in=orcids
+            ).values_list("orcid", "user__username")
+            if orcid not in self.orcids
+        )
+
+        checked_batch = []
+        for line_number, row in batch:
+            orcid = row["employee"].get("orcid")
+            if orcid is not None:
+                username = self.orcids.setdefault(orcid, row["username"])
+                if username != row["username"]:
+                    self.add_error(
+                        line_number,
+                        ValidationError(
+                            _("ORCID %(orcid)s jest przypisany do %(username)s."),
+                            params={"orcid": orcid, "username": username},
+                        ),
+                    )
+                    continue
+            checked_batch.append((line_number, row))
+
+        return checked_batch
+
+    def check_employments(self, batch):
+        """Return the batch without the rows of the employments of the others."""
+        owners = dict(
+            Employment.objects.filter(
+                pk__in={
+                    row["employment"]["id"]
+                    for line_number, row in batch
+                    if row["employment"] and row["employment"]["id"]
+                }
+            ).values_list("pk", "employee__user__username")
+        )
+
+        checked_batch = []
+        for line_number, row in batch:
+            employment_id = row["employment"] and row["employment"]["id"]
+            if employment_id and owners.get(employment_id) != row["username"]:
+                self.add_error(
+                    line_number,
+                    ValidationError(
+                        _("Pracownik nie ma zatrudnienia o ID %(id)s."),
+                        params={"id": employment_id},
+                    ),
+                )
+                continue
+            checked_batch.append((line_number, row))
+
+        return checked_batch
+
+    def write_users(self, batch):
+        """Create the missing users and return all the users of the batch."""
+        usernames = {row["username"] for line_number, row in batch}
+        users = User.objects.in_bulk(usernames, field_name="username")
+
+        new_users, updated_users = {}, {}
+        for line_number, row in batch:
+            user = users.get(row["username"]) or new_users.get(row["username"])
+            if user is None:
+                user = new_users[row["username"]] = User(
+                    username=row["username"],
+                    slug=row["username"],
+                )
+                user.set_unusable_password()
+            for field in ("last_name", "first_name"):
+                if row[field] is not None and getattr(user, field) != row[field]:
+                    setattr(user, field, row[field])
+                    if user.pk is not None:
+                        updated_users[user.pk] = user
+
+        if new_users:
+            taken_slugs = set(
+                User.objects.filter(slug__in=new_users).values_list("slug", flat=True)
+            )
+            for user in new_users.values():
+                if user.slug in taken_slugs:
+                    user.slug = None
+            User.objects.bulk_create(new_users.values(), batch_size=self.batch_size)
+            users.update(User.objects.in_bulk(list(new_users), field_name="username"))
+            self.created["users"] += len(new_users)
+
+        if updated_users:
+            User.objects.bulk_update(
+                updated_users.values(),
+                ["last_name", "first_name"],
+                batch_size=self.batch_size,
+            )
+            self.updated["users"] += len(updated_users)
+
+        return users
+
+    def write_employees(self, batch, users):
+        """Create or update the employees and return them by the usernames."""
+        employees = {
+            employee.user_id: employee
+            for employee in Employee.objects.filter(
+                user__in=[user.pk for user in users.values()]
+            )
+        }
+
+        new_employees, updated_employees = {}, {}
+        for line_number, row in batch:
+            user = users[row["username"]]
+            employee = employees.get(user.pk)
+            if employee is None:
+                employee = new_employees.setdefault(user.pk, Employee(user=user))
+            else:
+                updated_employees[user.pk] = employee
+            for field, value in row["employee"].items():
+                setattr(employee, field, value)
+
+        if new_employees:
+            Employee.objects.bulk_create(
+                new_employees.values(), batch_size=self.batch_size
+            )
+            employees.update(
+                (employee.user_id, employee)
+                for employee in Employee.objects.filter(user__in=list(new_employees))
+            )
+            self.created["employees"] += len(new_employees)
+
+        if updated_employees and set(EMPLOYEE_FIELDS) & set(self.columns):
+            Employee.objects.bulk_update(
+                updated_employees.values(),
+                [field for field in EMPLOYEE_FIELDS if field in self.columns],
+                batch_size=self.batch_size,
+            )
+            self.updated["employees"] += len(updated_employees)
+
+        return {username: employees[user.pk] for username, user in users.items()}
+
+    def write_employments(self, batch, employees):
+        """Create or update the employments of the batch of the rows."""
+        employments = Employment.objects.in_bulk(
+            {
+                row["employment"]["id"]
+                for line_number, row in batch
+                if row["employment"] and row["employment"]["id"]
+            }
+        )
+
+        new_employments, updated_employments = [], {}
+        for line_number, row in batch:
+            if row["employment"] is None:
+                continue
+
+            employment_id = row["employment"].pop("id")
+            if employment_id is None:
+                employment = Employment(employee=employees[row["username"]])
+                new_employments.append(employment)
+            else:
+                # The owners of the employments are checked by `check_employments`
+                employment = employments[employment_id]
+                updated_employments[employment_id] = employment
+            for field, value in row["employment"].items():
+                setattr(employment, field, value)
+
+        if new_employments:
+            Employment.objects.bulk_create(new_employments, batch_size=self.batch_size)
+            self.created["employments"] += len(new_employments)
+
+        if updated_employments and set(EMPLOYMENT_FIELDS) & set(self.columns):
+            Employment.objects.bulk_update(
+                updated_employments.values(),
+                [field for field in EMPLOYMENT_FIELDS if field in self.columns],
+                batch_size=self.batch_size,
+            )
+            self.updated["employments"] += len(updated_employments)
+
+
+def import_roster(lines, batch_size=IMPORT_BATCH_SIZE, dry_run=False):
+    """Import the roster of the employees and return the import object."""
+    return RosterImport(batch_size=batch_size, dry_run=dry_run).run(lines)
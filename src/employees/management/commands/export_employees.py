@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from employees import exports
+from employees.models import Employee
+
+
+class Command(BaseCommand):
+    """A command to export the roster of the employees to the CSV file."""
+
+    help = "Export the roster of the employees (one row per employment) to CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            default="-",
+            help="Path of the output file ('-' for the standard output).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=exports.ROSTER_CHUNK_SIZE,
+            help="Number of the rows fetched from the database at a time.",
+        )
+
+    def handle(self, *args, **options):
+        lines = exports.iter_roster_csv(
+            Employee.objects.all(),
+            chunk_size=options["chunk_size"],
+        )
+
+        if options["output"] == "-":
+            for line in lines:
+                self.stdout.write(line, ending="")
+            return None
+
+        with open(options["output"], "w", encoding="utf-8", newline="") as output:
+            output.writelines(lines)
+
+        self.stdout.write(self.style.SUCCESS(f"Exported to {options['output']}."))
@@ -0,0 +1,55 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from employees import imports
+
+
+class Command(BaseCommand):
+    """A command to import the roster of the employees from the CSV file."""
+
+    help = "Import the roster of the employees (in the export format) from CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path of the CSV file.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=imports.IMPORT_BATCH_SIZE,
+            help="Number of the rows written to the database at a time.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate the file and roll the changes back.",
+        )
+        parser.add_argument(
+            "--encoding",
+            default="utf-8-sig",
+            help="Encoding of the file.",
+        )
+
+    def handle(self, *args, **options):
+        with open(options["path"], encoding=options["encoding"], newline="") as file:
+            try:
+                roster_import = imports.import_roster(
+                    file,
+                    batch_size=options["batch_size"],
+                    dry_run=options["dry_run"],
+                )
+            except ValidationError as error:
+                raise CommandError(" ".join(error.messages))
+
+        for line_number, message in roster_import.errors:
+            self.stderr.write(f"Line {line_number}: {message}")
+
+        for name in ("users", "employees", "employments"):
+            self.stdout.write(
+                f"{name.capitalize()}: "
+                f"{roster_import.created[name]} created, "
+                f"{roster_import.updated[name]} updated."
+            )
+
+        if roster_import.dry_run:
+            self.stdout.write(self.style.WARNING("Dry run, the changes rolled back."))
+        else:
+            self.stdout.write(self.style.SUCCESS("Imported the employees."))
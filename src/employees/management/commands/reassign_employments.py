@@ -0,0 +1,89 @@
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from employees import imports, reassign
+from employees.models import Employment
+
+User = get_user_model()
+
+# Related objects referred to by the options: {field: (model, lookup field)}
+
+REFERENCES = {
+    field: (model, lookup_field)
+    for field, model, lookup_field in imports.REFERENCES
+    if field in reassign.REASSIGN_FIELDS
+}
+
+
+class Command(BaseCommand):
+    """A command to reassign the employments to other units and positions."""
+
+    help = (
+        "Set the subgroup, position or department of the employments selected by "
+        "the current ones (e.g. move all employments of the department to another "
+        "one), by a single UPDATE query."
+    )
+
+    def add_arguments(self, parser):
+        for field, (model, lookup_field) in REFERENCES.items():
+            parser.add_argument(
+                f"--{field}",
+                help=f"Select the employments of the {field} ({lookup_field}).",
+            )
+            parser.add_argument(
+                f"--to-{field}",
+                help=f"Set the {field} ({lookup_field}) of the employments.",
+            )
+        parser.add_argument(
+            "--username",
+            help="Username of the user the changes are logged by in the admin.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Count the employments to change without changing them.",
+        )
+
+    def get_object(self, field, value):
+        model, lookup_field = REFERENCES[field]
+        try:
+            return model.objects.get(**{lookup_field: value})
+        except (model.DoesNotExist, model.MultipleObjectsReturned):
+            raise CommandError(f"No single {field} of {lookup_field} {value!r}.")
+
+    def handle(self, *args, **options):
+        filters, changes = {}, {}
+        for field in REFERENCES:
+            if options[field] is not None:
+                filters[field] = self.get_object(field, options[field])
+            if options[f"to_{field}"] is not None:
+                changes[field] = self.get_object(field, options[f"to_{field}"])
+        if not filters:
+            raise CommandError("Select the employments by at least one option.")
+
+        user = None
+        if options["username"] is not None:
+            try:
+                user = User.objects.get(username=options["username"])
+            except User.DoesNotExist:
+                raise CommandError(f"No user {options['username']!r}.")
+        elif not options["dry_run"]:
+            raise CommandError("The --username is required to log the changes.")
+
+        queryset = Employment.objects.filter(**filters)
+        try:
+            reassign.validate_changes(changes, queryset)
+            if options["dry_run"]:
+                count = reassign.get_changed_employments(queryset, changes).count()
+            else:
+                count = reassign.reassign_employments(queryset, changes, user=user)
+        except ValidationError as error:
+            raise CommandError(" ".join(error.messages))
+
+        if options["dry_run"]:
+            self.stdout.write(
+                self.style.WARNING(f"Dry run, {count} employments to change.")
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Changed {count} employments."))
@@ -2,6 +2,7 @@ from django.contrib import admin
 from django.contrib.auth import get_user_model
 from django.core.validators import RegexValidator
 from django.db import models
+from django.db.models import OuterRef, Prefetch, Subquery
 from django.utils.translation import gettext_lazy as _
 
 from units.models import Department
@@ -126,6 +127,25 @@ class Subgroup(models.Model):
         self.code = self.code.upper()
 
 
+class PositionQuerySet(models.QuerySet):
+    """A class to represent the queryset of the Position objects."""
+
+    def with_group(self):
+        """
+        Fetch the Group of the positions along with them.
+
+        The subgroups are prefetched with their groups (by a single query), and
+        the name of the group is aliased as `group_name` to order the positions
+        by (the subquery is run only then).
+        """
+        subgroups = Subgroup.objects.filter(position=OuterRef("pk")).order_by("id")
+        return self.alias(
+            group_name=Subquery(subgroups.values("group__name")[:1])
+        ).prefetch_related(
+            Prefetch("subgroup_set", queryset=Subgroup.objects.select_related("group"))
+        )
+
+
 class Position(models.Model):
     """A class to represent the Position objects."""
 
@@ -136,6 +156,8 @@ class Position(models.Model):
     )
     name = models.CharField(_("nazwa"), max_length=255)
 
+    objects = PositionQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("stanowisko")
         verbose_name_plural = _("stanowiska")
@@ -148,8 +170,14 @@ class Position(models.Model):
     @admin.display(description=Group._meta.verbose_name.capitalize())
     def group(self):
         """Return the Group object related to the object via `subgroups` field."""
-        if self.subgroup_set.exists():
-            return self.subgroup_set.first().group
+        # Prefetched by `PositionQuerySet.with_group`
+        if "subgroup_set" in getattr(self, "_prefetched_objects_cache", {}):
+            subgroups = self.subgroup_set.all()
+            return subgroups[0].group if subgroups else None
+
+        subgroup = self.subgroup_set.select_related("group").first()
+        if subgroup:
+            return subgroup.group
 
 
 User = get_user_model()
@@ -236,6 +264,14 @@ class Employee(models.Model):
         return [employment.department for employment in self.employment_set.all()]
 
 
+class EmploymentQuerySet(models.QuerySet):
+    """A class to represent the queryset of the Employment objects."""
+
+    def with_group(self):
+        """Fetch the Group of the employments along with them."""
+        return self.select_related("subgroup__group")
+
+
 class Employment(models.Model):
     """A class to represent the Employment objects."""
 
@@ -266,6 +302,8 @@ class Employment(models.Model):
         null=True,
     )
 
+    objects = EmploymentQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("zatrudnienie")
         verbose_name_plural = _("zatrudnienia")
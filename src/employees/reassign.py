@@ -0,0 +1,121 @@
+from django.contrib.admin.models import LogEntry
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Value
+from django.utils.translation import gettext_lazy as _
+
+from project.utils.admin import get_change_log_entries
+from project.utils.signals import post_bulk_update, pre_bulk_update
+
+from .models import Employment, Position
+
+# Fields of the employments changed by the reassignments
+
+REASSIGN_FIELDS = ("subgroup", "position", "department")
+
+
+def validate_changes(changes, queryset=None):
+    """
+    Raise ValidationError if the employments cannot be changed as given.
+
+    If the queryset of the employments is given, the position and subgroup
+    each employment changed ends up with (the changed or the kept one) are
+    checked to belong together, by a single query.
+    """
+    if not changes:
+        raise ValidationError(_("Nie wybrano żadnej zmiany."))
+
+    unknown_fields = set(changes) - set(REASSIGN_FIELDS)
+    if unknown_fields:
+        raise ValidationError(
+            _("Nieznane pola: %(fields)s."),
+            params={"fields": ", ".join(sorted(unknown_fields))},
+        )
+
+    subgroup, position = changes.get("subgroup"), changes.get("position")
+    if (
+        subgroup is not None
+        and position is not None
+        and not position.subgroup_set.filter(pk=subgroup.pk).exists()
+    ):
+        raise ValidationError(
+            _("Stanowisko %(position)s nie należy do podgrupy %(subgroup)s."),
+            params={"position": position, "subgroup": subgroup},
+        )
+
+    if queryset is None or (subgroup is None and position is None):
+        return None
+
+    pairs = Position.subgroup_set.through.objects.filter(
+        position=OuterRef("new_position"), subgroup=OuterRef("new_subgroup")
+    )
+    invalid = (
+        get_changed_employments(queryset.order_by(), changes)
+        .annotate(
+            new_position=F("position") if position is None else Value(position.pk),
+            new_subgroup=F("subgroup") if subgroup is None else Value(subgroup.pk),
+        )
+        .filter(new_position__isnull=False, new_subgroup__isnull=False)
+        .filter(~Exists(pairs))
+        .select_related("position", "subgroup")
+        .first()
+    )
+    if invalid is not None:
+        raise ValidationError(
+            _(
+                "Stanowisko %(position)s nie należy do podgrupy %(subgroup)s "
+                "(%(employment)s)."
+            ),
+            params={
+                "position": position or invalid.position,
+                "subgroup": subgroup or invalid.subgroup,
+                "employment": invalid,
+            },
+        )
+
+
+def get_changed_employments(queryset, changes):
+    """Return the employments of the queryset the changes apply to."""
+    return queryset.exclude(**changes)
+
+
+def reassign_employments(queryset, changes, user=None):
+    """
+    Set the fields of the employments of the queryset to the related objects given.
+
+    The changes (the {field: object} dictionary, see `REASSIGN_FIELDS`) are
+    saved by a single UPDATE query of the employments changed, within the
+    transaction along with the admin history entries of the employments (if
+    the user is given). The signals of the objects are not sent, and neither
+    are the model validations run, so `pre_bulk_update` and `post_bulk_update`
+    are sent instead (updating the search index and the evaluation counters).
+    Return the number of the employments changed.
+    """
+    validate_changes(changes, queryset)
+
+    queryset = get_changed_employments(queryset.order_by(), changes)
+    using = queryset.db
+    with transaction.atomic(using=using):
+        pks = list(queryset.values_list("pk", flat=True))
+        if not pks:
+            return 0
+
+        update_fields = frozenset(changes)
+        pre_bulk_update.send(
+            sender=Employment, pks=pks, update_fields=update_fields, using=using
+        )
+        queryset.update(**changes)
+        post_bulk_update.send(
+            sender=Employment, pks=pks, update_fields=update_fields, using=using
+        )
+
+        if user is not None:
+            LogEntry.objects.using(using).bulk_create(
+                get_change_log_entries(
+                    user,
+                    [Employment(pk=pk) for pk in pks],
+                    [Employment._meta.get_field(name) for name in changes],
+                )
+            )
+
+    return len(pks)
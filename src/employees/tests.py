@@ -0,0 +1,770 @@
+import csv
+from io import StringIO
+from unittest import mock
+
+from django.contrib.admin.models import CHANGE, LogEntry
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection
+from django.db.models import Q
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from project.utils.signals import post_bulk_update
+from reports.models import EvaluationEntry
+from units.models import Department, Faculty, University
+
+from . import exports, imports, reassign
+from .models import Degree, Employee, Employment, Group, Position, Status, Subgroup
+
+User = get_user_model()
+
+
+class AdminChangelistTests(TestCase):
+    """Tests of the admin changelist views of the app models."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "pw")
+
+        university = University.objects.create(name="Uczelnia", code="U")
+        faculty = Faculty.objects.create(
+            name="Wydział", code="W", university=university
+        )
+        cls.departments = [
+            Department.objects.create(
+                name=f"Katedra {i}", code=f"K{i}", faculty=faculty
+            )
+            for i in range(2)
+        ]
+        group = Group.objects.create(name="Grupa", code="G")
+        cls.subgroup = Subgroup.objects.create(group=group, name="Podgrupa", code="P")
+        cls.position = Position.objects.create(name="Stanowisko")
+        cls.position.subgroup_set.add(cls.subgroup)
+        cls.status = Status.objects.create(name="Status", code="S")
+        cls.degree = Degree.objects.create(code="dr")
+
+    def create_employees(self, count):
+        for _ in range(count):
+            index = Employee.objects.count()
+            user = User.objects.create_user(
+                f"user{index}", last_name=f"Nazwisko{index}"
+            )
+            employee = Employee.objects.create(
+                user=user,
+                status=self.status,
+                degree=self.degree,
+            )
+            for department in self.departments:
+                Employment.objects.create(
+                    employee=employee,
+                    position=self.position,
+                    subgroup=self.subgroup,
+                    department=department,
+                )
+
+    def create_positions(self, count):
+        for _ in range(count):
+            position = Position.objects.create(name="Stanowisko")
+            position.subgroup_set.add(self.subgroup)
+
+    def count_changelist_queries(self, model_name):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                reverse(f"admin:employees_{model_name}_changelist")
+            )
+        self.assertEqual(response.status_code, 200)
+        return len(context)
+
+    def assertQueryCountConstant(self, model_name, create_objects):
+        self.client.force_login(self.admin)
+        self.count_changelist_queries(model_name)  # warm up the per-process caches
+
+        create_objects(2)
+        query_count = self.count_changelist_queries(model_name)
+
+        create_objects(8)
+        self.assertEqual(self.count_changelist_queries(model_name), query_count)
+
+    def test_employee_query_count_does_not_depend_on_rows_count(self):
+        self.assertQueryCountConstant("employee", self.create_employees)
+
+    def test_employment_query_count_does_not_depend_on_rows_count(self):
+        self.assertQueryCountConstant("employment", self.create_employees)
+
+    def test_position_query_count_does_not_depend_on_rows_count(self):
+        self.assertQueryCountConstant("position", self.create_positions)
+
+    def post_list_editable(self, values, query=""):
+        data = {
+            "form-TOTAL_FORMS": len(values),
+            "form-INITIAL_FORMS": len(values),
+            "_save": "Zapisz",
+        }
+        for i, (pk, in_evaluation) in enumerate(values.items()):
+            data[f"form-{i}-id"] = pk
+            if in_evaluation:
+                data[f"form-{i}-in_evaluation"] = "on"
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(
+                f"{reverse('admin:employees_employee_changelist')}?{query}", data
+            )
+        self.assertEqual(response.status_code, 302)
+        return len(context)
+
+    def test_list_editable_bulk_save(self):
+        self.client.force_login(self.admin)
+        self.create_employees(4)
+        pks = list(Employee.objects.values_list("pk", flat=True))
+
+        received = []
+
+        def receiver(sender, pks, update_fields, **kwargs):
+            received.append((sorted(pks), update_fields))
+
+        post_bulk_update.connect(receiver, sender=Employee)
+        self.addCleanup(post_bulk_update.disconnect, receiver, sender=Employee)
+
+        query_count = self.post_list_editable({pk: pk in pks[:2] for pk in pks})
+        self.assertEqual(
+            set(
+                Employee.objects.filter(in_evaluation=True).values_list("pk", flat=True)
+            ),
+            set(pks[:2]),
+        )
+        self.assertEqual(received, [(pks[:2], frozenset({"in_evaluation"}))])
+        self.assertEqual(
+            LogEntry.objects.filter(action_flag=CHANGE).count(),
+            2,
+        )
+        self.assertEqual(EvaluationEntry.objects.count(), 2)
+
+        # The unchanged rows are neither updated nor logged
+        self.create_employees(8)
+        pks = list(Employee.objects.values_list("pk", flat=True))
+        self.assertLessEqual(
+            self.post_list_editable({pk: pk in pks[1:3] for pk in pks}),
+            query_count,
+        )
+        self.assertEqual(LogEntry.objects.filter(action_flag=CHANGE).count(), 4)
+        self.assertEqual(
+            [changed_pks for changed_pks, fields in received[1:]], [[pks[0], pks[2]]]
+        )
+
+    def test_list_editable_bulk_save_of_current_page(self):
+        self.client.force_login(self.admin)
+        self.create_employees(2)
+        pks = list(Employee.objects.values_list("pk", flat=True))
+
+        # The employees not listed by the changelist are not changed
+        self.post_list_editable({pk: True for pk in pks}, query="q=Nazwisko1")
+        self.assertEqual(
+            list(
+                Employee.objects.filter(in_evaluation=True).values_list("pk", flat=True)
+            ),
+            [pks[1]],
+        )
+
+    def test_position_ordering_by_group(self):
+        self.client.force_login(self.admin)
+        url = reverse("admin:employees_position_changelist")
+        other_group = Group.objects.create(name="Inna grupa", code="I")
+        other_subgroup = Subgroup.objects.create(
+            group=other_group, name="Inna podgrupa", code="I"
+        )
+        other_position = Position.objects.create(name="Inne stanowisko")
+        other_position.subgroup_set.add(other_subgroup)
+        Position.objects.create(name="Bez grupy")
+
+        def get_positions():
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url, {"o": "-3"})
+            positions = list(response.context["cl"].result_list)
+            self.assertIn(other_position, positions)  # the groups are rendered
+            return positions, len(context)
+
+        get_positions()  # warm up
+        # The positions without a group are ordered as NULLs by the database
+        positions, query_count = get_positions()
+        self.assertEqual(
+            [position for position in positions if position.group],
+            [other_position, self.position],
+        )
+        self.assertEqual(positions[positions.index(self.position)].group.code, "G")
+
+        for i in range(5):
+            Position.objects.create(name=f"Stanowisko {i}").subgroup_set.add(
+                other_subgroup
+            )
+        self.assertEqual(get_positions()[1], query_count)
+
+
+class PositionGroupTests(TestCase):
+    """Tests of the Group of the Position objects."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = Group.objects.create(name="Grupa", code="G")
+        subgroup = Subgroup.objects.create(group=cls.group, name="Podgrupa", code="P")
+        cls.position = Position.objects.create(name="Stanowisko")
+        cls.position.subgroup_set.add(subgroup)
+        cls.other_position = Position.objects.create(name="Inne stanowisko")
+
+    def test_group_prefetched(self):
+        with self.assertNumQueries(2):
+            positions = list(Position.objects.with_group())
+            self.assertEqual(positions[0].group, self.group)
+            self.assertEqual(positions[0].group.name, self.group.name)
+            self.assertIsNone(positions[1].group)
+
+    def test_group_not_annotated(self):
+        position, other_position = Position.objects.all()
+
+        self.assertEqual(position.group, self.group)
+        self.assertIsNone(other_position.group)
+
+
+class RosterExportTests(TestCase):
+    """Tests of the export of the roster of the employees."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "pw")
+
+        university = University.objects.create(name="Uczelnia", code="U")
+        faculty = Faculty.objects.create(
+            name="Wydział", code="W", university=university
+        )
+        department = Department.objects.create(
+            name="Katedra", code="K", faculty=faculty
+        )
+        group = Group.objects.create(name="Grupa", code="G")
+        subgroup = Subgroup.objects.create(group=group, name="Podgrupa", code="P")
+        position = Position.objects.create(name="Stanowisko")
+
+        for index in range(3):
+            employee = Employee.objects.create(
+                user=User.objects.create_user(f"user{index}", last_name="Nazwisko"),
+                orcid=f"0000-0000-0000-000{index}",
+            )
+            for _ in range(index):
+                Employment.objects.create(
+                    employee=employee,
+                    subgroup=subgroup,
+                    position=position,
+                    department=department,
+                )
+
+    def read_rows(self, lines):
+        return list(csv.DictReader(StringIO("".join(lines))))
+
+    def test_one_row_per_employment(self):
+        with self.assertNumQueries(1):
+            rows = self.read_rows(
+                exports.iter_roster_csv(Employee.objects.all(), chunk_size=2)
+            )
+
+        self.assertEqual(len(rows), 1 + 1 + 2)
+        self.assertEqual(rows[0]["username"], "user0")
+        self.assertEqual(rows[0]["employment_id"], "")
+        self.assertEqual(rows[1]["group"], "G")
+        self.assertEqual(rows[1]["position"], "Stanowisko")
+        self.assertEqual(rows[1]["department"], "K / W / U")
+
+    def test_admin_action(self):
+        self.client.force_login(self.admin)
+        response = self.client.post(
+            reverse("admin:employees_employee_changelist"),
+            {
+                "action": "export_roster",
+                "_selected_action": Employee.objects.filter(
+                    user__username__in=["user0", "user2"]
+                ).values_list("pk", flat=True),
+            },
+        )
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        rows = self.read_rows(
+            line.decode("utf-8") for line in response.streaming_content
+        )
+        self.assertEqual([row["username"] for row in rows], ["user0"] + ["user2"] * 2)
+
+    def test_command(self):
+        stdout = StringIO()
+        call_command("export_employees", stdout=stdout)
+
+        self.assertEqual(len(self.read_rows(stdout.getvalue())), 4)
+
+
+class RosterImportTests(TestCase):
+    """Tests of the import of the roster of the employees."""
+
+    HEADER = "username,last_name,status,orcid,in_evaluation,subgroup,department\n"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "pw")
+
+        university = University.objects.create(name="Uczelnia", code="U")
+        faculty = Faculty.objects.create(
+            name="Wydział", code="W", university=university
+        )
+        cls.department = Department.objects.create(
+            name="Katedra", code="K", faculty=faculty
+        )
+        group = Group.objects.create(name="Grupa", code="G")
+        cls.subgroup = Subgroup.objects.create(group=group, name="Podgrupa", code="P")
+        cls.status = Status.objects.create(name="Status", code="S")
+
+    def make_lines(self, count, start=0):
+        return [self.HEADER] + [
+            f"user{i},Nazwisko{i},S,,tak,P,K / W / U\n"
+            for i in range(start, start + count)
+        ]
+
+    def test_create(self):
+        roster_import = imports.import_roster(self.make_lines(3))
+
+        self.assertEqual(roster_import.errors, [])
+        self.assertEqual(roster_import.created["users"], 3)
+        self.assertEqual(roster_import.created["employments"], 3)
+
+        employment = Employment.objects.select_related("employee__user").first()
+        self.assertEqual(employment.employee.user.last_name, "Nazwisko0")
+        self.assertEqual(employment.employee.status, self.status)
+        self.assertTrue(employment.employee.in_evaluation)
+        self.assertEqual(employment.subgroup, self.subgroup)
+        self.assertEqual(employment.department, self.department)
+
+    def test_query_count_does_not_depend_on_rows_count(self):
+        # The evaluation counter of the rows is created once, beforehand
+        imports.import_roster(self.make_lines(1, start=50))
+
+        with CaptureQueriesContext(connection) as context:
+            imports.import_roster(self.make_lines(10))
+        query_count = len(context)
+
+        with CaptureQueriesContext(connection) as context:
+            imports.import_roster(self.make_lines(40, start=10))
+        self.assertEqual(len(context), query_count)
+
+        self.assertEqual(Employment.objects.count(), 51)
+
+    def test_round_trip_updates(self):
+        imports.import_roster(self.make_lines(2))
+        lines = list(exports.iter_roster_csv(Employee.objects.all()))
+        lines[1] = lines[1].replace("True", "False")
+
+        roster_import = imports.import_roster(lines)
+
+        self.assertEqual(roster_import.errors, [])
+        self.assertEqual(roster_import.created["employments"], 0)
+        self.assertEqual(roster_import.updated["employments"], 2)
+        self.assertEqual(Employee.objects.filter(in_evaluation=False).count(), 1)
+
+    def test_dry_run(self):
+        roster_import = imports.import_roster(self.make_lines(2), dry_run=True)
+
+        self.assertEqual(roster_import.created["employees"], 2)
+        self.assertFalse(Employee.objects.exists())
+
+    def test_errors(self):
+        lines = self.make_lines(1) + [
+            "user1,,X,,,,\n",
+            "user2,,,1234,,,\n",
+            "user3,,,,,,K\n",
+        ]
+
+        roster_import = imports.import_roster(lines)
+
+        self.assertEqual([line for line, _ in roster_import.errors], [3, 4, 5])
+        self.assertEqual(Employee.objects.count(), 1)
+
+    def test_employment_of_other_employee(self):
+        imports.import_roster(self.make_lines(2))
+        employment = Employment.objects.get(employee__user__username="user1")
+        lines = [
+            "username,last_name,employment_id,department\n",
+            f"user0,Kowalski,{employment.pk},K / W / U\n",
+        ]
+
+        roster_import = imports.import_roster(lines)
+
+        # The row is rejected as a whole, with the user left unchanged
+        self.assertEqual([line for line, _ in roster_import.errors], [2])
+        self.assertEqual(User.objects.get(username="user0").last_name, "Nazwisko0")
+
+    def test_integrity_error(self):
+        self.client.force_login(self.admin)
+        with mock.patch.object(
+            imports.RosterImport, "write_batch", side_effect=IntegrityError
+        ):
+            response = self.client.post(
+                reverse("admin:employees_employee_import"),
+                {
+                    "file": SimpleUploadedFile(
+                        "roster.csv", "".join(self.make_lines(2)).encode("utf-8")
+                    ),
+                },
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["form"].has_error("file"))
+        self.assertFalse(Employee.objects.exists())
+
+    def test_admin_view(self):
+        self.client.force_login(self.admin)
+        url = reverse("admin:employees_employee_import")
+        response = self.client.post(
+            url,
+            {
+                "file": SimpleUploadedFile(
+                    "roster.csv", "".join(self.make_lines(2)).encode("utf-8")
+                ),
+                "dry_run": "on",
+            },
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["roster_import"].created["employees"], 2)
+        self.assertFalse(Employee.objects.exists())
+        self.assertContains(
+            self.client.get(reverse("admin:employees_employee_changelist")), url
+        )
+
+
+class EmploymentReassignTests(TestCase):
+    """Tests of the set-based reassignment of the employments."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "pw")
+
+        university = University.objects.create(name="Uczelnia", code="U")
+        faculty = Faculty.objects.create(
+            name="Wydział", code="W", university=university
+        )
+        cls.departments = [
+            Department.objects.create(
+                name=f"Katedra {i}", code=f"K{i}", faculty=faculty
+            )
+            for i in range(2)
+        ]
+        group = Group.objects.create(name="Grupa", code="G")
+        cls.subgroup = Subgroup.objects.create(group=group, name="Podgrupa", code="P")
+        cls.positions = [
+            Position.objects.create(name=f"Stanowisko {i}") for i in range(2)
+        ]
+        for position in cls.positions:
+            position.subgroup_set.add(cls.subgroup)
+        cls.status = Status.objects.create(name="Status", code="S")
+
+    def create_employments(self, count, department, position=None):
+        for i in range(count):
+            index = Employee.objects.count()
+            employee = Employee.objects.create(
+                user=User.objects.create_user(f"user{index}"),
+                status=self.status,
+                in_evaluation=True,
+            )
+            Employment.objects.create(
+                employee=employee,
+                position=position or self.positions[0],
+                subgroup=self.subgroup,
+                department=department,
+            )
+
+    def test_reassign(self):
+        old, new = self.departments
+        self.create_employments(3, old)
+        self.create_employments(2, new)
+
+        queryset = Employment.objects.filter(department=old)
+        with CaptureQueriesContext(connection) as context:
+            count = reassign.reassign_employments(
+                queryset, {"department": new}, user=self.admin
+            )
+        query_count = len(context)
+
+        self.assertEqual(count, 3)
+        self.assertEqual(Employment.objects.filter(department=new).count(), 5)
+        self.assertEqual(LogEntry.objects.filter(action_flag=CHANGE).count(), 3)
+        self.assertEqual(
+            set(EvaluationEntry.objects.values_list("department_id", flat=True)),
+            {new.pk},
+        )
+
+        # The number of the queries does not depend on the number of the rows
+        self.create_employments(10, old)
+        with CaptureQueriesContext(connection) as context:
+            reassign.reassign_employments(queryset, {"department": new})
+        self.assertLessEqual(len(context), query_count)
+
+        self.assertEqual(
+            reassign.reassign_employments(queryset, {"department": new}), 0
+        )
+
+    def test_validation(self):
+        position = Position.objects.create(name="Stanowisko spoza podgrupy")
+        with self.assertRaises(ValidationError):
+            reassign.reassign_employments(Employment.objects.all(), {})
+        with self.assertRaises(ValidationError):
+            reassign.reassign_employments(
+                Employment.objects.all(),
+                {"subgroup": self.subgroup, "position": position},
+            )
+
+    def test_validation_of_kept_values(self):
+        self.create_employments(2, self.departments[0])
+        other_group = Group.objects.create(name="Inna grupa", code="I")
+        other_subgroup = Subgroup.objects.create(
+            group=other_group, name="Inna podgrupa", code="I"
+        )
+        other_position = Position.objects.create(name="Inne stanowisko")
+        other_position.subgroup_set.add(other_subgroup)
+        queryset = Employment.objects.filter(subgroup=self.subgroup)
+
+        for changes in ({"position": other_position}, {"subgroup": other_subgroup}):
+            with self.subTest(changes=changes):
+                with self.assertNumQueries(1), self.assertRaises(ValidationError):
+                    reassign.validate_changes(changes, queryset)
+                self.assertFalse(
+                    Employment.objects.filter(
+                        Q(position=other_position) | Q(subgroup=other_subgroup)
+                    ).exists()
+                )
+
+        with self.assertRaises(CommandError):
+            call_command(
+                "reassign_employments",
+                subgroup=self.subgroup.code,
+                position=self.positions[0].name,
+                to_position=other_position.name,
+                username="admin",
+            )
+
+        # Both values changed to the ones belonging together
+        reassign.validate_changes(
+            {"position": other_position, "subgroup": other_subgroup}, queryset
+        )
+        reassign.validate_changes({"position": self.positions[1]}, queryset)
+
+    def test_admin_action(self):
+        self.create_employments(2, self.departments[0])
+        self.create_employments(1, self.departments[1])
+        self.client.force_login(self.admin)
+
+        url = reverse("admin:employees_employment_changelist")
+        data = {
+            "action": "reassign_employments",
+            "index": 0,
+            "select_across": 1,
+            "_selected_action": Employment.objects.values_list("pk", flat=True)[:1],
+            "position": self.positions[1].pk,
+        }
+        query_string = f"?department={self.departments[0].pk}"
+
+        response = self.client.post(f"{url}{query_string}", data)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["selected_count"], 2)
+        self.assertIsNone(response.context["count"])
+
+        response = self.client.post(f"{url}{query_string}", {**data, "_preview": 1})
+        self.assertEqual(response.context["count"], 2)
+        self.assertEqual(
+            Employment.objects.filter(position=self.positions[1]).count(), 0
+        )
+
+        response = self.client.post(f"{url}{query_string}", {**data, "_confirm": 1})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            set(
+                Employment.objects.filter(position=self.positions[1]).values_list(
+                    "department", flat=True
+                )
+            ),
+            {self.departments[0].pk},
+        )
+
+    def test_command(self):
+        self.create_employments(2, self.departments[0])
+        options = {
+            "department": self.departments[0].full_code,
+            "to_department": self.departments[1].full_code,
+        }
+
+        stdout = StringIO()
+        call_command("reassign_employments", dry_run=True, stdout=stdout, **options)
+        self.assertIn("2 employments to change", stdout.getvalue())
+
+        with self.assertRaises(CommandError):
+            call_command("reassign_employments", **options)
+
+        call_command(
+            "reassign_employments", username="admin", stdout=StringIO(), **options
+        )
+        self.assertEqual(
+            Employment.objects.filter(department=self.departments[1]).count(), 2
+        )
+
+
+class EmployeeApiTests(TestCase):
+    """Tests of the JSON API of the employees."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "pw")
+
+        university = University.objects.create(name="Uczelnia", code="U")
+        faculty = Faculty.objects.create(
+            name="Wydział", code="W", university=university
+        )
+        cls.department = Department.objects.create(
+            name="Katedra", code="K", faculty=faculty
+        )
+        group = Group.objects.create(name="Grupa", code="G")
+        cls.subgroup = Subgroup.objects.create(group=group, name="Podgrupa", code="P")
+        cls.status = Status.objects.create(name="Status", code="S")
+
+    def create_employees(self, count):
+        for _ in range(count):
+            index = Employee.objects.count()
+            employee = Employee.objects.create(
+                user=User.objects.create_user(f"user{index}", last_name="Łącki"),
+                status=self.status,
+            )
+            Employment.objects.create(
+                employee=employee, subgroup=self.subgroup, department=self.department
+            )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_access(self):
+        self.create_employees(1)
+        employee = Employee.objects.get()
+        urls = [
+            reverse("employees:list"),
+            reverse("employees:detail", args=[employee.pk]),
+        ]
+
+        self.client.logout()
+        for url in urls:
+            self.assertEqual(self.client.get(url).status_code, 403)
+
+        # The staff users need the permission to view the employees
+        staff = User.objects.create_user("staff", is_staff=True)
+        self.client.force_login(staff)
+        for url in urls:
+            self.assertEqual(self.client.get(url).status_code, 403)
+
+        staff.user_permissions.add(Permission.objects.get(codename="view_employee"))
+        staff = User.objects.get(pk=staff.pk)
+        self.client.force_login(staff)
+        for url in urls:
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_list(self):
+        self.create_employees(3)
+
+        response = self.client.get(reverse("employees:list"))
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data["results"]), 3)
+        self.assertIsNone(data["next"])
+        self.assertEqual(data["results"][0]["last_name"], "Łącki")
+        self.assertEqual(data["results"][0]["status"], "S")
+        self.assertIsNone(data["results"][0]["degree"])
+        self.assertEqual(
+            data["results"][0]["employments"][0],
+            {
+                "id": Employment.objects.first().pk,
+                "group": "G",
+                "subgroup": "P",
+                "position": None,
+                "department": "K / W / U",
+            },
+        )
+
+    def test_query_count_does_not_depend_on_rows_count(self):
+        self.create_employees(2)
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(reverse("employees:list"))
+        query_count = len(context)
+
+        self.create_employees(8)
+        with self.assertNumQueries(query_count):
+            self.client.get(reverse("employees:list"))
+
+    def test_sparse_fields(self):
+        self.create_employees(1)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                reverse("employees:list"), {"fields": "id,orcid"}
+            )
+
+        self.assertEqual(
+            response.json()["results"],
+            [{"id": Employee.objects.get().pk, "orcid": None}],
+        )
+        self.assertFalse(
+            any("employees_employment" in query["sql"] for query in context)
+        )
+
+        response = self.client.get(reverse("employees:list"), {"fields": "salary"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_pagination(self):
+        self.create_employees(5)
+
+        pks, url = [], reverse("employees:list") + "?limit=2&fields=id"
+        while url:
+            data = self.client.get(url).json()
+            pks += [employee["id"] for employee in data["results"]]
+            url = data["next"]
+
+        self.assertEqual(pks, list(Employee.objects.values_list("pk", flat=True)))
+
+    def test_detail(self):
+        self.create_employees(1)
+        employee = Employee.objects.get()
+
+        response = self.client.get(reverse("employees:detail", args=[employee.pk]))
+        self.assertEqual(response.json()["username"], "user0")
+
+        response = self.client.get(reverse("employees:detail", args=[employee.pk + 1]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_conditional_requests(self):
+        self.create_employees(1)
+        url = reverse("employees:list")
+
+        response = self.client.get(url)
+        etag, last_modified = response["ETag"], response["Last-Modified"]
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code,
+            304,
+        )
+
+        # The logins (updating the `last_login` of the users) do not change it
+        self.admin.last_login = timezone.now()
+        self.admin.save(update_fields=["last_login"])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.department.faculty.university.name = "Politechnika"
+        self.department.faculty.university.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
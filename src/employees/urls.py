@@ -1,3 +1,10 @@
+from django.urls import path
+
+from . import views
+
 app_name = "employees"
 
-urlpatterns = []
+urlpatterns = [
+    path("", view=views.EmployeeListView.as_view(), name="list"),
+    path("<int:pk>/", view=views.EmployeeDetailView.as_view(), name="detail"),
+]
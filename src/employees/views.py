@@ -0,0 +1,81 @@
+from django.contrib.auth import get_user_model
+
+from project.utils import api
+from units.models import Department, Faculty, University
+
+from .models import (
+    Degree,
+    Discipline,
+    Employee,
+    Employment,
+    Group,
+    Position,
+    Status,
+    Subgroup,
+)
+
+EMPLOYMENT_SERIALIZER = api.Serializer(
+    Employment,
+    {
+        "id": api.Field(),
+        "group": api.Field("subgroup.group.code", select_related="subgroup__group"),
+        "subgroup": api.Field("subgroup.code", select_related="subgroup"),
+        "position": api.Field("position.name", select_related="position"),
+        "department": api.Field("department.full_code", select_related="department"),
+    },
+)
+
+EMPLOYEE_SERIALIZER = api.Serializer(
+    Employee,
+    {
+        "id": api.Field(),
+        "username": api.Field("user.username", select_related="user"),
+        "first_name": api.Field("user.first_name", select_related="user"),
+        "last_name": api.Field("user.last_name", select_related="user"),
+        "degree": api.Field("degree.code", select_related="degree"),
+        "status": api.Field("status.code", select_related="status"),
+        "orcid": api.Field(),
+        "in_evaluation": api.Field(),
+        "discipline": api.Field("discipline.code", select_related="discipline"),
+        "employments": api.Field(
+            "employment_set",
+            serializer=EMPLOYMENT_SERIALIZER,
+            many=True,
+            prefetch_related="employment_set",
+        ),
+    },
+)
+
+# Models the serialized employees data depend on (the full codes of the
+# departments are updated in bulk when their parent units change)
+
+EMPLOYEE_DEPENDENCIES = (
+    get_user_model(),
+    Employee,
+    Employment,
+    Degree,
+    Status,
+    Discipline,
+    Group,
+    Subgroup,
+    Position,
+    University,
+    Faculty,
+    Department,
+)
+
+
+class EmployeeListView(api.ApiListView):
+    """A view to return the list of the employees as JSON data."""
+
+    serializer = EMPLOYEE_SERIALIZER
+    dependencies = EMPLOYEE_DEPENDENCIES
+    permission_required = "employees.view_employee"
+
+
+class EmployeeDetailView(api.ApiDetailView):
+    """A view to return the employee's data as JSON data."""
+
+    serializer = EMPLOYEE_SERIALIZER
+    dependencies = EMPLOYEE_DEPENDENCIES
+    permission_required = "employees.view_employee"
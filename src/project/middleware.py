@@ -0,0 +1,89 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from .utils.metrics import RequestMetrics, registry
+from .utils.queries import RepeatedQueriesDetector, get_view_threshold
+
+UNRESOLVED_VIEW_NAME = "<unresolved>"
+
+
+class InstrumentationMiddleware:
+    """
+    A class to represent the middleware recording the metrics of the requests.
+
+    The middleware records the time of the request, the number and time of the
+    database queries (timed by the execute wrappers of the connections), the
+    time of the rendering of the template responses (including the queries run
+    by the templates) and the hits and misses of the cache recorded by the
+    project code (see `metrics.record_cache_access`). The metrics are sent in
+    the Server-Timing header of the response (if `METRICS_SERVER_TIMING`) and
+    aggregated per view by the registry exposed at the `/metrics` endpoint.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = metrics.activate()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            metrics.deactivate(token)
+        metrics.stop()
+
+        match = request.resolver_match
+        registry.add(
+            match.view_name if match else UNRESOLVED_VIEW_NAME,
+            request.method,
+            response.status_code,
+            metrics,
+        )
+        if settings.METRICS_SERVER_TIMING:
+            response["Server-Timing"] = metrics.get_server_timing()
+
+        return response
+
+    def process_template_response(self, request, response):
+        metrics = RequestMetrics.get_current()
+        if metrics is not None:
+            metrics.template_start = time.perf_counter()
+            response.add_post_render_callback(metrics.stop_template)
+
+        return response
+
+
+class RepeatedQueriesMiddleware:
+    """
+    A class to represent the middleware detecting the queries repeated by views.
+
+    The queries of the request are counted by the shape from the resolution of
+    the view on (see `queries.RepeatedQueriesDetector`), with the threshold set
+    by the view, its class or its model admin (see `queries.get_view_threshold`).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.repeated_queries_detector = detector = RepeatedQueriesDetector(
+            request.path, action=settings.REPEATED_QUERIES_ACTION
+        )
+        if detector.action is None:
+            return self.get_response(request)
+
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(detector))
+            return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        detector = request.repeated_queries_detector
+        detector.label = request.resolver_match.view_name or detector.label
+        detector.threshold = get_view_threshold(view_func)
@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/4.0/ref/settings/
 from os import getenv
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 from dotenv import load_dotenv
 
 # Load .env
@@ -59,6 +61,9 @@ INSTALLED_APPS = [
     "accounts",
     "units",
     "employees",
+    "search",
+    "reports",
+    "benchmarks",
 ]
 
 # Options for django-admin-interface
@@ -69,6 +74,8 @@ SILENCED_SYSTEM_CHECKS = ["security.W019"]
 
 
 MIDDLEWARE = [
+    "project.middleware.InstrumentationMiddleware",
+    "project.middleware.RepeatedQueriesMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -126,6 +133,38 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.0/ref/settings/#caches
+
+# The cached data derived from the models (e.g. the counts, the lookup choices
+# and the unit tree) is keyed by the versions of the data of the models kept by
+# the cache as well (see `project.utils.cache.get_model_versions`), so the cache
+# must be shared by all the processes serving the requests (e.g. by Redis or
+# Memcached), otherwise the changes saved by one process are not seen by the
+# others. The process-local memory cache is allowed for a single process only.
+
+CACHES = {
+    "default": {
+        "BACKEND": getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": getenv("CACHE_LOCATION", ""),
+    }
+}
+
+# Number of the processes serving the requests (the variable is read by the
+# Gunicorn server as well)
+
+WEB_CONCURRENCY = int(getenv("WEB_CONCURRENCY", 1))
+
+if (
+    WEB_CONCURRENCY > 1
+    and CACHES["default"]["BACKEND"] == "django.core.cache.backends.locmem.LocMemCache"
+):
+    raise ImproperlyConfigured(
+        "The cache shared by the processes (CACHE_BACKEND) is required by "
+        "WEB_CONCURRENCY > 1."
+    )
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
 
@@ -195,6 +234,62 @@ MEDIA_ROOT = BASE_DIR / "media"
 MEDIA_URL = "media/"
 
 
+# Processing of the users' profile photos: "sync" (within the request),
+# "thread" (in the background thread pool of the web server process) or "queue"
+# (by the `process_photos` command worker)
+
+ACCOUNTS_PHOTO_PROCESSING = getenv("ACCOUNTS_PHOTO_PROCESSING", "sync")
+
+ACCOUNTS_PHOTO_WORKERS = int(getenv("ACCOUNTS_PHOTO_WORKERS", 2))
+
+# Time (in seconds) after which the photos still processing are considered
+# abandoned by their workers (e.g. killed) and processed again by the
+# `process_photos` command
+
+ACCOUNTS_PHOTO_PROCESSING_TIMEOUT = int(
+    getenv("ACCOUNTS_PHOTO_PROCESSING_TIMEOUT", 600)
+)
+
+# Sizes (in px) of the square derivatives of the users' profile photos; the
+# largest is used as the photo and the smallest as the icon of the user
+
+ACCOUNTS_PHOTO_SIZES = (32, 64, 128, 256, 512)
+
+# Formats of the derivatives; the first one is used by the photo and icon fields
+
+ACCOUNTS_PHOTO_FORMATS = ("JPEG", "WEBP")
+
+# Storage of the users' profile photos and their derivatives: the import path
+# of the storage class (e.g. "storages.backends.s3boto3.S3Boto3Storage" of
+# django-storages for the S3-compatible object storage, configured by its own
+# settings) or None for the default storage
+
+ACCOUNTS_PHOTO_STORAGE = getenv("ACCOUNTS_PHOTO_STORAGE") or None
+
+# Maximum number of pixels of the uploaded profile photos
+
+ACCOUNTS_PHOTO_MAX_PIXELS = 50_000_000
+
+
+# Instrumentation of the requests: the metrics are sent in the Server-Timing
+# header of the responses (if enabled) and exposed at /metrics to the staff and
+# the internal IPs
+
+METRICS_SERVER_TIMING = getenv("METRICS_SERVER_TIMING", "1") == "1"
+
+# Detection of the queries of the same shape repeated by the requests (e.g. by
+# the N+1 pattern) more than the threshold number of times (overridden by the
+# `repeated_queries_threshold` attribute of the views, view classes and model
+# admins): "log" (the warning), "raise" (the error, set by the test runner) or
+# None (disabled)
+
+REPEATED_QUERIES_ACTION = getenv("REPEATED_QUERIES_ACTION", "log") or None
+
+REPEATED_QUERIES_THRESHOLD = int(getenv("REPEATED_QUERIES_THRESHOLD", 10))
+
+TEST_RUNNER = "project.test_runner.TestRunner"
+
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.0/ref/settings/#default-auto-field
 
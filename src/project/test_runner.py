@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+from .utils.queries import RAISE
+
+# Tag of the slow benchmark tests, run only if requested by `--tag benchmark`
+
+BENCHMARK_TAG = "benchmark"
+
+
+class TestRunner(DiscoverRunner):
+    """
+    A class to represent the test runner failing on the repeated queries.
+
+    The benchmark tests are excluded unless their tag is requested.
+    """
+
+    def __init__(self, *args, tags=None, exclude_tags=None, **kwargs):
+        if not tags or BENCHMARK_TAG not in tags:
+            exclude_tags = {*(exclude_tags or ()), BENCHMARK_TAG}
+        super().__init__(*args, tags=tags, exclude_tags=exclude_tags, **kwargs)
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        settings.REPEATED_QUERIES_ACTION = RAISE
@@ -0,0 +1,700 @@
+import datetime
+import itertools
+import time
+import timeit
+from types import SimpleNamespace
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse
+from django.test import SimpleTestCase, TestCase, override_settings, tag
+from django.test.utils import CaptureQueriesContext
+from django.urls import path, reverse, set_urlconf
+from django.utils.safestring import mark_safe
+from django.utils.translation import gettext_lazy as _
+
+from employees.models import Employee, Employment, Group, Position, Subgroup
+from units.models import Department, Faculty, University
+
+from .test_runner import BENCHMARK_TAG
+from .utils import render_link, render_tag, render_tag_template
+from .utils.admin import CURSOR_VAR, ChangeList, RelatedModelFilter, filter_by_exists
+from .utils.cache import bump_model_version, get_model_versions
+from .utils.metrics import registry
+from .utils.queries import (
+    RepeatedQueriesError,
+    get_fingerprint,
+    get_view_threshold,
+    repeated_queries_threshold,
+)
+from .utils.urls import get_admin_change_url, get_admin_changelist_url
+from .views import METRICS_CONTENT_TYPE
+
+
+def faculties_view(request):
+    """Return the faculties and universities, one query per university."""
+    return HttpResponse(
+        ", ".join(faculty.university.code for faculty in Faculty.objects.all())
+    )
+
+
+@repeated_queries_threshold(None)
+def faculties_allowed_view(request):
+    """Return the same as `faculties_view`, with the detection disabled."""
+    return faculties_view(request)
+
+
+urlpatterns = [
+    path("backoffice/", admin.site.urls),
+    path("faculties/", faculties_view),
+    path("faculties/allowed/", faculties_allowed_view),
+]
+
+
+class RenderTagTests(SimpleTestCase):
+    """Tests of the template-free HTML tag renderer."""
+
+    cases = (
+        ("a", {"href": "/admin/?a=1&b=2"}, "Kowalski <Jan>", True),
+        ("a", {"href": "/x/", "title": '"quoted"'}, mark_safe("<b>bold</b>"), True),
+        ("a", {"href": "/x/"}, None, True),
+        ("a", {"href": "/x/"}, _("Pokaż wszystkie"), True),
+        ("a", {"href": "/x/"}, 12345, True),
+        ("a", {"href": "/x/"}, 1.5, True),
+        ("a", {"href": "/x/"}, datetime.date(2022, 6, 10), True),
+        ("a", {"href": "/x/"}, lambda: "called & escaped", True),
+        ("img", {"src": "/media/a.jpg", "alt": "Zdjęcie: Łukasz"}, None, False),
+        ("link", {"rel": "stylesheet", "href": "/static/a.css"}, "ignored", False),
+    )
+
+    def test_output_identical_to_template(self):
+        for name, attrs, content, closing_tag in self.cases:
+            with self.subTest(name=name, attrs=attrs, content=content):
+                self.assertEqual(
+                    render_tag(name, attrs, content, closing_tag),
+                    render_tag_template(name, attrs, content, closing_tag),
+                )
+
+    def test_render_link(self):
+        self.assertEqual(
+            render_link(href="/x/?a=1&b=2", content="<i>", title="t"),
+            '<a href="/x/?a=1&amp;b=2" title="t">&lt;i&gt;</a>\n',
+        )
+
+    @tag(BENCHMARK_TAG)
+    def test_faster_than_template(self):
+        args = ("a", {"href": "/admin/employees/employee/1/change/"}, "Jan", True)
+        template_time = min(
+            timeit.repeat(lambda: render_tag_template(*args), number=500, repeat=3)
+        )
+        tag_time = min(timeit.repeat(lambda: render_tag(*args), number=500, repeat=3))
+        self.assertLess(
+            tag_time,
+            template_time,
+            f"render_tag_template: {template_time * 2:.3f} ms/call, "
+            f"render_tag: {tag_time * 2:.3f} ms/call",
+        )
+
+
+class AdminURLTests(SimpleTestCase):
+    """Tests of the cached admin URL templates."""
+
+    def test_urls_identical_to_reverse(self):
+        User = get_user_model()
+        for pk in (1, 1234567890, "a b/c"):
+            with self.subTest(pk=pk):
+                self.assertEqual(
+                    get_admin_change_url(User, pk),
+                    reverse("admin:accounts_user_change", args=(pk,)),
+                )
+        self.assertEqual(
+            get_admin_changelist_url(User),
+            reverse("admin:accounts_user_changelist"),
+        )
+
+    def test_urlconf_change_invalidates_cache(self):
+        User = get_user_model()
+        self.assertEqual(
+            get_admin_change_url(User, 1), "/admin/accounts/user/1/change/"
+        )
+        with override_settings(ROOT_URLCONF="project.tests"):
+            self.assertEqual(
+                get_admin_change_url(User, 1),
+                "/backoffice/accounts/user/1/change/",
+            )
+        self.assertEqual(
+            get_admin_change_url(User, 1), "/admin/accounts/user/1/change/"
+        )
+
+        # The URLconf of the thread (e.g. set by the request) is respected too
+        set_urlconf("project.tests")
+        self.addCleanup(set_urlconf, None)
+        self.assertEqual(
+            get_admin_change_url(User, 1), "/backoffice/accounts/user/1/change/"
+        )
+
+
+class ModelVersionTests(TestCase):
+    """Tests of the versions of the data of the models."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_bumped_on_commit(self):
+        (version,) = get_model_versions(University)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            bump_model_version(University)
+            (uncommitted_version,) = get_model_versions(University)
+        self.assertNotEqual(uncommitted_version, version)
+
+        for callback in callbacks:
+            callback()
+        self.assertNotIn(
+            get_model_versions(University)[0], (version, uncommitted_version)
+        )
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+    )
+    def test_not_stored(self):
+        self.assertEqual(len(get_model_versions(University, Faculty)), 2)
+
+
+class RelatedModelFilterTests(TestCase):
+    """Tests of the lookups of the related model filter."""
+
+    def setUp(self):
+        cache.clear()
+        self.university = University.objects.create(name="Politechnika", code="P")
+        self.faculty = Faculty.objects.create(
+            name="Wydział", code="W", university=self.university
+        )
+        self.department = Department.objects.create(
+            name="Katedra", code="K", faculty=self.faculty
+        )
+
+    def test_lookups_cached(self):
+        related_filter = RelatedModelFilter(Department, "department", "full_code")
+
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                related_filter.get_lookups(), [(self.department.id, "K / W / P")]
+            )
+        with self.assertNumQueries(0):
+            related_filter.get_lookups()
+
+    def test_lookups_of_method_built_in_single_query(self):
+        related_filter = RelatedModelFilter(Department, "department", "get_full_name")
+
+        Department.objects.update(full_name="")
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                related_filter.get_lookups(),
+                [(self.department.id, "Katedra, Wydział, Politechnika")],
+            )
+
+    def test_lookups_invalidated_by_parent_change(self):
+        related_filter = RelatedModelFilter(Department, "department", "full_code")
+        related_filter.get_lookups()
+
+        self.university.code = "PW"
+        self.university.save()
+
+        self.assertEqual(
+            related_filter.get_lookups(), [(self.department.id, "K / W / PW")]
+        )
+
+    def test_lookups_invalidated_by_delete(self):
+        related_filter = RelatedModelFilter(Department, "department", "full_code")
+        related_filter.get_lookups()
+
+        self.department.delete()
+
+        self.assertEqual(related_filter.get_lookups(), [])
+
+
+def get_employee_filters():
+    """Return the related model filters of the Employee admin changelist."""
+    return [
+        RelatedModelFilter(Group, "employment__subgroup__group", "name", null=True),
+        RelatedModelFilter(Subgroup, "employment__subgroup", "name", null=True),
+        RelatedModelFilter(
+            Position, "employment__subgroup__position", "name", null=True
+        ),
+        RelatedModelFilter(Department, "employment__department", "code", null=True),
+    ]
+
+
+def filter_by_join(related_filter, queryset, value):
+    """Filter the queryset the way it was done before EXISTS subqueries were used."""
+    if value != related_filter.NULL_PARAMETER_VALUE:
+        return queryset.filter(**{related_filter.lookup: value}).distinct()
+    return queryset.filter(
+        **{related_filter.null_lookup: related_filter.null_lookup_value}
+    ).distinct()
+
+
+def create_employees_graph(employees_count, employments=None):
+    """Create the employees with the employments spanning the related models."""
+    university = University.objects.create(name="Uczelnia", code="U")
+    faculty = Faculty.objects.create(name="Wydział", code="W", university=university)
+    departments = [
+        Department.objects.create(name=f"Katedra {i}", code=f"K{i}", faculty=faculty)
+        for i in range(2)
+    ]
+    groups = [Group.objects.create(name=f"Grupa {i}", code=f"G{i}") for i in range(2)]
+    subgroups = [
+        Subgroup.objects.create(group=group, name=f"Podgrupa {i}", code=f"P{i}")
+        for i, group in enumerate(groups)
+    ]
+    positions = []
+    for i, subgroup in enumerate(subgroups):
+        position = Position.objects.create(name=f"Stanowisko {i}")
+        position.subgroup_set.add(subgroup)
+        positions.append(position)
+
+    # Employments as (subgroup, position, department) indices (None for null)
+    employments = employments or (
+        (),
+        ((0, 0, 0),),
+        ((0, 0, 0), (1, 1, 1)),
+        ((None, None, None),),
+        ((1, None, 0), (1, 1, None)),
+    )
+
+    User = get_user_model()
+    User.objects.bulk_create(
+        [User(username=f"user{i}", slug=f"user{i}") for i in range(employees_count)],
+        batch_size=1000,
+    )
+    employees = Employee.objects.bulk_create(
+        [
+            Employee(user=user)
+            for user in User.objects.filter(username__startswith="user")
+        ],
+        batch_size=1000,
+    )
+    employees = Employee.objects.order_by("pk")
+
+    def pick(objects, index):
+        return None if index is None else objects[index]
+
+    Employment.objects.bulk_create(
+        [
+            Employment(
+                employee=employee,
+                subgroup=pick(subgroups, subgroup),
+                position=pick(positions, position),
+                department=pick(departments, department),
+            )
+            for employee, pattern in zip(employees, itertools.cycle(employments))
+            for subgroup, position, department in pattern
+        ],
+        batch_size=1000,
+    )
+
+
+class RelatedModelFilterExistsTests(TestCase):
+    """Tests of the filtering by the related model filter with EXISTS subqueries."""
+
+    @classmethod
+    def setUpTestData(cls):
+        create_employees_graph(10)
+
+    def get_values(self, related_filter):
+        return [
+            str(pk) for pk in related_filter.model.objects.values_list("pk", flat=True)
+        ] + [related_filter.NULL_PARAMETER_VALUE]
+
+    def assertSameResults(self, filters_values):
+        queryset, expected = Employee.objects.all(), Employee.objects.all()
+        for related_filter, value in filters_values:
+            queryset = related_filter.filter_queryset(queryset, value)
+            expected = filter_by_join(related_filter, expected, value)
+
+        pks = list(queryset.values_list("pk", flat=True))
+        self.assertEqual(len(pks), len(set(pks)))
+        self.assertEqual(sorted(pks), sorted(expected.values_list("pk", flat=True)))
+        self.assertNotIn("DISTINCT", str(queryset.query))
+
+    def test_single_filter(self):
+        for related_filter in get_employee_filters():
+            for value in self.get_values(related_filter):
+                with self.subTest(lookup=related_filter.lookup, value=value):
+                    self.assertSameResults([(related_filter, value)])
+
+    def test_stacked_filters(self):
+        for first_filter, second_filter in itertools.combinations(
+            get_employee_filters(), 2
+        ):
+            for first_value, second_value in itertools.product(
+                self.get_values(first_filter), self.get_values(second_filter)
+            ):
+                with self.subTest(
+                    lookups=(first_filter.lookup, second_filter.lookup),
+                    values=(first_value, second_value),
+                ):
+                    self.assertSameResults(
+                        [(first_filter, first_value), (second_filter, second_value)]
+                    )
+
+    def test_single_valued_lookup_joined(self):
+        queryset = filter_by_exists(Employment.objects.all(), "department", 1)
+
+        self.assertNotIn("EXISTS", str(queryset.query))
+
+    def test_admin_changelist(self):
+        admin_user = get_user_model().objects.create_superuser(
+            "admin", "admin@example.com", "pw"
+        )
+        self.client.force_login(admin_user)
+        group = Group.objects.first()
+
+        response = self.client.get(
+            reverse("admin:employees_employee_changelist"), {"group": group.pk}
+        )
+
+        self.assertEqual(
+            response.context["cl"].result_count,
+            filter_by_join(
+                get_employee_filters()[0], Employee.objects.all(), group.pk
+            ).count(),
+        )
+
+
+@tag(BENCHMARK_TAG)
+class RelatedModelFilterBenchmarkTests(TestCase):
+    """
+    Benchmark of the filtering by the related model filters.
+
+    Run by `manage.py test --tag benchmark` only.
+    """
+
+    EMPLOYEES_COUNT = 20_000
+
+    @classmethod
+    def setUpTestData(cls):
+        create_employees_graph(
+            cls.EMPLOYEES_COUNT,
+            employments=(((0, 0, 0), (1, 1, 1), (0, 0, 1)), ((1, 1, 0),)),
+        )
+
+        # Let the query planner know the selectivity of the indexes, the way
+        # the statistics of the production database do
+        if connection.vendor in ("sqlite", "postgresql"):
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+
+    def measure(self, filter_function, repeat=3):
+        group_filter, _, _, department_filter = get_employee_filters()
+        group, department = Group.objects.first(), Department.objects.last()
+
+        durations = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            queryset = filter_function(group_filter, Employee.objects.all(), group.pk)
+            queryset = filter_function(department_filter, queryset, department.pk)
+            count = queryset.count()
+            list(queryset.order_by("pk")[:100])
+            durations.append(time.perf_counter() - start)
+
+        return min(durations), count
+
+    def test_stacked_filters(self):
+        join_time, join_count = self.measure(filter_by_join)
+        exists_time, exists_count = self.measure(
+            lambda related_filter, queryset, value: related_filter.filter_queryset(
+                queryset, value
+            )
+        )
+
+        self.assertEqual(exists_count, join_count)
+        self.assertLess(
+            exists_time,
+            join_time,
+            f"two filters over {self.EMPLOYEES_COUNT} employees: "
+            f"joins with DISTINCT {join_time * 1000:.1f} ms, "
+            f"EXISTS {exists_time * 1000:.1f} ms",
+        )
+
+
+class KeysetPaginationTests(TestCase):
+    """Tests of the keyset pagination of the admin changelists."""
+
+    USERS_COUNT = 250
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = get_user_model().objects.create_superuser(
+            "admin", "admin@example.com", "pw"
+        )
+        get_user_model().objects.bulk_create(
+            [
+                get_user_model()(username=f"user{i:03}", slug=f"user{i:03}")
+                for i in range(cls.USERS_COUNT)
+            ]
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def get_changelist(self, url=None, **params):
+        response = self.client.get(
+            reverse("admin:accounts_user_changelist") + (url or ""), params
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.context["cl"]
+
+    def walk(self, **params):
+        cl = self.get_changelist(**params)
+        self.assertTrue(cl.keyset_pagination)
+        pages = [[user.pk for user in cl.result_list]]
+        while cl.next_url:
+            cl = self.get_changelist(cl.next_url)
+            pages.append([user.pk for user in cl.result_list])
+        return cl, pages
+
+    def test_pages_in_order(self):
+        users = get_user_model().objects.all()
+        for params, ordering in (({}, ("id",)), ({"o": "-2"}, ("-username",))):
+            with self.subTest(params=params):
+                cl, pages = self.walk(**params)
+                self.assertEqual(
+                    sum(pages, []),
+                    list(users.order_by(*ordering).values_list("pk", flat=True)),
+                )
+
+                # Back to the first page
+                backward_pages = [[user.pk for user in cl.result_list]]
+                while cl.previous_url:
+                    cl = self.get_changelist(cl.previous_url)
+                    backward_pages.insert(0, [user.pk for user in cl.result_list])
+                self.assertEqual(backward_pages, pages)
+
+    def test_no_offset(self):
+        cl = self.get_changelist()
+        cl = self.get_changelist(cl.next_url)
+        with CaptureQueriesContext(connection) as context:
+            self.get_changelist(cl.next_url)
+
+        self.assertFalse(
+            any("OFFSET" in query["sql"].upper() for query in context.captured_queries)
+        )
+
+    def test_adjacent_pages_without_extra_queries(self):
+        first_cl = self.get_changelist()
+        last_cl = self.get_changelist(self.get_changelist(first_cl.next_url).next_url)
+        limit = f"LIMIT {first_cl.list_per_page + 1}"
+
+        # The middle page reached forward and backward
+        for url in (first_cl.next_url, last_cl.previous_url):
+            with self.subTest(url=url), CaptureQueriesContext(connection) as context:
+                cl = self.get_changelist(url)
+            self.assertTrue(cl.next_url and cl.previous_url)
+            self.assertEqual(
+                [limit in query["sql"] for query in context.captured_queries].count(
+                    True
+                ),
+                1,
+            )
+            self.assertFalse(
+                any(
+                    query["sql"].endswith("LIMIT 1")
+                    for query in context.captured_queries
+                )
+            )
+
+    def test_links_reset_cursor(self):
+        cl = self.get_changelist()
+        cl = self.get_changelist(cl.next_url)
+
+        self.assertNotIn(CURSOR_VAR, cl.get_query_string({"o": "-2"}))
+        self.assertIn(CURSOR_VAR, cl.next_url)
+
+    def test_stale_cursor(self):
+        cl = self.get_changelist()
+        cl = self.get_changelist(cl.next_url + "&o=-2")
+
+        self.assertEqual(cl.result_list[0].username, "user249")
+
+    def test_estimated_count(self):
+        self.assertEqual(self.get_changelist().result_count, self.USERS_COUNT + 1)
+
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.get_changelist().result_count, self.USERS_COUNT + 1)
+        self.assertFalse(
+            any("COUNT(" in query["sql"].upper() for query in context.captured_queries)
+        )
+
+        get_user_model().objects.create_user("new")
+        self.assertEqual(self.get_changelist().result_count, self.USERS_COUNT + 2)
+
+    def test_keyset_fields(self):
+        cl = SimpleNamespace(model=Employment)
+        self.assertTrue(ChangeList.is_keyset_field(cl, "id"))
+        self.assertTrue(ChangeList.is_keyset_field(cl, "employee__user__username"))
+        self.assertFalse(ChangeList.is_keyset_field(cl, "department__full_code"))
+        self.assertFalse(ChangeList.is_keyset_field(cl, "employee"))
+
+        cl = SimpleNamespace(model=Employee)
+        self.assertFalse(ChangeList.is_keyset_field(cl, "employment__id"))
+
+
+class InstrumentationMiddlewareTests(TestCase):
+    """Tests of the metrics of the requests."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = get_user_model().objects.create_superuser(
+            "admin", "admin@example.com", "pw"
+        )
+        University.objects.create(name="Politechnika", code="P")
+
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+
+    def get_server_timing(self, response):
+        return dict(
+            (name, dict(param.split("=", 1) for param in params))
+            for name, *params in (
+                metric.split(";") for metric in response["Server-Timing"].split(", ")
+            )
+        )
+
+    def test_server_timing(self):
+        response = self.client.get(reverse("units:tree"))
+        timing = self.get_server_timing(response)
+        self.assertEqual(set(timing), {"total", "db", "template", "cache"})
+        self.assertEqual(timing["db"]["desc"], '"3 queries"')
+        self.assertEqual(timing["cache"]["desc"], '"3 hits / 4 misses"')
+
+        timing = self.get_server_timing(self.client.get(reverse("units:tree")))
+        self.assertEqual(timing["db"]["desc"], '"0 queries"')
+        self.assertEqual(timing["cache"]["desc"], '"6 hits / 0 misses"')
+
+    def test_template_time(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse("admin:units_university_changelist"))
+
+        timing = self.get_server_timing(response)
+        self.assertGreater(float(timing["template"]["dur"]), 0)
+        self.assertGreater(float(timing["total"]["dur"]), 0)
+
+    @override_settings(METRICS_SERVER_TIMING=False)
+    def test_server_timing_disabled(self):
+        self.assertNotIn("Server-Timing", self.client.get(reverse("units:tree")))
+
+    def test_metrics(self):
+        self.client.force_login(self.admin)
+        for i in range(2):
+            self.client.get(reverse("admin:units_university_changelist"))
+        self.client.get("/missing/")
+
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response["Content-Type"], METRICS_CONTENT_TYPE)
+        lines = response.content.decode().splitlines()
+        labels = 'view="admin:units_university_changelist",method="GET"'
+        self.assertIn(f'django_requests_total{{{labels},status="200"}} 2', lines)
+        self.assertIn(
+            'django_requests_total{view="<unresolved>",method="GET",status="404"} 1',
+            lines,
+        )
+        self.assertIn(
+            f'django_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2', lines
+        )
+        self.assertIn(f"django_request_duration_seconds_count{{{labels}}} 2", lines)
+        queries = [
+            line
+            for line in lines
+            if line.startswith(f"django_request_db_queries_total{{{labels}}}")
+        ]
+        self.assertEqual(len(queries), 1)
+        self.assertGreater(float(queries[0].split()[-1]), 0)
+
+    @override_settings(INTERNAL_IPS=[])
+    def test_metrics_access(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+
+        self.client.force_login(self.admin)
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 200)
+
+
+@override_settings(ROOT_URLCONF="project.tests", REPEATED_QUERIES_THRESHOLD=3)
+class RepeatedQueriesTests(TestCase):
+    """Tests of the detection of the queries repeated by the requests."""
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(5):
+            University.objects.create(
+                name=f"Uczelnia {i}", code=f"U{i}"
+            ).faculty_set.create(name="Wydział", code="W")
+
+    def test_fingerprint(self):
+        self.assertEqual(
+            get_fingerprint(
+                'SELECT "a"."id" FROM "a" WHERE ("a"."id" IN (%s, %s, %s) '
+                'AND "a"."code" = \'X\') LIMIT 21'
+            ),
+            'SELECT "a"."id" FROM "a" WHERE ("a"."id" IN (%s) '
+            'AND "a"."code" = %s) LIMIT %s',
+        )
+        self.assertEqual(
+            get_fingerprint('SELECT "T2"."id" FROM "a" T2 WHERE "T2"."id" IN (%s)'),
+            'SELECT "T2"."id" FROM "a" T2 WHERE "T2"."id" IN (%s)',
+        )
+
+    def test_raise(self):
+        with self.assertRaises(RepeatedQueriesError) as context:
+            self.client.get("/faculties/")
+
+        message = str(context.exception)
+        self.assertIn("more than 3 queries of the same shape", message)
+        self.assertIn('FROM "units_university"', message)
+        self.assertIn("in faculties_view", message)
+
+    @override_settings(REPEATED_QUERIES_THRESHOLD=5)
+    def test_below_threshold(self):
+        self.assertEqual(self.client.get("/faculties/").status_code, 200)
+
+    @override_settings(REPEATED_QUERIES_ACTION="log")
+    def test_log(self):
+        with self.assertLogs("project.utils.queries", "WARNING") as logs:
+            self.assertEqual(self.client.get("/faculties/").status_code, 200)
+        self.assertEqual(len(logs.records), 1)
+
+    def test_admin_changelists(self):
+        create_employees_graph(15)
+        self.client.force_login(
+            get_user_model().objects.create_superuser(
+                "admin", "admin@example.com", "pw"
+            )
+        )
+
+        for model in admin.site._registry:
+            with self.subTest(model=model):
+                url = reverse(
+                    f"admin:{model._meta.app_label}_{model._meta.model_name}"
+                    "_changelist"
+                )
+                self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_view_threshold(self):
+        self.assertEqual(self.client.get("/faculties/allowed/").status_code, 200)
+
+        model_admin = SimpleNamespace(repeated_queries_threshold=20)
+        self.assertEqual(get_view_threshold(SimpleNamespace()), 3)
+        self.assertEqual(
+            get_view_threshold(SimpleNamespace(model_admin=model_admin)), 20
+        )
+        self.assertEqual(
+            get_view_threshold(
+                SimpleNamespace(view_class=SimpleNamespace(), model_admin=model_admin)
+            ),
+            20,
+        )
@@ -9,12 +9,14 @@ from . import views
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("", view=views.HomeView.as_view(), name="home"),
+    path("metrics", view=views.MetricsView.as_view(), name="metrics"),
     # 3rd party apps URLs
     path("__debug__/", include("debug_toolbar.urls")),
     # Project apps URLs
     path("accounts/", include("accounts.urls")),
     path("units/", include("units.urls")),
     path("employees/", include("employees.urls")),
+    path("reports/", include("reports.urls")),
 ]
 
 urlpatterns = (
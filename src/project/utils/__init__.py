@@ -1,17 +1,62 @@
 from django.template.loader import render_to_string
+from django.utils.formats import localize
+from django.utils.html import conditional_escape
+from django.utils.safestring import mark_safe
+from django.utils.timezone import template_localtime
 
+TAG_TEMPLATE_NAME = "snippets/tag.html"
 
-def render_link(href, content, **extra_attrs):
-    """Render anchor link based on the href, content and extra attributes given."""
-    attrs = {"href": href}
-    attrs.update(extra_attrs)
 
+def _resolve_value(value):
+    """Return the value resolved the way the template engine resolves a variable."""
+    if callable(value) and not getattr(value, "do_not_call_in_templates", False):
+        return value()
+    return value
+
+
+def _render_value(value):
+    """Return the value rendered the way the template engine renders a variable."""
+    value = localize(template_localtime(value))
+    if not issubclass(type(value), str):
+        value = str(value)
+    return conditional_escape(value)
+
+
+def render_tag(name, attrs=None, content=None, closing_tag=False):
+    """
+    Render HTML tag without the use of the template engine.
+
+    The output is identical to the one of the `snippets/tag.html` template
+    rendered with the same arguments (see `render_tag_template`).
+    """
+    name = _render_value(_resolve_value(name))
+    html = f"<{name}"
+    for attr, value in (attrs or {}).items():
+        html += f' {_render_value(attr)}="{_render_value(_resolve_value(value))}"'
+    html += ">"
+    if closing_tag:
+        content = _resolve_value(content)
+        html += f"{_render_value('' if content is None else content)}</{name}>"
+
+    return mark_safe(html + "\n")
+
+
+def render_tag_template(name, attrs=None, content=None, closing_tag=False):
+    """Render HTML tag using the `snippets/tag.html` template."""
     return render_to_string(
-        template_name="snippets/tag.html",
+        template_name=TAG_TEMPLATE_NAME,
         context={
-            "name": "a",
+            "name": name,
             "content": content,
-            "closing_tag": True,
-            "attrs": attrs,
+            "closing_tag": closing_tag,
+            "attrs": attrs or {},
         },
     )
+
+
+def render_link(href, content, **extra_attrs):
+    """Render anchor link based on the href, content and extra attributes given."""
+    attrs = {"href": href}
+    attrs.update(extra_attrs)
+
+    return render_tag("a", attrs=attrs, content=content, closing_tag=True)
@@ -1,11 +1,39 @@
+import base64
+import json
+from collections import defaultdict
+from functools import reduce
+
 from django.apps import apps
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.contrib.admin import ModelAdmin as BaseModelAdmin
-from django.core.exceptions import FieldDoesNotExist
-from django.urls import reverse_lazy
+from django.contrib.admin.models import CHANGE, LogEntry
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.utils import model_ngettext
+from django.contrib.admin.views.main import PAGE_VAR
+from django.contrib.admin.views.main import ChangeList as BaseChangeList
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import FieldDoesNotExist, PermissionDenied, ValidationError
+from django.core.paginator import InvalidPage, Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import router, transaction
+from django.db.models import Exists, F, OuterRef, Q
+from django.db.models.constants import LOOKUP_SEP
+from django.forms.formsets import ManagementForm
+from django.http import HttpResponseRedirect
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
+from django.utils.translation import ngettext, override
 
 from . import render_link
+from .cache import (
+    get_cached_count,
+    get_model_versions,
+    get_or_build,
+    make_key,
+    track_model_changes,
+)
+from .signals import post_bulk_update, pre_bulk_update
+from .urls import get_admin_change_url, get_admin_changelist_url
 
 
 def related_object_link(
@@ -39,13 +67,7 @@ def related_object_link(
 
         return (
             render_link(
-                href=reverse_lazy(
-                    (
-                        f"admin:{related_model._meta.app_label}_"
-                        f"{related_model._meta.model_name}_change"
-                    ),
-                    args=(related_obj.id,),
-                ),
+                href=get_admin_change_url(related_model, related_obj.id),
                 content=getattr(related_obj, content_field or "__str__"),
             )
             if related_obj
@@ -62,28 +84,39 @@ def related_objects_links(
     content_field=None,
     max_count=None,
     list_link=True,
+    related_objects=None,
 ):
-    """Return a list of admin links to the change forms of the related objects."""
+    """
+    Return a list of admin links to the change forms of the related objects.
+
+    The related objects are fetched by the reverse relation manager of the
+    object, unless given as `related_objects` (any objects with the `id` and
+    `content_field` attributes, e.g. the nodes of the cached tree of the units).
+    """
     # Check the relationship
 
     if not isinstance(related_model, str):
         related_model = related_model._meta.model_name
 
-    related_object_set = getattr(obj, f"{related_model}_set", None)
-    if related_object_set is None or not related_object_set.exists():
-        return None
+    if related_objects is None:
+        related_object_set = getattr(obj, f"{related_model}_set", None)
+        if related_object_set is None or not related_object_set.exists():
+            return None
+        related_objects = related_object_set.all()
+        related_model = related_object_set.model
+    else:
+        if not related_objects:
+            return None
+        related_model = obj._meta.get_field(related_model).related_model
 
     # Get the links to the related objects change forms
 
     related_objects_links = [
         render_link(
-            href=reverse_lazy(
-                f"admin:{object._meta.app_label}_{related_model}_change",
-                args=(object.id,),
-            ),
+            href=get_admin_change_url(related_model, object.id),
             content=getattr(object, content_field or "__str__"),
         )
-        for object in related_object_set.all()
+        for object in related_objects
     ]
 
     if max_count is None:
@@ -97,9 +130,7 @@ def related_objects_links(
     # Get the link to the changelist view listing all the related objects
 
     if list_link:
-        list_url = reverse_lazy(
-            f"admin:{obj._meta.app_label}_{related_model}_changelist"
-        )
+        list_url = get_admin_changelist_url(related_model)
         list_link = (
             render_link(
                 href=(f"{list_url}" f"?{obj._meta.model_name}__id__exact={obj.id}"),
@@ -114,6 +145,337 @@ def related_objects_links(
     return related_objects_links + (["", list_link] if list_link else [])
 
 
+def _split_to_many_lookup(model, lookup):
+    """Split the lookup at its first to-many relation: (prefix, field, rest)."""
+    parts = lookup.split(LOOKUP_SEP)
+    for i, part in enumerate(parts):
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            return None
+        if not field.is_relation:
+            return None
+        if field.one_to_many or field.many_to_many:
+            prefix, rest = parts[:i], parts[i:]
+            return prefix, field, rest[1:]
+        model = field.related_model
+
+    return None
+
+
+def filter_by_exists(queryset, lookup, value):
+    """
+    Return the queryset filtered by the lookup, with to-many relations as EXISTS.
+
+    If the lookup spans the to-many relation, the objects are filtered by the
+    `EXISTS` subquery of the related objects correlated with the outer ones
+    instead of being joined with them, so that the objects are not duplicated
+    (and need no `DISTINCT`) and the joins of the other filters are not
+    multiplied.
+    """
+    split = _split_to_many_lookup(queryset.model, lookup)
+    if split is None:
+        return queryset.filter(**{lookup: value})
+
+    prefix, field, rest = split
+    if field.concrete:  # forward many-to-many relation
+        related_lookup = field.related_query_name()
+    else:
+        related_lookup = field.field.name
+    related_objects = field.related_model._default_manager.filter(
+        **{
+            related_lookup: OuterRef(LOOKUP_SEP.join([*prefix, "pk"])),
+            LOOKUP_SEP.join(rest) or "pk": value,
+        }
+    )
+
+    return queryset.filter(Exists(related_objects))
+
+
+CURSOR_VAR = "cursor"
+
+
+def get_change_log_entries(user, objects, fields):
+    """
+    Return the (unsaved) admin history entries of the changes of the objects.
+
+    The entries are the ones the admin logs for the change forms of the objects
+    with the given model fields changed, meant to be saved by `bulk_create`
+    after the objects are updated in bulk.
+    """
+    objects = list(objects)
+    if not objects:
+        return []
+
+    content_type = ContentType.objects.get_for_model(objects[0])
+    with override(None):
+        change_message = json.dumps(
+            [{"changed": {"fields": [str(field.verbose_name) for field in fields]}}]
+        )
+
+    return [
+        LogEntry(
+            user_id=user.pk,
+            content_type=content_type,
+            object_id=str(obj.pk),
+            object_repr=str(obj)[:200],
+            action_flag=CHANGE,
+            change_message=change_message,
+        )
+        for obj in objects
+    ]
+
+
+class EstimatedCountPaginator(Paginator):
+    """A class to represent the paginator counting the objects by the cache."""
+
+    def __init__(self, *args, count_timeout=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_timeout = count_timeout
+
+    @cached_property
+    def count(self):
+        return get_cached_count(self.object_list, self.count_timeout)
+
+
+class ChangeList(BaseChangeList):
+    """
+    A class to represent the changelist paginated by the keyset (seek) method.
+
+    With `keyset_pagination` of the model admin enabled, the pages are selected
+    by the `cursor` parameter holding the values of the ordering fields of the
+    last (or the first) object of the previous (or the next) page, so that the
+    database seeks the page by the index instead of skipping the rows by the
+    offset. The keyset method requires the ordering by the non-null fields of
+    the model or its forward relations; otherwise the offset is used.
+    With `estimated_count` enabled, the objects are counted by the cache (see
+    `get_cached_count`).
+    """
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # The cursor is valid for the current ordering and filters only
+        new_params = new_params or {}
+        if CURSOR_VAR not in new_params:
+            remove = [*(remove or []), CURSOR_VAR]
+
+        return super().get_query_string(new_params, remove)
+
+    def get_count(self, queryset):
+        """Return the number of the objects of the queryset."""
+        if self.model_admin.estimated_count:
+            return get_cached_count(queryset, self.model_admin.count_timeout)
+        return queryset.count()
+
+    def get_results(self, request):
+        self.keyset_ordering = self.get_keyset_ordering(request)
+        self.keyset_pagination = self.keyset_ordering is not None
+        self.estimated_count = self.model_admin.estimated_count
+        self.previous_url = self.next_url = None
+
+        paginator = self.model_admin.get_paginator(
+            request, self.queryset, self.list_per_page
+        )
+        result_count = paginator.count
+
+        if self.model_admin.show_full_result_count:
+            full_result_count = self.get_count(self.root_queryset)
+        else:
+            full_result_count = None
+        can_show_all = result_count <= self.list_max_show_all
+        multi_page = result_count > self.list_per_page
+
+        if (self.show_all and can_show_all) or not multi_page:
+            self.keyset_pagination = False
+            result_list = self.queryset._clone()
+        elif self.keyset_pagination:
+            result_list = self.get_keyset_page(request)
+        else:
+            try:
+                result_list = paginator.page(self.page_num).object_list
+            except InvalidPage:
+                raise IncorrectLookupParameters
+
+        self.result_count = result_count
+        self.show_full_result_count = self.model_admin.show_full_result_count
+        self.show_admin_actions = not self.show_full_result_count or bool(
+            full_result_count
+        )
+        self.full_result_count = full_result_count
+        self.result_list = result_list
+        self.can_show_all = can_show_all
+        self.multi_page = multi_page
+        self.paginator = paginator
+
+    def get_keyset_ordering(self, request):
+        """Return the (field, descending) pairs of the keyset ordering, or None."""
+        if not self.model_admin.keyset_pagination:
+            return None
+
+        ordering = []
+        for field in self.get_ordering(request, self.queryset):
+            if not isinstance(field, str):
+                return None
+            name = field.lstrip("-")
+            if name == "pk":
+                name = self.model._meta.pk.name
+            if not self.is_keyset_field(name):
+                return None
+            ordering.append((name, field.startswith("-")))
+
+        return ordering
+
+    def is_keyset_field(self, name):
+        """Check if the field path leads to the non-null field via forward relations."""
+        model = self.model
+        *relations, field_name = name.split("__")
+        try:
+            for relation in relations:
+                field = model._meta.get_field(relation)
+                if not (field.many_to_one or field.one_to_one) or field.null:
+                    return False
+                if field.auto_created and not field.concrete:  # reverse relation
+                    return False
+                model = field.related_model
+            field = model._meta.get_field(field_name)
+        except FieldDoesNotExist:
+            return False
+
+        return field.concrete and not field.is_relation and not field.null
+
+    def get_seek_filter(self, values, backward=False):
+        """Return the filter of the objects following (or preceding) the values."""
+        conditions = []
+        for i, (name, descending) in enumerate(self.keyset_ordering):
+            lookup = "lt" if descending != backward else "gt"
+            conditions.append(
+                Q(
+                    **{
+                        previous_name: value
+                        for (previous_name, _), value in zip(
+                            self.keyset_ordering[:i], values
+                        )
+                    },
+                    **{f"{name}__{lookup}": values[i]},
+                )
+            )
+
+        return reduce(Q.__or__, conditions)
+
+    def encode_cursor(self, obj, backward=False):
+        """Return the cursor of the page following (or preceding) the object."""
+        data = json.dumps(
+            {
+                "ordering": self.keyset_ordering,
+                "values": self.get_values(obj),
+                "backward": backward,
+            },
+            cls=DjangoJSONEncoder,
+        )
+
+        return base64.urlsafe_b64encode(data.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        """Return the values and the direction of the cursor (None if it is stale)."""
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            ordering = [tuple(item) for item in data["ordering"]]
+            values, backward = data["values"], data["backward"]
+        except (ValueError, TypeError, KeyError):
+            raise IncorrectLookupParameters
+
+        if ordering != self.keyset_ordering or len(values) != len(ordering):
+            return None
+
+        return values, backward
+
+    def get_keyset_page(self, request):
+        """Return the objects of the page selected by the cursor."""
+        queryset = self.queryset.annotate(
+            **{
+                f"keyset_{i}": F(name)
+                for i, (name, _) in enumerate(self.keyset_ordering)
+            }
+        )
+
+        values, backward = None, False
+        cursor = request.GET.get(CURSOR_VAR)
+        if cursor:
+            values, backward = self.decode_cursor(cursor) or (None, False)
+
+        try:
+            if backward:
+                page = self.get_backward_page(queryset, values)
+            else:
+                page = queryset
+                if values is not None:
+                    page = page.filter(self.get_seek_filter(values))
+                # The row following the page tells whether the next page exists
+                objects = list(page[: self.list_per_page + 1])
+                page = self.get_fetched_page(
+                    page[: self.list_per_page], objects[: self.list_per_page]
+                )
+                if objects:
+                    if values is not None:
+                        self.previous_url = self.get_cursor_url(objects[0], True)
+                    if len(objects) > self.list_per_page:
+                        self.next_url = self.get_cursor_url(
+                            objects[self.list_per_page - 1]
+                        )
+        except ValidationError:
+            raise IncorrectLookupParameters
+
+        return page
+
+    def get_backward_page(self, queryset, values):
+        """Return the objects of the page preceding the values."""
+        reversed_ordering = [
+            f"{'' if descending else '-'}{name}"
+            for name, descending in self.keyset_ordering
+        ]
+        pks = list(
+            queryset.filter(self.get_seek_filter(values, backward=True))
+            .order_by(*reversed_ordering)
+            .values_list("pk", flat=True)[: self.list_per_page + 1]
+        )
+
+        if len(pks) < self.list_per_page:  # the first page
+            page = queryset[: self.list_per_page]
+        else:
+            page = queryset.filter(pk__in=pks[: self.list_per_page])
+        objects = list(page)
+
+        # The row preceding the page tells whether the previous page exists
+        if len(pks) > self.list_per_page:
+            self.previous_url = self.get_cursor_url(objects[0], True)
+        if objects:
+            self.next_url = self.get_cursor_url(objects[-1])
+
+        return page
+
+    @staticmethod
+    def get_fetched_page(page, objects):
+        """Return the queryset of the page with its objects fetched already."""
+        page._result_cache = objects
+        page._prefetch_done = True
+        return page
+
+    def get_values(self, obj):
+        """Return the values of the ordering fields of the object."""
+        return [getattr(obj, f"keyset_{i}") for i in range(len(self.keyset_ordering))]
+
+    def get_cursor_url(self, obj, backward=False):
+        """Return the URL of the page following (or preceding) the object."""
+        return self.get_query_string(
+            {CURSOR_VAR: self.encode_cursor(obj, backward)}, remove=[PAGE_VAR]
+        )
+
+
 class ModelAdmin(BaseModelAdmin):
     """A class to represent customized ModelAdmin options."""
 
@@ -123,6 +485,34 @@ class ModelAdmin(BaseModelAdmin):
     model_accusative = _("obiekt")
     model_genitive_plural = _("obiektów")
 
+    keyset_pagination = False
+    estimated_count = False
+    count_timeout = 60
+    bulk_list_editable = False
+
+    def __init__(self, model, admin_site):
+        super().__init__(model, admin_site)
+        if self.estimated_count:
+            track_model_changes(model)
+
+    def get_changelist(self, request, **kwargs):
+        return ChangeList
+
+    def get_paginator(
+        self, request, queryset, per_page, orphans=0, allow_empty_first_page=True
+    ):
+        if self.estimated_count:
+            return EstimatedCountPaginator(
+                queryset,
+                per_page,
+                orphans,
+                allow_empty_first_page,
+                count_timeout=self.count_timeout,
+            )
+        return super().get_paginator(
+            request, queryset, per_page, orphans, allow_empty_first_page
+        )
+
     def changeform_view(self, request, object_id, form_url, extra_context):
         extra_context = extra_context or {}
         extra_context.update(
@@ -135,6 +525,16 @@ class ModelAdmin(BaseModelAdmin):
         return super().changeform_view(request, object_id, form_url, extra_context)
 
     def changelist_view(self, request, extra_context=None):
+        if (
+            self.bulk_list_editable
+            and self.list_editable
+            and request.method == "POST"
+            and "_save" in request.POST
+        ):
+            response = self.bulk_save_list_editable(request)
+            if response is not None:
+                return response
+
         extra_context = extra_context or {}
         extra_context.update(
             {
@@ -144,12 +544,168 @@ class ModelAdmin(BaseModelAdmin):
         )
         return super().changelist_view(request, extra_context)
 
+    def get_list_editable_values(self, request):
+        """
+        Return the values of the `list_editable` fields submitted by the changelist.
+
+        The values are cleaned by the fields of the changelist form only (without
+        the validation of the whole form and the model), keyed by the primary
+        keys of the objects. Return None if any value is invalid (or the field
+        is not a plain concrete one), so that the request is left to the default
+        processing rendering the errors.
+        """
+        form_class = self.get_changelist_form(request)
+        prefix = self.get_changelist_formset(request).get_default_prefix()
+        management_form = ManagementForm(request.POST, prefix=prefix)
+        if not management_form.is_valid():
+            return None
+
+        pk_field = self.model._meta.pk
+        fields = {}
+        for name in self.list_editable:
+            model_field = self.model._meta.get_field(name)
+            if not model_field.concrete or model_field.many_to_many:
+                return None
+            fields[name] = (model_field, form_class.base_fields[name])
+
+        values = {}
+        for i in range(management_form.cleaned_data["TOTAL_FORMS"]):
+            form_prefix = f"{prefix}-{i}"
+            try:
+                pk = pk_field.to_python(
+                    request.POST.get(f"{form_prefix}-{pk_field.name}")
+                )
+                row = {}
+                for name, (model_field, form_field) in fields.items():
+                    value = form_field.clean(
+                        form_field.widget.value_from_datadict(
+                            request.POST, request.FILES, f"{form_prefix}-{name}"
+                        )
+                    )
+                    # The related objects are compared and saved by the keys
+                    row[model_field] = getattr(value, "pk", value)
+            except ValidationError:
+                return None
+            if pk is not None:
+                values[pk] = row
+
+        return values
+
+    def bulk_save_list_editable(self, request):
+        """
+        Save the `list_editable` fields of the changelist objects in bulk.
+
+        Enabled by `bulk_list_editable`, the values submitted are compared with
+        the ones of the objects of the current page of the changelist (the values
+        of any other objects are ignored), the objects changed are validated by
+        `full_clean` (of the fields changed) and updated by a single query per
+        combination of the new values, with `pre_bulk_update` and
+        `post_bulk_update` sent instead of the signals of the objects, and the
+        changes logged in the admin history by a single query as well. Return
+        None if the values are invalid (see `get_list_editable_values`) or any
+        object changed is invalid, so that the errors are rendered by the
+        default processing.
+        """
+        if not self.has_change_permission(request):
+            raise PermissionDenied
+
+        values = self.get_list_editable_values(request)
+        if values is None:
+            return None
+
+        try:
+            cl = self.get_changelist_instance(request)
+        except IncorrectLookupParameters:
+            return None
+        objects = {obj.pk: obj for obj in cl.result_list if obj.pk in values}
+
+        field_names = {field.name for field in self.opts.fields}
+        groups = defaultdict(list)
+        for pk, obj in objects.items():
+            changes = tuple(
+                (model_field, value)
+                for model_field, value in values[pk].items()
+                if model_field.value_from_object(obj) != value
+            )
+            if changes:
+                for model_field, value in changes:
+                    setattr(obj, model_field.attname, value)
+                try:
+                    obj.full_clean(
+                        exclude=field_names
+                        - {model_field.name for model_field, value in changes},
+                        validate_unique=True,
+                    )
+                except ValidationError:
+                    return None
+                groups[changes].append(obj)
+
+        changed_objects = [obj for group in groups.values() for obj in group]
+        if changed_objects:
+            self.bulk_update_objects(request, groups)
+
+            count = len(changed_objects)
+            self.message_user(
+                request,
+                ngettext(
+                    "%(count)s %(name)s was changed successfully.",
+                    "%(count)s %(name)s were changed successfully.",
+                    count,
+                )
+                % {"count": count, "name": model_ngettext(self.opts, count)},
+                messages.SUCCESS,
+            )
+
+        return HttpResponseRedirect(request.get_full_path())
+
+    def bulk_update_objects(self, request, groups):
+        """Update the objects grouped by the (field, value) pairs of the changes."""
+        using = router.db_for_write(self.model)
+        pks = [obj.pk for group in groups.values() for obj in group]
+        update_fields = frozenset(
+            model_field.name for changes in groups for model_field, value in changes
+        )
+
+        with transaction.atomic(using=using):
+            pre_bulk_update.send(
+                sender=self.model, pks=pks, update_fields=update_fields, using=using
+            )
+            for changes, objects in groups.items():
+                self.model._base_manager.using(using).filter(
+                    pk__in=[obj.pk for obj in objects]
+                ).update(
+                    **{model_field.attname: value for model_field, value in changes}
+                )
+            post_bulk_update.send(
+                sender=self.model, pks=pks, update_fields=update_fields, using=using
+            )
+
+            self.log_bulk_change(request, groups)
+
+    def log_bulk_change(self, request, groups):
+        """Log the changes of the objects in the admin history by a single query."""
+        LogEntry.objects.bulk_create(
+            entry
+            for changes, objects in groups.items()
+            for entry in get_change_log_entries(
+                request.user, objects, [model_field for model_field, value in changes]
+            )
+        )
+
 
 class RelatedModelFilter:
-    """A class to represent admin filter by the selected field of the related model."""
+    """
+    A class to represent admin filter by the selected field of the related model.
+
+    The lookup choices of the filter are cached. The cache is invalidated when
+    any object of the related model or of the models it refers to via foreign
+    keys (e.g. the parent units of the Department model) is saved or deleted.
+    """
 
     NULL_PARAMETER_VALUE = "null"
     NULL_LABEL = "-"
+    CACHE_KEY_PREFIX = "related_model_filter"
+    CACHE_TIMEOUT = 60 * 60 * 24  # seconds
 
     def __init__(self, model, lookup, field, null=False, null_lookup=None, **kwargs):
         self.model = model
@@ -163,6 +719,10 @@ class RelatedModelFilter:
 
         self.__dict__.update(kwargs)
 
+        self.dependencies = self.get_dependencies()
+        for dependency in self.dependencies:
+            track_model_changes(dependency)
+
     @classmethod
     def as_filter(cls, model, lookup, field, null=False, null_lookup=None, **kwargs):
         """Return the filter without creating an instance of the class."""
@@ -185,10 +745,7 @@ class RelatedModelFilter:
             parameter_name = self.get_filter_parameter_name()
 
             def lookups(obj, request, model_admin):
-                lookups = [
-                    (obj.id, getattr(obj, self.field))
-                    for obj in self.model.objects.all()
-                ]
+                lookups = list(self.get_lookups())
                 if self.null:
                     lookups += [(self.NULL_PARAMETER_VALUE, self.NULL_LABEL)]
                 return lookups
@@ -196,12 +753,84 @@ class RelatedModelFilter:
             def queryset(obj, request, queryset):
                 value = obj.value()
                 if value:
-                    if not value == self.NULL_PARAMETER_VALUE:
-                        return queryset.filter(**{self.lookup: value}).distinct()
-                    return queryset.filter(**{self.null_lookup: self.null_lookup_value})
+                    return self.filter_queryset(queryset, value)
 
         return Filter
 
+    def filter_queryset(self, queryset, value):
+        """Return the queryset filtered by the value of the filter parameter."""
+        if value != self.NULL_PARAMETER_VALUE:
+            return filter_by_exists(queryset, self.lookup, value)
+
+        if _split_to_many_lookup(queryset.model, self.null_lookup) is None:
+            return queryset.filter(**{self.null_lookup: self.null_lookup_value})
+
+        # The null lookup (e.g. `isnull`) spanning the to-many relation is true
+        # for the objects with no related objects as well, so it is evaluated
+        # by the subquery of the model itself, still with no duplicates
+        return queryset.filter(
+            Exists(
+                queryset.model._default_manager.filter(
+                    pk=OuterRef("pk"),
+                    **{self.null_lookup: self.null_lookup_value},
+                )
+            )
+        )
+
+    def get_dependencies(self):
+        """Return the list of models the lookups of the filter depend on."""
+        return [self.model] + [
+            model for _, model in self._get_parent_lookups(self.model)
+        ]
+
+    @classmethod
+    def _get_parent_lookups(cls, model, prefix="", visited=None):
+        """Return (lookup, model) pairs of all the models referred to via FKs."""
+        visited = (visited or set()) | {model}
+        lookups = []
+        for field in model._meta.get_fields():
+            if (
+                field.concrete
+                and (field.many_to_one or field.one_to_one)
+                and field.related_model not in visited
+            ):
+                lookup = f"{prefix}{field.name}"
+                lookups.append((lookup, field.related_model))
+                lookups += cls._get_parent_lookups(
+                    field.related_model, f"{lookup}__", visited
+                )
+        return lookups
+
+    def get_lookups(self):
+        """Return the list of (id, label) pairs of the related model objects."""
+        key = make_key(
+            self.CACHE_KEY_PREFIX,
+            self.model._meta.label_lower,
+            self.field,
+            *get_model_versions(*self.dependencies),
+        )
+        return get_or_build(key, self.build_lookups, timeout=self.CACHE_TIMEOUT)
+
+    def build_lookups(self):
+        """Return the list of (id, label) pairs built in a single query."""
+        queryset = self.model._default_manager.all()
+        try:
+            field = self.model._meta.get_field(self.field)
+        except FieldDoesNotExist:
+            field = None
+
+        if field is not None and field.concrete:
+            return list(queryset.values_list("id", self.field))
+
+        # The labels are given by the attributes (or methods) of the objects,
+        # possibly using the related objects, so fetch them along the way
+        select_related = [lookup for lookup, _ in self._get_parent_lookups(self.model)]
+        lookups = []
+        for obj in queryset.select_related(*select_related):
+            label = getattr(obj, self.field)
+            lookups.append((obj.id, label() if callable(label) else label))
+        return lookups
+
     @property
     def model(self):
         """Return the object's `_model` attribute."""
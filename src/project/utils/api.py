@@ -0,0 +1,307 @@
+import datetime
+import hashlib
+
+from django.core.exceptions import PermissionDenied
+from django.db.models import Prefetch
+from django.db.models.manager import BaseManager
+from django.http import JsonResponse
+from django.views import generic
+from django.views.decorators.http import condition
+
+from .cache import get_model_versions, track_model_changes
+
+FIELDS_PARAM = "fields"
+AFTER_PARAM = "after"
+LIMIT_PARAM = "limit"
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+class Field:
+    """
+    A class to represent the field of the objects serialized by the Serializer.
+
+    The value of the field is given by the `attribute` (the dotted path of the
+    attributes of the object, resolved to None if any of them is None) or the
+    callable taking the object. The related objects are serialized by the
+    `serializer` (all of them if `many`, given by the related manager or any
+    iterable), and are loaded along with the objects by the `select_related` or
+    the `prefetch_related` lookup.
+    """
+
+    def __init__(
+        self,
+        attribute=None,
+        serializer=None,
+        many=False,
+        select_related=None,
+        prefetch_related=None,
+    ):
+        self.attribute = attribute
+        self.serializer = serializer
+        self.many = many
+        self.select_related = select_related
+        self.prefetch_related = prefetch_related
+
+    def compile(self, name):
+        """Return the function returning the serialized value of the object field."""
+        if callable(self.attribute):
+            get_value = self.attribute
+        else:
+            get_value = _compile_getter(self.attribute or name)
+
+        if self.serializer is None:
+            return get_value
+
+        serialize = self.serializer.compile()
+        if self.many:
+
+            def get_serialized_values(obj):
+                values = get_value(obj)
+                if isinstance(values, BaseManager):
+                    values = values.all()
+                return [serialize(item) for item in values]
+
+            return get_serialized_values
+
+        def get_serialized_value(obj):
+            value = get_value(obj)
+            return serialize(value) if value is not None else None
+
+        return get_serialized_value
+
+
+def _compile_getter(attribute):
+    names = attribute.split(".")
+    if len(names) == 1:
+        return lambda obj: getattr(obj, attribute)
+
+    def get_value(obj):
+        for name in names:
+            obj = getattr(obj, name)
+            if obj is None:
+                return None
+        return obj
+
+    return get_value
+
+
+class Serializer:
+    """
+    A class to represent the serializer of the model objects to JSON data.
+
+    The functions serializing the objects (see `compile`) are built once per
+    set of the fields requested, and the querysets are prepared to load all
+    the related objects the fields requested refer to (see `prepare`).
+    """
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = fields
+        self._compiled = {}
+
+    def get_field_names(self, names=None):
+        """Return the names of the fields requested, validated."""
+        if not names:
+            return tuple(self.fields)
+
+        unknown_names = [name for name in names if name not in self.fields]
+        if unknown_names:
+            raise ValueError(f"Unknown fields: {', '.join(unknown_names)}.")
+
+        return tuple(dict.fromkeys(names))
+
+    def compile(self, names=None):
+        """Return the function serializing the object to the dict of the fields."""
+        names = self.get_field_names(names)
+        serialize = self._compiled.get(names)
+        if serialize is None:
+            getters = [(name, self.fields[name].compile(name)) for name in names]
+
+            def serialize(obj):
+                return {name: get_value(obj) for name, get_value in getters}
+
+            self._compiled[names] = serialize
+
+        return serialize
+
+    def prepare(self, queryset, names=None):
+        """Return the queryset loading the related objects of the fields requested."""
+        select_related, prefetch_related = [], []
+        for name in self.get_field_names(names):
+            field = self.fields[name]
+            if field.select_related:
+                select_related.append(field.select_related)
+            if field.prefetch_related:
+                prefetch_queryset = None
+                if field.serializer is not None:
+                    prefetch_queryset = field.serializer.prepare(
+                        field.serializer.model._default_manager.all()
+                    )
+                prefetch_related.append(
+                    Prefetch(field.prefetch_related, queryset=prefetch_queryset)
+                )
+
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+
+        return queryset
+
+
+class ApiView(generic.View):
+    """
+    A class to represent the read-only JSON API view.
+
+    The responses are validated by the ETag and the Last-Modified headers
+    computed from the versions of the data of the `dependencies` models (see
+    `get_model_versions`), so the clients may revalidate their copies and get
+    304 responses while the data do not change.
+
+    Like the admin, the views are available to the active staff users only
+    (unless `staff_required` is disabled), having the `permission_required`
+    (if any); the other requests are denied with the 403 responses.
+    """
+
+    http_method_names = ["get", "head", "options"]
+
+    serializer = None
+    dependencies = ()
+    staff_required = True
+    permission_required = None
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        for model in cls.dependencies:
+            track_model_changes(model)
+        return super().as_view(**initkwargs)
+
+    def setup(self, request, *args, **kwargs):
+        super().setup(request, *args, **kwargs)
+        self.versions = None
+
+    def has_permission(self):
+        """Return True if the user of the request may access the view."""
+        user = self.request.user
+        if self.staff_required and not (user.is_active and user.is_staff):
+            return False
+        return self.permission_required is None or user.has_perm(
+            self.permission_required
+        )
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.has_permission():
+            raise PermissionDenied
+
+        view = condition(
+            etag_func=lambda request, *args, **kwargs: self.get_etag(),
+            last_modified_func=lambda request, *args, **kwargs: (
+                self.get_last_modified()
+            ),
+        )(super().dispatch)
+
+        return view(request, *args, **kwargs)
+
+    def get_versions(self):
+        """Return the versions of the data of the dependencies models."""
+        if self.versions is None:
+            self.versions = get_model_versions(*self.dependencies)
+        return self.versions
+
+    def get_etag(self):
+        """Return the ETag of the response to the request."""
+        data = f"{self.request.get_full_path()}:{self.get_versions()}"
+        return hashlib.md5(data.encode()).hexdigest()
+
+    def get_last_modified(self):
+        """Return the time of the last change of the data of the response."""
+        if not self.dependencies:
+            return None
+
+        return datetime.datetime.fromtimestamp(
+            max(self.get_versions()) / 1_000_000,
+            tz=datetime.timezone.utc,
+        )
+
+    def get_field_names(self):
+        """Return the names of the fields requested by the `fields` parameter."""
+        fields = self.request.GET.get(FIELDS_PARAM)
+        if not fields:
+            return None
+        return [name.strip() for name in fields.split(",") if name.strip()]
+
+    def get_json_response(self, data, status=200):
+        return JsonResponse(
+            data,
+            status=status,
+            safe=False,
+            json_dumps_params={"ensure_ascii": False},
+        )
+
+    def get_error_response(self, message, status=400):
+        return self.get_json_response({"error": message}, status=status)
+
+
+class ApiListView(ApiView):
+    """
+    A class to represent the API view of the list of the objects.
+
+    The list is paginated by the keyset method: the `after` parameter is the
+    primary key of the last object of the previous page, and `limit` is the
+    number of the objects of the page.
+    """
+
+    def get_queryset(self):
+        return self.serializer.model._default_manager.all()
+
+    def get_objects(self, names, after, limit):
+        """Return up to `limit` objects of the primary keys following `after`."""
+        queryset = self.serializer.prepare(self.get_queryset(), names)
+        return list(queryset.filter(pk__gt=after).order_by("pk")[:limit])
+
+    def get(self, request, *args, **kwargs):
+        try:
+            names = self.serializer.get_field_names(self.get_field_names())
+            after = int(request.GET.get(AFTER_PARAM, 0))
+            limit = min(int(request.GET.get(LIMIT_PARAM, DEFAULT_LIMIT)), MAX_LIMIT)
+        except ValueError as error:
+            return self.get_error_response(str(error))
+        if limit < 1:
+            return self.get_error_response(f"Invalid {LIMIT_PARAM}.")
+
+        objects = self.get_objects(names, after, limit + 1)
+
+        next_url = None
+        if len(objects) > limit:
+            objects = objects[:limit]
+            params = request.GET.copy()
+            params[AFTER_PARAM] = objects[-1].pk
+            next_url = request.build_absolute_uri(
+                f"{request.path}?{params.urlencode()}"
+            )
+
+        serialize = self.serializer.compile(names)
+        return self.get_json_response(
+            {"results": [serialize(obj) for obj in objects], "next": next_url}
+        )
+
+
+class ApiDetailView(ApiView):
+    """A class to represent the API view of the single object."""
+
+    def get_queryset(self):
+        return self.serializer.model._default_manager.all()
+
+    def get(self, request, pk, *args, **kwargs):
+        try:
+            names = self.serializer.get_field_names(self.get_field_names())
+        except ValueError as error:
+            return self.get_error_response(str(error))
+
+        obj = self.serializer.prepare(self.get_queryset(), names).filter(pk=pk).first()
+        if obj is None:
+            return self.get_error_response("Not found.", status=404)
+
+        return self.get_json_response(self.serializer.compile(names)(obj))
@@ -0,0 +1,136 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import router, transaction
+from django.db.models import signals
+
+from .metrics import record_cache_access
+from .signals import post_bulk_update
+
+MODEL_VERSION_KEY_PREFIX = "model_version"
+COUNT_KEY_PREFIX = "count"
+
+# Fields of the saves not changing the data of the models (e.g. the `last_login`
+# updated by every login), so not bumping their versions
+
+UNTRACKED_FIELDS = frozenset({"last_login"})
+
+
+def _get_model_version_key(model):
+    return f"{MODEL_VERSION_KEY_PREFIX}:{model._meta.label_lower}"
+
+
+_last_version = 0
+
+
+def _get_new_version():
+    # The versions generated by the process in the same microsecond differ
+    global _last_version
+    _last_version = max(time.time_ns() // 1000, _last_version + 1)
+    return _last_version
+
+
+def get_model_versions(*models):
+    """
+    Return the tuple of the current versions of the data of the models.
+
+    The version of the model is the time (in microseconds since the epoch) of
+    the last change of its data recorded by `bump_model_version`. It is meant
+    to be a part of the keys of the cached data derived from the model objects,
+    so that such data gets invalidated with any change of the objects.
+    """
+    keys = [_get_model_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+
+    missing_keys = [key for key in keys if key not in versions]
+    record_cache_access(hits=len(versions), misses=len(missing_keys))
+    if missing_keys:
+        # The versions added by the other processes meanwhile take precedence,
+        # and the ones generated here are used if not stored (e.g. evicted)
+        new_versions = {key: _get_new_version() for key in missing_keys}
+        for key, version in new_versions.items():
+            cache.add(key, version, timeout=None)
+        new_versions.update(cache.get_many(missing_keys))
+        versions.update(new_versions)
+
+    return tuple(versions[key] for key in keys)
+
+
+def bump_model_version(model):
+    """
+    Record the change of the data of the model.
+
+    The version is bumped at once (for the data cached by the transaction of the
+    change itself) and once more on the commit of the transaction, so that the
+    data cached by the concurrent requests from the rows read before the commit
+    is not kept under the new version.
+    """
+    key = _get_model_version_key(model)
+    cache.set(key, _get_new_version(), timeout=None)
+    transaction.on_commit(
+        lambda: cache.set(key, _get_new_version(), timeout=None),
+        using=router.db_for_write(model),
+    )
+
+
+def _bump_sender_version(sender, update_fields=None, **kwargs):
+    if update_fields is None or not update_fields <= UNTRACKED_FIELDS:
+        bump_model_version(sender)
+
+
+def track_model_changes(model):
+    """
+    Bump the version of the model whenever its objects are saved or deleted.
+
+    The saves of the `UNTRACKED_FIELDS` only do not bump the version.
+    """
+    for signal in (signals.post_save, signals.post_delete, post_bulk_update):
+        signal.connect(
+            _bump_sender_version,
+            sender=model,
+            weak=False,
+            dispatch_uid=f"{MODEL_VERSION_KEY_PREFIX}:{model._meta.label_lower}",
+        )
+
+
+def make_key(*parts):
+    """Return the cache key made of the parts given."""
+    return ":".join(str(part) for part in parts)
+
+
+def get_or_build(key, build, timeout=None):
+    """Return the cached value of the key, built by the callable if missing."""
+    value = cache.get(key)
+    if value is None:
+        record_cache_access(misses=1)
+        value = build()
+        cache.set(key, value, timeout)
+    else:
+        record_cache_access(hits=1)
+
+    return value
+
+
+def get_cached_count(queryset, timeout=None):
+    """
+    Return the number of the objects of the queryset, cached.
+
+    The count is cached per SQL query and version of the queryset model, so it
+    is recomputed once the objects of the model change (if tracked, see
+    `track_model_changes`) or the timeout passes. The changes of the related
+    models are not tracked, so the count is an estimate within the timeout.
+    """
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+
+    key = make_key(
+        COUNT_KEY_PREFIX,
+        queryset.model._meta.label_lower,
+        *get_model_versions(queryset.model),
+        hashlib.md5(f"{sql}{params}".encode()).hexdigest(),
+    )
+    return get_or_build(key, queryset.count, timeout)
@@ -0,0 +1,224 @@
+import bisect
+import contextvars
+import threading
+import time
+
+# Upper bounds (in seconds) of the buckets of the histogram of the request times
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+METRIC_PREFIX = "django"
+
+_request_metrics = contextvars.ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    """
+    A class to represent the metrics of a single request.
+
+    The metrics of the request being processed are available to the code run
+    within the request by `get_current` (see `record_cache_access`). The
+    database queries are timed by the instance itself, used as the execute
+    wrapper of the database connections.
+    """
+
+    __slots__ = (
+        "start",
+        "duration",
+        "db_queries",
+        "db_time",
+        "template_start",
+        "template_time",
+        "cache_hits",
+        "cache_misses",
+    )
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.duration = 0.0
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.template_start = None
+        self.template_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.db_queries += 1
+
+    @classmethod
+    def get_current(cls):
+        """Return the metrics of the current request (None if not recorded)."""
+        return _request_metrics.get()
+
+    def activate(self):
+        """Make the metrics the ones of the current request; return the token."""
+        return _request_metrics.set(self)
+
+    def deactivate(self, token):
+        _request_metrics.reset(token)
+
+    def stop(self):
+        """Record the time of the request."""
+        self.duration = time.perf_counter() - self.start
+
+    def stop_template(self, response=None):
+        """Record the time of the rendering of the template response."""
+        if self.template_start is not None:
+            self.template_time += time.perf_counter() - self.template_start
+            self.template_start = None
+
+    def get_server_timing(self):
+        """Return the value of the Server-Timing header of the request."""
+        return ", ".join(
+            [
+                f"total;dur={self.duration * 1000:.1f}",
+                f'db;dur={self.db_time * 1000:.1f};desc="{self.db_queries} queries"',
+                f"template;dur={self.template_time * 1000:.1f}",
+                f'cache;desc="{self.cache_hits} hits / {self.cache_misses} misses"',
+            ]
+        )
+
+
+def record_cache_access(hits=0, misses=0):
+    """Record the hits and misses of the cache in the metrics of the request."""
+    metrics = _request_metrics.get()
+    if metrics is not None:
+        metrics.cache_hits += hits
+        metrics.cache_misses += misses
+
+
+class MetricsRegistry:
+    """
+    A class to represent the metrics of the requests aggregated by the process.
+
+    The metrics are aggregated per view (the name the URL of the request is
+    resolved to) and method of the request, and exposed in the text format of
+    Prometheus (see `export`). Each process aggregates its own requests, so the
+    metrics of the multiple processes of the server are to be summed up by
+    the Prometheus queries.
+    """
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.requests = {}  # {(view, method, status): count}
+            self.views = {}  # {(view, method): [bucket counts, totals]}
+
+    def add(self, view, method, status, metrics):
+        """Add the metrics of the request to the aggregates."""
+        bucket = bisect.bisect_left(self.buckets, metrics.duration)
+        with self.lock:
+            key = (view, method, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+            aggregates = self.views.get((view, method))
+            if aggregates is None:
+                aggregates = self.views[(view, method)] = [
+                    [0] * (len(self.buckets) + 1),
+                    [0.0] * 6,
+                ]
+            buckets, totals = aggregates
+            buckets[bucket] += 1
+            for i, value in enumerate(
+                (
+                    metrics.duration,
+                    metrics.db_queries,
+                    metrics.db_time,
+                    metrics.template_time,
+                    metrics.cache_hits,
+                    metrics.cache_misses,
+                )
+            ):
+                totals[i] += value
+
+    def export(self):
+        """Return the metrics in the text format of Prometheus."""
+        with self.lock:
+            requests = sorted(self.requests.items())
+            views = sorted(
+                (key, ([*buckets], [*totals]))
+                for key, (buckets, totals) in self.views.items()
+            )
+
+        lines = []
+
+        def add_metric(name, metric_type, description, samples):
+            name = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for suffix, labels, value in samples:
+                labels = ",".join(
+                    f'{label}="{_escape_label(label_value)}"'
+                    for label, label_value in labels
+                )
+                lines.append(f"{name}{suffix}{{{labels}}} {value}")
+
+        add_metric(
+            "requests_total",
+            "counter",
+            "Number of the requests.",
+            [
+                ("", (("view", view), ("method", method), ("status", status)), count)
+                for (view, method, status), count in requests
+            ],
+        )
+
+        samples = []
+        for (view, method), (buckets, totals) in views:
+            count = 0
+            for bound, bucket_count in zip((*self.buckets, "+Inf"), buckets):
+                count += bucket_count
+                samples.append(
+                    (
+                        "_bucket",
+                        (("view", view), ("method", method), ("le", bound)),
+                        count,
+                    )
+                )
+            samples.append(("_sum", (("view", view), ("method", method)), totals[0]))
+            samples.append(("_count", (("view", view), ("method", method)), count))
+        add_metric(
+            "request_duration_seconds",
+            "histogram",
+            "Time of the processing of the requests.",
+            samples,
+        )
+
+        for i, (name, description) in enumerate(
+            (
+                ("request_db_queries_total", "Number of the database queries."),
+                ("request_db_seconds_total", "Time of the database queries."),
+                ("request_template_seconds_total", "Time of the template rendering."),
+                ("request_cache_hits_total", "Number of the cache hits."),
+                ("request_cache_misses_total", "Number of the cache misses."),
+            ),
+            start=1,
+        ):
+            add_metric(
+                name,
+                "counter",
+                description,
+                [
+                    ("", (("view", view), ("method", method)), totals[i])
+                    for (view, method), (buckets, totals) in views
+                ],
+            )
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = MetricsRegistry()
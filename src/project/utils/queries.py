@@ -0,0 +1,121 @@
+import logging
+import re
+import traceback
+from collections import Counter
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Patterns of the parts of the SQL queries varying between the queries of the
+# same shape: the lists of the parameters (e.g. of the `IN` lookups), and the
+# numbers and strings inlined (e.g. by the `LIMIT` clauses)
+
+FINGERPRINT_PATTERNS = (
+    (re.compile(r"\(\s*%s(?:\s*,\s*%s)*\s*\)"), "(%s)"),
+    (re.compile(r"'(?:[^']|'')*'"), "%s"),
+    (re.compile(r"\b\d+\b"), "%s"),
+)
+
+# Name of the attribute of the views, view classes and model admins setting the
+# threshold of the repeated queries of their requests (None to disable)
+
+THRESHOLD_ATTRIBUTE = "repeated_queries_threshold"
+
+RAISE = "raise"
+LOG = "log"
+
+_default = object()
+
+
+class RepeatedQueriesError(Exception):
+    """A class to represent the error of the queries repeated by the request."""
+
+
+def get_fingerprint(sql):
+    """Return the SQL query with the parts varying between the same queries masked."""
+    for pattern, replacement in FINGERPRINT_PATTERNS:
+        sql = pattern.sub(replacement, sql)
+    return sql
+
+
+def get_stack():
+    """Return the formatted frames of the current stack of the project code."""
+    frames = [
+        frame
+        for frame in traceback.extract_stack()[:-1]
+        if frame.filename.startswith(str(settings.BASE_DIR))
+        and "site-packages" not in frame.filename
+        and frame.filename != __file__
+    ]
+    return "".join(traceback.format_list(frames))
+
+
+def get_view_threshold(view_func):
+    """Return the threshold of the repeated queries of the view's requests."""
+    for obj in (
+        view_func,
+        getattr(view_func, "view_class", None),
+        getattr(view_func, "model_admin", None),
+    ):
+        threshold = getattr(obj, THRESHOLD_ATTRIBUTE, _default)
+        if threshold is not _default:
+            return threshold
+
+    return settings.REPEATED_QUERIES_THRESHOLD
+
+
+def repeated_queries_threshold(threshold):
+    """Return the decorator setting the threshold of the view's repeated queries."""
+
+    def decorator(view_func):
+        setattr(view_func, THRESHOLD_ATTRIBUTE, threshold)
+        return view_func
+
+    return decorator
+
+
+class RepeatedQueriesDetector:
+    """
+    A class to represent the detector of the queries repeated by the request.
+
+    The detector is the execute wrapper of the database connections counting the
+    queries by their fingerprints (see `get_fingerprint`). Once the queries of
+    the same fingerprint outnumber the threshold (typically, when the related
+    objects are queried one by one, like in the N+1 pattern), the detector
+    reports the query along with the stack of the project code it is run by,
+    by raising `RepeatedQueriesError` or logging the warning (see the
+    `REPEATED_QUERIES_ACTION` setting). Each fingerprint is reported once.
+    """
+
+    def __init__(self, label, threshold=None, action=LOG):
+        self.label = label
+        self.threshold = threshold
+        self.action = action
+        self.counts = Counter()
+        self.reported = set()
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.threshold is not None:
+            fingerprint = get_fingerprint(sql)
+            self.counts[fingerprint] += 1
+            if (
+                self.counts[fingerprint] > self.threshold
+                and fingerprint not in self.reported
+            ):
+                self.report(fingerprint)
+
+        return execute(sql, params, many, context)
+
+    def report(self, fingerprint):
+        """Report the queries of the fingerprint repeated above the threshold."""
+        self.reported.add(fingerprint)
+
+        message = (
+            f"{self.label}: more than {self.threshold} queries of the same shape:\n"
+            f"{fingerprint}\n"
+            f"Stack of the last query:\n{get_stack()}"
+        )
+        if self.action == RAISE:
+            raise RepeatedQueriesError(message)
+        logger.warning(message)
@@ -0,0 +1,12 @@
+from django.dispatch import Signal
+
+# Signals of the bulk updates of the objects (e.g. by `QuerySet.update`), which
+# do not send the `pre_save` and `post_save` signals of the objects updated.
+# The signals are sent by the sender model with the arguments:
+#
+#   pks: the list of the primary keys of the objects updated,
+#   update_fields: the frozenset of the names of the fields updated,
+#   using: the alias of the database.
+
+pre_bulk_update = Signal()
+post_bulk_update = Signal()
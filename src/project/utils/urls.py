@@ -0,0 +1,61 @@
+from urllib.parse import quote
+from weakref import WeakKeyDictionary
+
+from django.urls import get_resolver, get_script_prefix, get_urlconf, reverse
+from django.utils.http import RFC3986_SUBDELIMS
+
+PK_PLACEHOLDER = "__pk__"
+
+# URL templates keyed by the resolvers of the URL configurations, so that they
+# are dropped with the resolvers by `clear_url_caches` (e.g. on the change of
+# the `ROOT_URLCONF` setting) or by the change of the URLconf of the thread
+
+_url_templates = WeakKeyDictionary()
+
+
+def _get_url_template(viewname, with_pk=False):
+    """
+    Return the (prefix, suffix) pair of the URL of the view.
+
+    The view is reversed only once per process and URL configuration, then
+    the URLs of the individual objects are obtained by the interpolation of
+    the primary key between the prefix and the suffix.
+    """
+    url_templates = _url_templates.setdefault(get_resolver(get_urlconf()), {})
+    key = (get_script_prefix(), viewname, with_pk)
+    try:
+        return url_templates[key]
+    except KeyError:
+        pass
+
+    if with_pk:
+        url = reverse(viewname, args=(PK_PLACEHOLDER,))
+        prefix, suffix = url.rsplit(PK_PLACEHOLDER, 1)
+    else:
+        prefix, suffix = reverse(viewname), ""
+    url_templates[key] = (prefix, suffix)
+
+    return prefix, suffix
+
+
+def get_admin_url(model, view, pk=None):
+    """Return URL of the admin view of the model, e.g. 'change' or 'changelist'."""
+    prefix, suffix = _get_url_template(
+        f"admin:{model._meta.app_label}_{model._meta.model_name}_{view}",
+        with_pk=pk is not None,
+    )
+    if pk is None:
+        return prefix
+
+    # Escape the primary key the same way `reverse()` does
+    return f"{prefix}{quote(str(pk), safe=RFC3986_SUBDELIMS + '/~:@')}{suffix}"
+
+
+def get_admin_change_url(model, pk):
+    """Return URL of the admin change form of the model object."""
+    return get_admin_url(model, "change", pk)
+
+
+def get_admin_changelist_url(model):
+    """Return URL of the admin changelist of the model."""
+    return get_admin_url(model, "changelist")
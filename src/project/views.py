@@ -1,7 +1,27 @@
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
 from django.views import generic
 
+from .utils.metrics import registry
+
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
 
 class HomeView(generic.TemplateView):
     """A class to represent homepage view."""
 
     template_name = "home.html"
+
+
+class MetricsView(generic.View):
+    """A class to represent the view of the metrics of the requests."""
+
+    def get(self, request, *args, **kwargs):
+        if not (
+            request.user.is_staff
+            or request.META.get("REMOTE_ADDR") in settings.INTERNAL_IPS
+        ):
+            raise PermissionDenied
+
+        return HttpResponse(registry.export(), content_type=METRICS_CONTENT_TYPE)
@@ -0,0 +1,48 @@
+from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.template.response import TemplateResponse
+from django.utils.translation import gettext_lazy as _
+
+from project.utils import admin as admin_utils
+
+from . import evaluation
+from .models import EvaluationCounter
+
+
+@admin.register(EvaluationCounter)
+class EvaluationCounterAdmin(admin_utils.ModelAdmin):
+    """
+    A class to represent admin options for the EvaluationCounter model.
+
+    The changelist is the dashboard of the numbers of the employees in the
+    evaluation, computed from the counters (see `evaluation.get_summary`).
+    """
+
+    model_accusative = _("liczbę N")
+    model_genitive_plural = _("liczb N")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": self.model._meta.verbose_name_plural.capitalize(),
+            "summary": evaluation.get_summary(),
+            **(extra_context or {}),
+        }
+        return TemplateResponse(
+            request,
+            "admin/reports/evaluationcounter/dashboard.html",
+            context,
+        )
@@ -0,0 +1,296 @@
+from collections import Counter, defaultdict
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+
+from employees.models import Employee, Employment
+from project.utils.cache import bump_model_version
+
+from .models import EvaluationCounter, EvaluationEntry
+
+REFRESH_CHUNK_SIZE = 1000
+
+# Fields of the employees the keys of the counters depend on
+
+EMPLOYEE_FIELDS = {
+    "in_evaluation",
+    "discipline",
+    "discipline_id",
+    "status",
+    "status_id",
+}
+
+
+def get_primary_department():
+    """Return the subquery of the department of the employee's first employment."""
+    return Subquery(
+        Employment.objects.filter(employee=OuterRef("pk"), department__isnull=False)
+        .order_by("pk")
+        .values("department")[:1]
+    )
+
+
+def get_evaluated_employees(queryset=None):
+    """Return the employees in the evaluation annotated with the primary department."""
+    if queryset is None:
+        queryset = Employee.objects.all()
+
+    return queryset.filter(in_evaluation=True).annotate(
+        primary_department=get_primary_department()
+    )
+
+
+def get_keys(pks):
+    """Return the keys of the counters the employees are counted in, by their PKs."""
+    return {
+        pk: (discipline_id, department_id, status_id)
+        for pk, discipline_id, department_id, status_id in get_evaluated_employees(
+            Employee.objects.filter(pk__in=pks)
+        ).values_list("pk", "discipline", "primary_department", "status")
+    }
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def refresh(pks):
+    """
+    Update the counters of the employees of the given primary keys.
+
+    The keys of the counters the employees are counted in are compared with
+    the ones of their entries, and the counters and entries are updated by the
+    differences, so refreshing the same employees again changes nothing. Meant
+    to be called after any change of the employees or their employments,
+    including the bulk ones (the deleted employees are discounted as well).
+    """
+    delta = Counter()
+    with transaction.atomic():
+        for chunk in _chunks(sorted(set(pks)), REFRESH_CHUNK_SIZE):
+            delta.update(_refresh_entries(chunk))
+        _update_counters(delta)
+
+    if any(delta.values()):
+        bump_model_version(EvaluationCounter)
+
+    return delta
+
+
+def _refresh_entries(pks):
+    entries = EvaluationEntry.objects.in_bulk(pks)
+    keys = get_keys(pks)
+
+    delta = Counter()
+    deleted_pks, changed_entries = [], []
+    for pk in pks:
+        entry, key = entries.get(pk), keys.get(pk)
+        old_key = entry.get_key() if entry else None
+        if old_key == key:
+            continue
+
+        if old_key is not None:
+            delta[old_key] -= 1
+        if key is not None:
+            delta[key] += 1
+
+        if key is None:
+            deleted_pks.append(pk)
+        else:
+            discipline_id, department_id, status_id = key
+            changed_entries.append(
+                EvaluationEntry(
+                    employee_id=pk,
+                    discipline_id=discipline_id,
+                    department_id=department_id,
+                    status_id=status_id,
+                )
+            )
+
+    if deleted_pks:
+        EvaluationEntry.objects.filter(pk__in=deleted_pks).delete()
+    if changed_entries:
+        EvaluationEntry.objects.filter(
+            pk__in=[entry.pk for entry in changed_entries]
+        ).delete()
+        EvaluationEntry.objects.bulk_create(changed_entries)
+
+    return delta
+
+
+def _update_counters(delta):
+    """
+    Add the differences to the counters of the keys (creating the missing ones).
+
+    The counter of the key is created once: the creation conflicting with the
+    concurrent one (by the unique constraint of the key) updates it instead.
+    """
+    for (discipline_id, department_id, status_id), count in delta.items():
+        if not count:
+            continue
+
+        counters = EvaluationCounter.objects.filter(
+            discipline_id=discipline_id,
+            department_id=department_id,
+            status_id=status_id,
+        )
+        if counters.update(count=F("count") + count):
+            continue
+
+        try:
+            with transaction.atomic():
+                EvaluationCounter.objects.create(
+                    discipline_id=discipline_id,
+                    department_id=department_id,
+                    status_id=status_id,
+                    count=count,
+                )
+        except IntegrityError:
+            counters.update(count=F("count") + count)
+
+
+def refresh_deleted(**key):
+    """
+    Update the counters of the employees counted under the object deleted.
+
+    The counters of the object (the discipline, department or status given by
+    the field of the key, e.g. `discipline_id=pk`) are deleted along with it,
+    so the entries of its employees are dropped and the employees are counted
+    again under their current keys (see `refresh`).
+    """
+    with transaction.atomic():
+        entries = EvaluationEntry.objects.filter(**key)
+        pks = list(entries.values_list("pk", flat=True))
+        entries.delete()
+        return refresh(pks)
+
+
+def reconcile():
+    """
+    Recompute all the counters and entries from scratch.
+
+    Return the number of the counters changed.
+    """
+    with transaction.atomic():
+        employees = get_evaluated_employees()
+
+        EvaluationEntry.objects.all().delete()
+        for chunk in _chunks(
+            employees.values_list(
+                "pk", "discipline", "primary_department", "status"
+            ).iterator(chunk_size=REFRESH_CHUNK_SIZE),
+            REFRESH_CHUNK_SIZE,
+        ):
+            EvaluationEntry.objects.bulk_create(
+                EvaluationEntry(
+                    employee_id=pk,
+                    discipline_id=discipline_id,
+                    department_id=department_id,
+                    status_id=status_id,
+                )
+                for pk, discipline_id, department_id, status_id in chunk
+            )
+
+        counts = {
+            (discipline_id, department_id, status_id): count
+            for discipline_id, department_id, status_id, count in employees.order_by()
+            .values("discipline", "primary_department", "status")
+            .annotate(count=Count("pk"))
+            .values_list("discipline", "primary_department", "status", "count")
+        }
+        old_counts = Counter()
+        for counter in EvaluationCounter.objects.all():
+            old_counts[
+                counter.discipline_id, counter.department_id, counter.status_id
+            ] += counter.count
+
+        EvaluationCounter.objects.all().delete()
+        EvaluationCounter.objects.bulk_create(
+            EvaluationCounter(
+                discipline_id=discipline_id,
+                department_id=department_id,
+                status_id=status_id,
+                count=count,
+            )
+            for (discipline_id, department_id, status_id), count in counts.items()
+        )
+
+    bump_model_version(EvaluationCounter)
+
+    return sum(
+        1
+        for key in set(counts) | set(old_counts)
+        if counts.get(key, 0) != old_counts.get(key, 0)
+    )
+
+
+def get_summary():
+    """
+    Return the numbers of the employees in the evaluation.
+
+    The numbers are the total one and the ones per discipline and per department
+    (broken down by the statuses and disciplines, respectively), all computed
+    from the counters by a single query.
+    """
+    disciplines, departments = {}, {}
+    total = 0
+    for (
+        discipline_id,
+        discipline_code,
+        discipline_name,
+        department_id,
+        department_code,
+        status_code,
+        count,
+    ) in (
+        EvaluationCounter.objects.filter(count__gt=0)
+        .order_by("discipline__code", "department__full_code")
+        .values_list(
+            "discipline",
+            "discipline__code",
+            "discipline__name",
+            "department",
+            "department__full_code",
+            "status__code",
+            "count",
+        )
+    ):
+        total += count
+
+        discipline = disciplines.setdefault(
+            discipline_id,
+            {
+                "id": discipline_id,
+                "code": discipline_code,
+                "name": discipline_name,
+                "count": 0,
+                "statuses": defaultdict(int),
+            },
+        )
+        discipline["count"] += count
+        discipline["statuses"][status_code] += count
+
+        department = departments.setdefault(
+            department_id,
+            {
+                "id": department_id,
+                "full_code": department_code,
+                "count": 0,
+                "disciplines": defaultdict(int),
+            },
+        )
+        department["count"] += count
+        department["disciplines"][discipline_code] += count
+
+    for item in [*disciplines.values(), *departments.values()]:
+        for name in ("statuses", "disciplines"):
+            if name in item:
+                item[name] = dict(item[name])
+
+    return {
+        "total": total,
+        "disciplines": list(disciplines.values()),
+        "departments": list(departments.values()),
+    }
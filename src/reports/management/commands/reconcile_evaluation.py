@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from reports import evaluation
+
+
+class Command(BaseCommand):
+    """A command to recompute the evaluation counters from scratch."""
+
+    help = "Recompute the counters of the employees in the evaluation (liczba N)."
+
+    def handle(self, *args, **options):
+        changed = evaluation.reconcile()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Reconciled the evaluation counters ({changed} fixed).")
+        )
@@ -0,0 +1,84 @@
+from django.db import models
+from django.db.models.functions import Coalesce
+from django.utils.translation import gettext_lazy as _
+
+from employees.models import Discipline, Status
+from units.models import Department
+
+
+class EvaluationCounter(models.Model):
+    """
+    A class to represent the EvaluationCounter objects.
+
+    The counter is the number of the employees in the evaluation (i.e. counted
+    in the "liczba N") of the discipline, the status and the primary department
+    (the department of the first employment, see `evaluation`). The counters
+    are additive: the sum of the counters of the discipline is the number of
+    its employees in the evaluation.
+    """
+
+    discipline = models.ForeignKey(
+        to=Discipline,
+        on_delete=models.CASCADE,
+        verbose_name=Discipline._meta.verbose_name,
+        null=True,
+    )
+    department = models.ForeignKey(
+        to=Department,
+        on_delete=models.CASCADE,
+        verbose_name=Department._meta.verbose_name,
+        null=True,
+    )
+    status = models.ForeignKey(
+        to=Status,
+        on_delete=models.CASCADE,
+        verbose_name=Status._meta.verbose_name,
+        null=True,
+    )
+    count = models.IntegerField(_("liczba pracowników"), default=0)
+
+    class Meta:
+        verbose_name = _("liczba N")
+        verbose_name_plural = _("liczba N")
+        ordering = ("id",)
+        indexes = [
+            models.Index(
+                fields=["discipline", "department", "status"],
+                name="evaluation_counter_key_idx",
+            ),
+        ]
+        constraints = [
+            # The keys of the NULL fields (e.g. no discipline) are unique as well
+            models.UniqueConstraint(
+                Coalesce("discipline", 0),
+                Coalesce("department", 0),
+                Coalesce("status", 0),
+                name="evaluation_counter_key_unique",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.discipline} / {self.department} / {self.status}: {self.count}"
+
+
+class EvaluationEntry(models.Model):
+    """
+    A class to represent the EvaluationEntry objects.
+
+    The entry is the key of the counter the employee is counted in, so that the
+    updates of the counters are idempotent (see `evaluation.refresh`). The
+    entries refer to the objects by plain IDs, so they outlive the employees
+    deleted until the counters are refreshed.
+    """
+
+    employee_id = models.BigIntegerField(primary_key=True)
+    discipline_id = models.BigIntegerField(null=True)
+    department_id = models.BigIntegerField(null=True)
+    status_id = models.BigIntegerField(null=True)
+
+    class Meta:
+        verbose_name = _("wpis liczby N")
+        verbose_name_plural = _("wpisy liczby N")
+
+    def get_key(self):
+        return (self.discipline_id, self.department_id, self.status_id)
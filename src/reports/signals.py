@@ -0,0 +1,75 @@
+from django.db.models import signals
+from django.dispatch import receiver
+
+from employees.models import Discipline, Employee, Employment, Status
+from project.utils.signals import post_bulk_update
+from units.models import Department
+
+from . import evaluation
+
+
+@receiver(signals.post_save, sender=Employee)
+@receiver(signals.post_delete, sender=Employee)
+def refresh_employee_counters(sender, instance, update_fields=None, **kwargs):
+    """Update the evaluation counters of the employee saved or deleted."""
+    if update_fields is not None and not (
+        evaluation.EMPLOYEE_FIELDS & set(update_fields)
+    ):
+        return None
+
+    evaluation.refresh([instance.pk])
+
+
+@receiver(post_bulk_update, sender=Employee)
+def refresh_bulk_updated_employee_counters(sender, pks, update_fields, **kwargs):
+    """Update the evaluation counters of the employees updated in bulk."""
+    if evaluation.EMPLOYEE_FIELDS & set(update_fields):
+        evaluation.refresh(pks)
+
+
+@receiver(post_bulk_update, sender=Employment)
+def refresh_bulk_updated_employment_counters(sender, pks, update_fields, **kwargs):
+    """Update the evaluation counters of the employees of the employments updated."""
+    if "department" in update_fields:
+        evaluation.refresh(
+            Employment.objects.filter(pk__in=pks).values_list("employee", flat=True)
+        )
+
+
+@receiver(signals.pre_save, sender=Employment)
+def remember_employment_employee(sender, instance, update_fields=None, **kwargs):
+    """Remember the employee of the employment before it is moved to another one."""
+    if instance.pk is None or (
+        update_fields is not None and "employee" not in update_fields
+    ):
+        return None
+
+    instance._evaluation_employee_ids = set(
+        Employment.objects.filter(pk=instance.pk).values_list("employee", flat=True)
+    )
+
+
+@receiver(signals.post_save, sender=Employment)
+@receiver(signals.post_delete, sender=Employment)
+def refresh_employment_counters(sender, instance, **kwargs):
+    """Update the evaluation counters of the employee of the employment."""
+    evaluation.refresh(
+        {instance.employee_id, *instance.__dict__.pop("_evaluation_employee_ids", ())}
+    )
+
+
+# Fields of the keys of the evaluation counters: {model: field}
+
+KEY_FIELDS = {
+    Discipline: "discipline_id",
+    Department: "department_id",
+    Status: "status_id",
+}
+
+
+@receiver(signals.post_delete, sender=Discipline)
+@receiver(signals.post_delete, sender=Department)
+@receiver(signals.post_delete, sender=Status)
+def refresh_deleted_key_counters(sender, instance, **kwargs):
+    """Update the evaluation counters of the employees of the object deleted."""
+    evaluation.refresh_deleted(**{KEY_FIELDS[sender]: instance.pk})
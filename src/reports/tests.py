@@ -0,0 +1,288 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from employees.models import (
+    Degree,
+    Discipline,
+    Domain,
+    Employee,
+    Employment,
+    Group,
+    Position,
+    Status,
+    Subgroup,
+)
+from units.models import Department, Faculty, University
+
+from . import evaluation
+from .models import EvaluationCounter, EvaluationEntry
+
+User = get_user_model()
+
+
+class EvaluationTests(TestCase):
+    """Tests of the counters of the employees in the evaluation."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "pw")
+
+        university = University.objects.create(name="Uczelnia", code="U")
+        faculty = Faculty.objects.create(
+            name="Wydział", code="W", university=university
+        )
+        cls.departments = [
+            Department.objects.create(
+                name=f"Katedra {i}", code=f"K{i}", faculty=faculty
+            )
+            for i in range(2)
+        ]
+        domain = Domain.objects.create(name="Dziedzina", code="D")
+        cls.disciplines = [
+            Discipline.objects.create(
+                name=f"Dyscyplina {i}", code=f"D{i}", domain=domain
+            )
+            for i in range(2)
+        ]
+        group = Group.objects.create(name="Grupa", code="G")
+        cls.subgroup = Subgroup.objects.create(group=group, name="Podgrupa", code="P")
+        cls.position = Position.objects.create(name="Stanowisko")
+        cls.position.subgroup_set.add(cls.subgroup)
+        cls.status = Status.objects.create(name="Status", code="S")
+        cls.degree = Degree.objects.create(code="dr")
+
+    def create_employee(self, discipline=None, in_evaluation=True, departments=()):
+        index = Employee.objects.count()
+        employee = Employee.objects.create(
+            user=User.objects.create_user(f"user{index}"),
+            status=self.status,
+            degree=self.degree,
+            discipline=discipline,
+            in_evaluation=in_evaluation,
+        )
+        for department in departments:
+            self.create_employment(employee, department)
+        return employee
+
+    def create_employment(self, employee, department):
+        return Employment.objects.create(
+            employee=employee,
+            position=self.position,
+            subgroup=self.subgroup,
+            department=department,
+        )
+
+    def get_counts(self):
+        return {
+            (counter.discipline_id, counter.department_id, counter.status_id): (
+                counter.count
+            )
+            for counter in EvaluationCounter.objects.filter(count__gt=0)
+        }
+
+    def assertCountsReconciled(self):
+        counts = self.get_counts()
+        self.assertEqual(evaluation.reconcile(), 0)
+        self.assertEqual(self.get_counts(), counts)
+
+    def test_incremental_updates(self):
+        first, second = self.disciplines
+        employee = self.create_employee(first, departments=self.departments)
+        self.create_employee(first, departments=self.departments[1:])
+        self.create_employee(second, in_evaluation=False)
+
+        self.assertEqual(
+            self.get_counts(),
+            {
+                (first.pk, self.departments[0].pk, self.status.pk): 1,
+                (first.pk, self.departments[1].pk, self.status.pk): 1,
+            },
+        )
+        self.assertCountsReconciled()
+
+        employee.discipline = second
+        employee.save()
+        self.assertEqual(
+            self.get_counts()[(second.pk, self.departments[0].pk, self.status.pk)], 1
+        )
+        self.assertCountsReconciled()
+
+        employee.in_evaluation = False
+        employee.save(update_fields=["in_evaluation"])
+        self.assertEqual(sum(self.get_counts().values()), 1)
+        self.assertCountsReconciled()
+
+    def test_employment_changes(self):
+        discipline = self.disciplines[0]
+        employee = self.create_employee(discipline)
+        other = self.create_employee(discipline)
+        self.assertEqual(self.get_counts(), {(discipline.pk, None, self.status.pk): 2})
+
+        employment = self.create_employment(employee, self.departments[0])
+        self.assertEqual(
+            self.get_counts(),
+            {
+                (discipline.pk, None, self.status.pk): 1,
+                (discipline.pk, self.departments[0].pk, self.status.pk): 1,
+            },
+        )
+
+        # The employment moved to another employee updates the counters of both
+        employment.employee = other
+        employment.save()
+        self.assertEqual(
+            self.get_counts(),
+            {
+                (discipline.pk, None, self.status.pk): 1,
+                (discipline.pk, self.departments[0].pk, self.status.pk): 1,
+            },
+        )
+        self.assertEqual(
+            EvaluationEntry.objects.get(pk=other.pk).department_id,
+            self.departments[0].pk,
+        )
+        self.assertCountsReconciled()
+
+        employment.delete()
+        self.assertEqual(self.get_counts(), {(discipline.pk, None, self.status.pk): 2})
+        self.assertCountsReconciled()
+
+    def test_deletions(self):
+        discipline = self.disciplines[0]
+        employee = self.create_employee(discipline, departments=self.departments)
+        self.create_employee(discipline)
+
+        employee.user.delete()
+        self.assertEqual(self.get_counts(), {(discipline.pk, None, self.status.pk): 1})
+        self.assertFalse(EvaluationEntry.objects.filter(pk=employee.pk).exists())
+
+        discipline.delete()
+        self.assertEqual(self.get_counts(), {(None, None, self.status.pk): 1})
+
+    def test_key_deletions(self):
+        first, second = self.departments
+        employee = self.create_employee(self.disciplines[0], departments=[first])
+        self.create_employment(employee, second)
+        self.create_employee(self.disciplines[1], departments=[second])
+
+        # Only the employees counted under the department deleted are refreshed
+        with mock.patch.object(evaluation, "reconcile") as reconcile, mock.patch.object(
+            evaluation, "refresh", wraps=evaluation.refresh
+        ) as refresh:
+            first.delete()
+        reconcile.assert_not_called()
+        refresh.assert_called_once_with([employee.pk])
+        self.assertEqual(
+            self.get_counts(),
+            {
+                (self.disciplines[0].pk, second.pk, self.status.pk): 1,
+                (self.disciplines[1].pk, second.pk, self.status.pk): 1,
+            },
+        )
+        self.assertCountsReconciled()
+
+        self.status.delete()
+        self.assertEqual(
+            self.get_counts(),
+            {
+                (self.disciplines[0].pk, second.pk, None): 1,
+                (self.disciplines[1].pk, second.pk, None): 1,
+            },
+        )
+        self.assertCountsReconciled()
+
+    def test_unique_counter_keys(self):
+        EvaluationCounter.objects.create(count=1)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            EvaluationCounter.objects.create(count=1)
+
+        evaluation._update_counters({(None, None, None): 2})
+        self.assertEqual(self.get_counts(), {(None, None, None): 3})
+
+    def test_refresh_is_idempotent(self):
+        employee = self.create_employee(self.disciplines[0])
+        counts = self.get_counts()
+
+        self.assertFalse(evaluation.refresh([employee.pk]))
+        self.assertEqual(self.get_counts(), counts)
+
+        # The counters broken behind the back of the signals are fixed by reconcile
+        EvaluationCounter.objects.update(count=5)
+        self.assertEqual(evaluation.reconcile(), 1)
+        self.assertEqual(self.get_counts(), counts)
+
+    def test_reconcile_command(self):
+        self.create_employee(self.disciplines[0])
+        EvaluationCounter.objects.all().delete()
+
+        stdout = StringIO()
+        call_command("reconcile_evaluation", stdout=stdout)
+        self.assertIn("1 fixed", stdout.getvalue())
+        self.assertEqual(sum(self.get_counts().values()), 1)
+
+    def test_summary(self):
+        first, second = self.disciplines
+        self.create_employee(first, departments=self.departments[:1])
+        self.create_employee(first, departments=self.departments[1:])
+        self.create_employee(second, departments=self.departments[1:])
+
+        with CaptureQueriesContext(connection) as context:
+            summary = evaluation.get_summary()
+        self.assertEqual(len(context), 1)
+
+        self.assertEqual(summary["total"], 3)
+        self.assertEqual(
+            [
+                (discipline["code"], discipline["count"], discipline["statuses"])
+                for discipline in summary["disciplines"]
+            ],
+            [("D0", 2, {"S": 2}), ("D1", 1, {"S": 1})],
+        )
+        self.assertEqual(
+            [
+                (department["count"], department["disciplines"])
+                for department in summary["departments"]
+            ],
+            [(1, {"D0": 1}), (2, {"D0": 1, "D1": 1})],
+        )
+
+    def test_dashboard(self):
+        self.create_employee(self.disciplines[0], departments=self.departments)
+        self.client.force_login(self.admin)
+
+        response = self.client.get(
+            reverse("admin:reports_evaluationcounter_changelist")
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["summary"]["total"], 1)
+        self.assertContains(response, "Dyscyplina 0")
+
+        response = self.client.get(reverse("admin:reports_evaluationcounter_add"))
+        self.assertEqual(response.status_code, 403)
+
+    def test_api(self):
+        self.create_employee(self.disciplines[0])
+        url = reverse("reports:evaluation")
+
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(User.objects.create_user("staff", is_staff=True))
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.force_login(self.admin)
+        response = self.client.get(url)
+        self.assertEqual(response.json()["total"], 1)
+
+        etag = response["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.create_employee(self.disciplines[0])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["total"], 2)
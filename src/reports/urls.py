@@ -0,0 +1,9 @@
+from django.urls import path
+
+from . import views
+
+app_name = "reports"
+
+urlpatterns = [
+    path("evaluation/", view=views.EvaluationView.as_view(), name="evaluation"),
+]
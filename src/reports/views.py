@@ -0,0 +1,16 @@
+from employees.models import Discipline, Status
+from project.utils import api
+from units.models import Department
+
+from . import evaluation
+from .models import EvaluationCounter
+
+
+class EvaluationView(api.ApiView):
+    """A view to return the numbers of the employees in the evaluation as JSON."""
+
+    dependencies = (EvaluationCounter, Discipline, Department, Status)
+    permission_required = "reports.view_evaluationcounter"
+
+    def get(self, request, *args, **kwargs):
+        return self.get_json_response(evaluation.get_summary())
@@ -0,0 +1,25 @@
+from . import index
+
+
+class SearchIndexMixin:
+    """
+    A class to represent admin options searching the objects by the index.
+
+    Unlike the default admin search (the infix, case-insensitive `icontains`
+    matching of the search fields), the words of the search term match the
+    prefixes of the words of the search fields, with the diacritics folded
+    (e.g. "zolk" matches "Żółkiewski", but "kiewski" does not). The default
+    search is used until the index of the model is built (e.g. by the
+    `rebuild_search_index` command on the existing database).
+    """
+
+    def __init__(self, model, admin_site):
+        super().__init__(model, admin_site)
+        self.search_index = index.register(model, self.search_fields)
+
+    def get_search_results(self, request, queryset, search_term):
+        """Return the objects matching the search term (with no duplicates)."""
+        if not search_term or not self.search_index.is_built():
+            return super().get_search_results(request, queryset, search_term)
+
+        return self.search_index.search(queryset, search_term), False
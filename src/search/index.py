@@ -0,0 +1,336 @@
+import re
+import unicodedata
+from functools import partial
+from itertools import islice
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import signals
+from django.utils.text import smart_split, unescape_string_literal
+
+from project.utils.signals import post_bulk_update
+
+from .models import TOKEN_MAX_LENGTH, SearchIndexBuild, SearchToken
+
+# Letters not decomposed by the Unicode normalization
+
+FOLDED_LETTERS = str.maketrans({"ł": "l", "Ł": "L", "ø": "o", "Ø": "O", "ß": "ss"})
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+INDEX_CHUNK_SIZE = 2000
+
+# Prefixes of the admin search fields
+
+SEARCH_FIELD_PREFIXES = "^=@"
+
+_indexes = {}
+
+
+def fold_text(text):
+    """Return the text lowercased and with the diacritics removed."""
+    text = unicodedata.normalize("NFKD", str(text).translate(FOLDED_LETTERS))
+    return "".join(char for char in text if not unicodedata.combining(char)).lower()
+
+
+def tokenize(text):
+    """Return the set of the tokens of the text folded by `fold_text`."""
+    return {
+        token[:TOKEN_MAX_LENGTH] for token in TOKEN_PATTERN.findall(fold_text(text))
+    }
+
+
+def tokenize_search_term(search_term):
+    """Return the set of the tokens of the search term (quoted phrases included)."""
+    tokens = set()
+    for term in smart_split(search_term):
+        if term[0] in "\"'" and term[0] == term[-1] and len(term) > 1:
+            term = unescape_string_literal(term)
+        tokens |= tokenize(term)
+
+    return tokens
+
+
+def get_prefix_successor(prefix):
+    """
+    Return the least string greater than all the strings of the given prefix.
+
+    The tokens of the given prefix are looked up by the range comparison, which
+    (unlike `LIKE`) can use the index regardless of the database backend.
+    """
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class SearchIndex:
+    """
+    A class to represent the search index of the model.
+
+    The index stores the tokens of the values of the fields of the model objects
+    (the field paths may span relations, like the admin `search_fields`), folded
+    by `fold_text`, one `SearchToken` per token and object. The objects match
+    the search term if each token of the term is a prefix of any of their tokens.
+    The index is updated whenever the object or any of the related objects the
+    fields span is saved or deleted (see `connect`).
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.fields = []
+
+        # The fields of the models the index depends on: {(model, lookup): names}
+        self.dependencies = {}
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}: {self.model._meta.label}>"
+
+    @property
+    def content_type(self):
+        return ContentType.objects.get_for_model(self.model)
+
+    def add_fields(self, fields):
+        """Add the fields to the index and connect the signals they depend on."""
+        for field in fields:
+            field = field.lstrip(SEARCH_FIELD_PREFIXES)
+            if field in self.fields:
+                continue
+
+            self.fields.append(field)
+            self.add_dependencies(field)
+
+    def add_dependencies(self, field):
+        """Add the dependencies of the index on the models the field path spans."""
+        model, parts = self.model, field.split("__")
+        for i, part in enumerate(parts):
+            model_field = model._meta.get_field(part)
+            lookup = "__".join(parts[:i])
+            names = self.dependencies.setdefault((model, lookup), set())
+            names.add(model_field.name)
+            if getattr(model_field, "attname", None):
+                names.add(model_field.attname)
+
+            if model_field.is_relation:
+                if model_field.many_to_many:
+                    self.connect_m2m(model_field, "__".join(parts[: i + 1]))
+                model = model_field.related_model
+
+        for (model, lookup), names in self.dependencies.items():
+            self.connect(model, lookup)
+
+    def connect(self, model, lookup):
+        """Connect the signals of the model to the updates of the index."""
+        dispatch_uid = f"search:{self.model._meta.label_lower}:{lookup}"
+        signals.post_save.connect(
+            partial(self.on_save, lookup=lookup),
+            sender=model,
+            weak=False,
+            dispatch_uid=dispatch_uid,
+        )
+        signals.pre_delete.connect(
+            partial(self.on_pre_delete, lookup=lookup),
+            sender=model,
+            weak=False,
+            dispatch_uid=dispatch_uid,
+        )
+        signals.post_delete.connect(
+            partial(self.on_post_delete, lookup=lookup),
+            sender=model,
+            weak=False,
+            dispatch_uid=dispatch_uid,
+        )
+        post_bulk_update.connect(
+            partial(self.on_bulk_update, lookup=lookup),
+            sender=model,
+            weak=False,
+            dispatch_uid=dispatch_uid,
+        )
+
+    def connect_m2m(self, model_field, lookup):
+        """Connect the changes of the many-to-many relation to the index updates."""
+        through = (
+            getattr(model_field, "through", None) or model_field.remote_field.through
+        )
+        signals.m2m_changed.connect(
+            partial(self.on_m2m_changed, lookup=lookup),
+            sender=through,
+            weak=False,
+            dispatch_uid=f"search:{self.model._meta.label_lower}:{lookup}",
+        )
+
+    def get_affected_pks(self, instance, lookup):
+        """Return the primary keys of the objects indexed with the instance data."""
+        if not lookup:
+            return {instance.pk}
+
+        return set(
+            self.model._default_manager.filter(**{lookup: instance}).values_list(
+                "pk", flat=True
+            )
+        )
+
+    def on_save(self, sender, instance, update_fields=None, lookup="", **kwargs):
+        if update_fields is not None and not (
+            self.dependencies[(sender, lookup)] & set(update_fields)
+        ):
+            return None
+
+        self.update(self.get_affected_pks(instance, lookup))
+
+    def on_bulk_update(self, sender, pks, update_fields, lookup="", **kwargs):
+        if not (self.dependencies[(sender, lookup)] & set(update_fields)):
+            return None
+
+        if not lookup:
+            self.update(pks)
+        else:
+            self.update(
+                self.model._default_manager.filter(
+                    **{f"{lookup}__in": pks}
+                ).values_list("pk", flat=True)
+            )
+
+    def on_pre_delete(self, sender, instance, lookup="", **kwargs):
+        affected_pks = instance.__dict__.setdefault("_search_affected_pks", {})
+        affected_pks[(self.model, lookup)] = self.get_affected_pks(instance, lookup)
+
+    def on_post_delete(self, sender, instance, lookup="", **kwargs):
+        affected_pks = instance.__dict__.get("_search_affected_pks", {})
+        self.update(affected_pks.pop((self.model, lookup), set()))
+
+    def on_m2m_changed(self, sender, instance, action, model, pk_set, lookup, **kwargs):
+        if action not in ("pre_clear", "post_add", "post_remove", "post_clear"):
+            return None
+
+        cleared_pks = instance.__dict__.setdefault("_search_cleared_pks", {})
+        if isinstance(instance, self.model):
+            pks = {instance.pk}
+        elif model is self.model and pk_set is not None:
+            pks = set(pk_set)
+        elif action == "post_clear":
+            pks = cleared_pks.pop((self.model, lookup), set())
+        else:
+            pks = self.get_affected_pks(instance, lookup)
+
+        if action == "pre_clear":
+            cleared_pks[(self.model, lookup)] = pks
+        else:
+            self.update(pks)
+
+    def build_tokens(self, queryset):
+        """Yield the SearchToken objects of the objects of the queryset."""
+        content_type = self.content_type
+
+        rows = (
+            queryset.order_by("pk")
+            .values_list("pk", *self.fields)
+            .iterator(chunk_size=INDEX_CHUNK_SIZE)
+        )
+        pk, tokens = None, set()
+        for row_pk, *values in rows:
+            if row_pk != pk:
+                yield from self._make_tokens(content_type, pk, tokens)
+                pk, tokens = row_pk, set()
+            for value in values:
+                if value is not None:
+                    tokens |= tokenize(value)
+        yield from self._make_tokens(content_type, pk, tokens)
+
+    @staticmethod
+    def _make_tokens(content_type, pk, tokens):
+        for token in tokens:
+            yield SearchToken(content_type=content_type, object_id=pk, token=token)
+
+    def update(self, pks):
+        """Update the tokens of the objects of the primary keys given."""
+        content_type = self.content_type
+        for chunk in _chunks(sorted(pks), INDEX_CHUNK_SIZE):
+            SearchToken.objects.filter(
+                content_type=content_type,
+                object_id__in=chunk,
+            ).delete()
+            SearchToken.objects.bulk_create(
+                self.build_tokens(self.model._default_manager.filter(pk__in=chunk)),
+                batch_size=INDEX_CHUNK_SIZE,
+            )
+
+    def rebuild(self):
+        """Rebuild the index of all the objects of the model; return tokens count."""
+        SearchToken.objects.filter(content_type=self.content_type).delete()
+
+        count = 0
+        tokens = self.build_tokens(self.model._default_manager.all())
+        for chunk in _chunks(tokens, INDEX_CHUNK_SIZE):
+            SearchToken.objects.bulk_create(chunk)
+            count += len(chunk)
+
+        SearchIndexBuild.objects.update_or_create(content_type=self.content_type)
+        return count
+
+    def is_built(self):
+        """
+        Return True if the index has been built by `rebuild`.
+
+        The tokens of the objects saved before are no evidence of the index of
+        all the objects.
+        """
+        return SearchIndexBuild.objects.filter(content_type=self.content_type).exists()
+
+    def search(self, queryset, search_term):
+        """Return the objects of the queryset matching the search term."""
+        content_type = self.content_type
+        for token in sorted(tokenize_search_term(search_term)):
+            queryset = queryset.filter(
+                pk__in=SearchToken.objects.filter(
+                    content_type=content_type,
+                    token__gte=token,
+                    token__lt=get_prefix_successor(token),
+                ).values("object_id")
+            )
+
+        return queryset
+
+
+def register(model, fields):
+    """Add the fields of the model to the search index and return the index."""
+    index = _indexes.get(model)
+    if index is None:
+        index = _indexes[model] = SearchIndex(model)
+    index.add_fields(fields)
+
+    return index
+
+
+def get_index(model):
+    """Return the search index of the model (None if it is not indexed)."""
+    return _indexes.get(model)
+
+
+def get_indexes():
+    """Return the list of all the search indexes."""
+    return list(_indexes.values())
+
+
+def update_objects(model, pks):
+    """
+    Update the index of the objects of the model and the objects depending on them.
+
+    Meant to be called after the bulk operations, which do not send the signals
+    the indexes are updated by.
+    """
+    pks = set(pks)
+    for index in get_indexes():
+        for dependency_model, lookup in index.dependencies:
+            if dependency_model is not model:
+                continue
+            if not lookup:
+                index.update(pks)
+            else:
+                index.update(
+                    index.model._default_manager.filter(
+                        **{f"{lookup}__in": pks}
+                    ).values_list("pk", flat=True)
+                )
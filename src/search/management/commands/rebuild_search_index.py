@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from search import index
+
+
+class Command(BaseCommand):
+    """A command to rebuild the search indexes."""
+
+    help = "Rebuild the search indexes of all (or the given) models."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "models",
+            nargs="*",
+            help="Labels of the models to rebuild the indexes of (app.Model).",
+        )
+
+    def handle(self, *args, **options):
+        labels = {label.lower() for label in options["models"]}
+        for search_index in index.get_indexes():
+            if labels and search_index.model._meta.label_lower not in labels:
+                continue
+
+            with transaction.atomic():
+                count = search_index.rebuild()
+
+            self.stdout.write(
+                f"{search_index.model._meta.label}: {count} tokens indexed."
+            )
+
+        self.stdout.write(self.style.SUCCESS("Rebuilt the search indexes."))
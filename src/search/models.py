@@ -0,0 +1,52 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+TOKEN_MAX_LENGTH = 64
+
+
+class SearchToken(models.Model):
+    """A class to represent the SearchToken objects."""
+
+    content_type = models.ForeignKey(
+        to=ContentType,
+        on_delete=models.CASCADE,
+        verbose_name=_("typ obiektu"),
+    )
+    object_id = models.PositiveBigIntegerField(_("ID obiektu"))
+    token = models.CharField(_("token"), max_length=TOKEN_MAX_LENGTH)
+
+    class Meta:
+        verbose_name = _("token wyszukiwania")
+        verbose_name_plural = _("tokeny wyszukiwania")
+        indexes = [
+            models.Index(
+                fields=("content_type", "token", "object_id"),
+                name="search_token_prefix_idx",
+            ),
+            models.Index(
+                fields=("content_type", "object_id"),
+                name="search_token_object_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return self.token
+
+
+class SearchIndexBuild(models.Model):
+    """A class to represent the SearchIndexBuild objects."""
+
+    content_type = models.OneToOneField(
+        to=ContentType,
+        on_delete=models.CASCADE,
+        verbose_name=_("typ obiektu"),
+    )
+    built_at = models.DateTimeField(_("czas budowy"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("budowa indeksu wyszukiwania")
+        verbose_name_plural = _("budowy indeksu wyszukiwania")
+
+    def __str__(self):
+        return str(self.content_type)
@@ -0,0 +1,230 @@
+import time
+from io import StringIO
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, tag
+from django.urls import reverse
+
+from employees.models import Employee, Employment, Group, Position, Subgroup
+from project.test_runner import BENCHMARK_TAG
+from units.models import Department, Faculty, University
+
+from . import index
+from .admin import SearchIndexMixin
+from .models import SearchIndexBuild, SearchToken
+
+User = get_user_model()
+
+
+class FoldTextTests(TestCase):
+    """Tests of the folding of the text indexed."""
+
+    def test_fold_text(self):
+        self.assertEqual(index.fold_text("Łukasz Żółkiewski"), "lukasz zolkiewski")
+        self.assertEqual(index.fold_text("ĄĆĘŃÓŚŹŻ"), "acenoszz")
+
+    def test_tokenize_search_term(self):
+        self.assertEqual(
+            index.tokenize_search_term('Łukasz "Nowak-Kowalski"'),
+            {"lukasz", "nowak", "kowalski"},
+        )
+
+
+class SearchIndexTests(TestCase):
+    """Tests of the search of the admin changelists by the search index."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "pw")
+
+        cls.university = University.objects.create(
+            name="Politechnika Łódzka", code="PŁ"
+        )
+        cls.faculty = Faculty.objects.create(
+            name="Wydział Fizyki", code="WF", university=cls.university
+        )
+        cls.department = Department.objects.create(
+            name="Katedra Optyki", code="KO", faculty=cls.faculty
+        )
+        cls.subgroup = Subgroup.objects.create(
+            group=Group.objects.create(name="Grupa", code="G"),
+            name="Badawcza",
+            code="B",
+        )
+        cls.position = Position.objects.create(name="Profesor")
+
+        cls.user = User.objects.create_user(
+            "lzolkiewski", first_name="Łukasz", last_name="Żółkiewski"
+        )
+        cls.employee = Employee.objects.create(
+            user=cls.user, orcid="0000-0002-1825-0097"
+        )
+        cls.employment = Employment.objects.create(
+            employee=cls.employee,
+            position=cls.position,
+            department=cls.department,
+        )
+        for search_index in index.get_indexes():
+            search_index.rebuild()
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def search(self, model, search_term):
+        response = self.client.get(
+            reverse(
+                f"admin:{model._meta.app_label}_{model._meta.model_name}_changelist"
+            ),
+            {"q": search_term},
+        )
+        self.assertEqual(response.status_code, 200)
+        return list(response.context["cl"].result_list)
+
+    def test_diacritics_folded(self):
+        for search_term in ("lukasz", "ŁUKASZ", "zolk", "Łuk Żół", "0002"):
+            with self.subTest(search_term=search_term):
+                self.assertEqual(self.search(Employee, search_term), [self.employee])
+
+        self.assertEqual(self.search(Employee, "lukasz nowak"), [])
+        self.assertEqual(self.search(User, "lukasz"), [self.user])
+        self.assertEqual(self.search(Employment, "profesor lukasz"), [self.employment])
+
+    def test_related_object_saved(self):
+        self.user.last_name = "Nowak"
+        self.user.save()
+
+        self.assertEqual(self.search(Employee, "nowak"), [self.employee])
+        self.assertEqual(self.search(Employment, "nowak"), [self.employment])
+        self.assertEqual(self.search(Employee, "zolkiewski"), [])
+
+    def test_unrelated_fields_saved(self):
+        with self.assertNumQueries(1):
+            self.user.save(update_fields=["last_login"])
+
+    def test_units_hierarchy(self):
+        self.assertEqual(self.search(Department, "lodzka optyki"), [self.department])
+
+        self.university.name = "Uniwersytet"
+        self.university.save()
+
+        self.assertEqual(self.search(Department, "uniwersytet"), [self.department])
+        self.assertEqual(self.search(Department, "lodzka"), [])
+
+    def test_related_object_deleted(self):
+        self.position.delete()
+
+        self.assertEqual(self.search(Employment, "profesor"), [])
+        self.assertEqual(self.search(Employment, "lukasz"), [self.employment])
+
+    def test_object_deleted(self):
+        self.employee.delete()
+
+        self.assertFalse(
+            SearchToken.objects.filter(object_id=self.employee.pk, token="lukasz")
+            .exclude(content_type__model="user")
+            .exists()
+        )
+
+    def test_many_to_many_changed(self):
+        self.position.subgroup_set.add(self.subgroup)
+        self.assertEqual(self.search(Position, "badawcza"), [self.position])
+
+        self.subgroup.position_set.clear()
+        self.assertEqual(self.search(Position, "badawcza"), [])
+
+    def test_rebuild_command(self):
+        SearchToken.objects.all().delete()
+        SearchIndexBuild.objects.all().delete()
+
+        # The search fields are matched until the index is built, even if some
+        # objects are indexed meanwhile
+        other_employee = Employee.objects.create(
+            user=User.objects.create_user("anowak", last_name="Nowak")
+        )
+        self.assertEqual(self.search(Employee, "ółkiew"), [self.employee])
+        self.assertEqual(self.search(Employee, "lukasz"), [])
+        self.assertEqual(self.search(Employee, "nowa"), [other_employee])
+
+        call_command("rebuild_search_index", stdout=StringIO())
+
+        self.assertEqual(self.search(Employee, "lukasz"), [self.employee])
+
+
+@tag(BENCHMARK_TAG)
+class SearchBenchmarkTests(TestCase):
+    """
+    Benchmark of the search of the employees by the search index.
+
+    Run by `manage.py test --tag benchmark` only.
+    """
+
+    EMPLOYEES_COUNT = 100_000
+    FIRST_NAMES = ("Łukasz", "Anna", "Paweł", "Małgorzata", "Jan", "Żaneta")
+    LAST_NAMES = (
+        "Nowak",
+        "Kowalski",
+        "Wiśniewski",
+        "Wójcik",
+        "Kamiński",
+        "Lewandowski",
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create(
+            [
+                User(
+                    username=f"user{i}",
+                    first_name=cls.FIRST_NAMES[i % len(cls.FIRST_NAMES)],
+                    last_name=(
+                        f"{cls.LAST_NAMES[i % len(cls.LAST_NAMES)]}"
+                        f"{'' if i % 1000 else '-Żółkiewski'}"
+                    ),
+                )
+                for i in range(cls.EMPLOYEES_COUNT)
+            ],
+            batch_size=2000,
+        )
+        Employee.objects.bulk_create(
+            [Employee(user_id=pk) for pk in User.objects.values_list("pk", flat=True)],
+            batch_size=2000,
+        )
+        index.get_index(Employee).rebuild()
+
+    def measure(self, function, repeat=5):
+        durations = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = function()
+            durations.append(time.perf_counter() - start)
+        return min(durations), result
+
+    def test_search(self):
+        model_admin = admin.site._registry[Employee]
+        request = RequestFactory().get("/")
+        queryset = Employee.objects.all()
+
+        def search_by_index():
+            results, _ = model_admin.get_search_results(request, queryset, "zolk")
+            return results.count()
+
+        def search_by_fields():
+            results, _ = super(SearchIndexMixin, model_admin).get_search_results(
+                request, queryset, "Żółk"
+            )
+            return results.count()
+
+        index_time, index_count = self.measure(search_by_index)
+        fields_time, fields_count = self.measure(search_by_fields)
+
+        self.assertEqual(index_count, self.EMPLOYEES_COUNT // 1000)
+        self.assertEqual(fields_count, index_count)
+        self.assertLess(
+            index_time,
+            fields_time,
+            f"search of {self.EMPLOYEES_COUNT} employees: "
+            f"search fields {fields_time * 1000:.1f} ms, "
+            f"search index {index_time * 1000:.1f} ms",
+        )
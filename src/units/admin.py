@@ -3,13 +3,36 @@ from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 
 from project.utils import admin as admin_utils
+from search.admin import SearchIndexMixin
 
 from .forms import DepartmentAdminForm, FacultyAdminForm, UniversityAdminForm
 from .models import Department, Faculty, University
+from .tree import get_unit_tree
+
+
+class UnitTreeMixin:
+    """
+    A class to represent the mixin resolving the tree of the units once per list.
+
+    The children of the units listed are attached to them (see `get_children`),
+    so the columns do not look the tree up row by row.
+    """
+
+    def get_changelist_instance(self, request):
+        changelist = super().get_changelist_instance(request)
+        unit_tree = get_unit_tree()
+        for unit in changelist.result_list:
+            unit._children = unit_tree.get_children(unit)
+        return changelist
+
+    def get_children(self, unit):
+        if "_children" not in unit.__dict__:
+            unit._children = get_unit_tree().get_children(unit)
+        return unit._children
 
 
 @admin.register(University)
-class UniversityAdmin(admin_utils.ModelAdmin):
+class UniversityAdmin(UnitTreeMixin, SearchIndexMixin, admin_utils.ModelAdmin):
     """A class to represent admin options for the University model."""
 
     class FacultyInline(admin.TabularInline):
@@ -37,13 +60,14 @@ class UniversityAdmin(admin_utils.ModelAdmin):
             obj,
             related_model="faculty",
             content_field="name",
+            related_objects=self.get_children(obj),
         )
         if links:
             return format_html("<br>".join(links))
 
 
 @admin.register(Faculty)
-class FacultyAdmin(admin_utils.ModelAdmin):
+class FacultyAdmin(UnitTreeMixin, SearchIndexMixin, admin_utils.ModelAdmin):
     """A class to represent admin options for the Faculty model."""
 
     class DepartmentInline(admin.TabularInline):
@@ -71,6 +95,7 @@ class FacultyAdmin(admin_utils.ModelAdmin):
         admin_utils.related_object_link(University),
         "departments",
     )
+    list_select_related = ("university",)
     list_filter = ("university",)
     search_fields = (
         "name",
@@ -85,13 +110,14 @@ class FacultyAdmin(admin_utils.ModelAdmin):
             obj,
             related_model="department",
             content_field="name",
+            related_objects=self.get_children(obj),
         )
         if links:
             return format_html("<br>".join(links))
 
 
 @admin.register(Department)
-class DepartmentAdmin(admin_utils.ModelAdmin):
+class DepartmentAdmin(SearchIndexMixin, admin_utils.ModelAdmin):
     """A class to represent admin options for the Department model."""
 
     form = DepartmentAdminForm
@@ -114,6 +140,7 @@ class DepartmentAdmin(admin_utils.ModelAdmin):
         admin_utils.related_object_link(Faculty, content_field="name"),
         admin_utils.related_object_link(University, content_field="name"),
     )
+    list_select_related = ("faculty__university",)
     list_filter = (
         admin_utils.RelatedModelFilter.as_filter(
             model=Faculty,
@@ -8,3 +8,11 @@ class UnitsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "units"
     verbose_name = _("Jednostki")
+
+    def ready(self):
+        from project.utils.cache import track_model_changes
+
+        from .tree import UNIT_MODELS
+
+        for model in UNIT_MODELS:
+            track_model_changes(model)
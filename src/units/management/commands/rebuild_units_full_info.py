@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from units.models import University
+
+
+class Command(BaseCommand):
+    """A command to rebuild the materialized full names and codes of the units."""
+
+    help = "Rebuild the materialized full names and codes of all the units."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            universities = University.objects.all()
+            University.update_full_info(universities)
+            University.update_descendants_full_info(universities)
+
+        self.stdout.write(self.style.SUCCESS("Rebuilt the units full names and codes."))
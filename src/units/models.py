@@ -1,12 +1,47 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, OuterRef, Subquery, Value
+from django.db.models.functions import Concat
 from django.utils.translation import gettext_lazy as _
 
+from project.utils.cache import bump_model_version
+
+FULL_NAME_DELIMITER = ", "
+FULL_CODE_DELIMITER = " / "
+
 
 class AbstractUnit(models.Model):
-    """A class to represent AbstractUnit objects."""
+    """
+    A class to represent AbstractUnit objects.
+
+    The full name and code of the unit (i.e. the ones including the names and
+    codes of all its parents) are materialized in the `full_name` and
+    `full_code` fields, so that they can be queried and sorted by in SQL. The
+    fields are updated when the unit or any of its parents is saved; if units
+    are modified by other means (e.g. `QuerySet.update()`), rebuild the fields
+    with the `rebuild_units_full_info` command.
+
+    The versions of the data of the units (see `get_model_versions`) are bumped
+    on every save and delete, and by the bulk updates of the full info, so the
+    cached tree of the units (see `tree.get_unit_tree`) gets invalidated.
+    """
+
+    # Name of the foreign key field relating the unit to its parent unit
+    parent_field = None
 
     name = models.CharField(_("nazwa"), max_length=255)
     code = models.CharField(_("skrót"), max_length=255)
+    full_name = models.CharField(
+        _("pełna nazwa"),
+        max_length=1023,
+        blank=True,
+        editable=False,
+    )
+    full_code = models.CharField(
+        _("pełny skrót"),
+        max_length=1023,
+        blank=True,
+        editable=False,
+    )
 
     class Meta:
         abstract = True
@@ -15,6 +50,67 @@ class AbstractUnit(models.Model):
     def __str__(self):
         return self.get_full_name()
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+
+        self.full_name = self._build_full_info("name", FULL_NAME_DELIMITER)
+        self.full_code = self._build_full_info("code", FULL_CODE_DELIMITER)
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {
+                *kwargs["update_fields"],
+                "full_name",
+                "full_code",
+            }
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if not adding:
+                self.update_descendants_full_info(
+                    self._meta.model.objects.filter(pk=self.pk)
+                )
+
+    @classmethod
+    def update_full_info(cls, queryset):
+        """Update the materialized full info of the units in a single query."""
+        if cls.parent_field is None:
+            count = queryset.update(full_name=F("name"), full_code=F("code"))
+        else:
+            parent_model = cls._meta.get_field(cls.parent_field).related_model
+            parents = parent_model.objects.filter(pk=OuterRef(cls.parent_field))
+            count = queryset.update(
+                **{
+                    f"full_{field}": Concat(
+                        field,
+                        Value(delimiter),
+                        Subquery(parents.values(f"full_{field}")[:1]),
+                        output_field=models.CharField(),
+                    )
+                    for field, delimiter in (
+                        ("name", FULL_NAME_DELIMITER),
+                        ("code", FULL_CODE_DELIMITER),
+                    )
+                }
+            )
+
+        # The bulk updates do not send the signals the versions are bumped by
+        bump_model_version(cls)
+
+        return count
+
+    @classmethod
+    def update_descendants_full_info(cls, queryset):
+        """Update the materialized full info of the descendants of the units."""
+        for relation in cls._meta.related_objects:
+            child_model = relation.related_model
+            if not issubclass(child_model, AbstractUnit):
+                continue
+
+            children = child_model.objects.filter(
+                **{f"{relation.field.name}__in": queryset}
+            )
+            child_model.update_full_info(children)
+            child_model.update_descendants_full_info(children)
+
     def _get_parent(self):
         return None
 
@@ -32,10 +128,24 @@ class AbstractUnit(models.Model):
             [getattr(unit, field) for unit in [self] + self._get_parents()],
         )
 
-    def get_full_name(self, delimiter=", "):
+    def _build_full_info(self, field, delimiter):
+        parent = self._get_parent()
+        if parent is None:
+            return getattr(self, field)
+
+        parent_full_info = getattr(parent, f"full_{field}") or parent._get_full_info(
+            field, delimiter
+        )
+        return f"{getattr(self, field)}{delimiter}{parent_full_info}"
+
+    def get_full_name(self, delimiter=FULL_NAME_DELIMITER):
+        if delimiter == FULL_NAME_DELIMITER and self.full_name:
+            return self.full_name
         return self._get_full_info("name", delimiter)
 
-    def get_full_code(self, delimiter=" / "):
+    def get_full_code(self, delimiter=FULL_CODE_DELIMITER):
+        if delimiter == FULL_CODE_DELIMITER and self.full_code:
+            return self.full_code
         return self._get_full_info("code", delimiter)
 
 
@@ -50,6 +160,8 @@ class University(AbstractUnit):
 class Faculty(AbstractUnit):
     """A class to represent Faculty objects."""
 
+    parent_field = "university"
+
     university = models.ForeignKey(
         to=University,
         on_delete=models.CASCADE,
@@ -67,6 +179,8 @@ class Faculty(AbstractUnit):
 class Department(AbstractUnit):
     """A class to represent Department objects."""
 
+    parent_field = "faculty"
+
     faculty = models.ForeignKey(
         to=Faculty,
         on_delete=models.CASCADE,
@@ -0,0 +1,241 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import tree
+from .models import Department, Faculty, University
+
+
+class UnitFullInfoTests(TestCase):
+    """Tests of the materialized full names and codes of the units."""
+
+    def setUp(self):
+        self.university = University.objects.create(name="Politechnika", code="P")
+        self.faculty = Faculty.objects.create(
+            name="Wydział Fizyki",
+            code="WF",
+            university=self.university,
+        )
+        self.department = Department.objects.create(
+            name="Katedra Optyki",
+            code="KO",
+            faculty=self.faculty,
+        )
+
+    def assertFullInfo(self, unit, full_name, full_code):
+        unit.refresh_from_db()
+        self.assertEqual(unit.full_name, full_name)
+        self.assertEqual(unit.full_code, full_code)
+        self.assertEqual(unit.get_full_name(), full_name)
+        self.assertEqual(unit.get_full_code(), full_code)
+        self.assertEqual(unit._get_full_info("name", ", "), full_name)
+        self.assertEqual(unit._get_full_info("code", " / "), full_code)
+
+    def test_full_info_on_create(self):
+        self.assertFullInfo(
+            self.department,
+            "Katedra Optyki, Wydział Fizyki, Politechnika",
+            "KO / WF / P",
+        )
+
+    def test_full_info_without_queries(self):
+        department = Department.objects.get(pk=self.department.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(department.get_full_code(), "KO / WF / P")
+            self.assertEqual(department.get_full_code(delimiter=" / "), "KO / WF / P")
+
+    def test_rename_university(self):
+        self.university.code = "PW"
+        self.university.save()
+
+        self.assertFullInfo(self.faculty, "Wydział Fizyki, Politechnika", "WF / PW")
+        self.assertFullInfo(
+            self.department,
+            "Katedra Optyki, Wydział Fizyki, Politechnika",
+            "KO / WF / PW",
+        )
+
+    def test_reparent_faculty(self):
+        university = University.objects.create(name="Uniwersytet", code="U")
+        self.faculty.university = university
+        self.faculty.save()
+
+        self.assertFullInfo(
+            self.department,
+            "Katedra Optyki, Wydział Fizyki, Uniwersytet",
+            "KO / WF / U",
+        )
+
+    def test_ordering_by_full_code(self):
+        faculty = Faculty.objects.create(
+            name="Wydział A", code="A", university=self.university
+        )
+        department = Department.objects.create(
+            name="Katedra", code="KO", faculty=faculty
+        )
+
+        self.assertQuerysetEqual(
+            Department.objects.order_by("full_code"),
+            [department, self.department],
+        )
+
+    def test_rebuild_command(self):
+        University.objects.update(code="X")
+        Department.objects.update(full_name="", full_code="")
+
+        call_command("rebuild_units_full_info", stdout=StringIO())
+
+        self.assertFullInfo(
+            self.department,
+            "Katedra Optyki, Wydział Fizyki, Politechnika",
+            "KO / WF / X",
+        )
+
+
+class UnitTreeTests(TestCase):
+    """Tests of the cached tree of the units."""
+
+    def setUp(self):
+        cache.clear()
+        self.university = University.objects.create(name="Politechnika", code="P")
+        self.faculties = [
+            Faculty.objects.create(
+                name=f"Wydział {i}", code=f"W{i}", university=self.university
+            )
+            for i in range(2)
+        ]
+        self.departments = [
+            Department.objects.create(
+                name=f"Katedra {i}", code=f"K{i}", faculty=faculty
+            )
+            for i, faculty in enumerate(self.faculties)
+        ]
+
+    def test_lookups(self):
+        with self.assertNumQueries(3):
+            unit_tree = tree.get_unit_tree()
+        with self.assertNumQueries(0):
+            self.assertIs(tree.get_unit_tree(), unit_tree)
+
+        self.assertEqual(len(unit_tree), 5)
+        self.assertEqual([node.id for node in unit_tree.roots], [self.university.pk])
+        self.assertEqual(
+            [node.id for node in unit_tree.get_children(self.university)],
+            [faculty.pk for faculty in self.faculties],
+        )
+        self.assertEqual(
+            [node.id for node in unit_tree.get_ancestors(self.departments[1])],
+            [self.faculties[1].pk, self.university.pk],
+        )
+        self.assertEqual(
+            [node.id for node in unit_tree.get_descendants(self.university)],
+            [unit.pk for unit in self.faculties + self.departments],
+        )
+        for unit in [self.university, *self.faculties, *self.departments]:
+            unit.refresh_from_db()
+            self.assertEqual(unit_tree.get_full_name(unit), unit.full_name)
+            self.assertEqual(unit_tree.get_full_code(unit), unit.full_code)
+
+    def test_cached_rows(self):
+        tree.get_unit_tree()
+        tree._tree = None
+
+        with self.assertNumQueries(0):
+            unit_tree = tree.get_unit_tree()
+        self.assertEqual(len(unit_tree), 5)
+
+    def test_invalidation(self):
+        tree.get_unit_tree()
+
+        self.faculties[0].code = "WX"
+        self.faculties[0].save()
+        self.assertEqual(
+            tree.get_unit_tree().get_full_code(self.departments[0]), "K0 / WX / P"
+        )
+
+        self.faculties[1].delete()
+        unit_tree = tree.get_unit_tree()
+        self.assertEqual(len(unit_tree), 3)
+        self.assertIsNone(unit_tree.get_node(self.departments[1]))
+
+        versions = unit_tree.versions
+        Department.update_full_info(Department.objects.all())
+        self.assertNotEqual(tree.get_unit_tree().versions, versions)
+
+    def test_admin_columns(self):
+        admin = get_user_model().objects.create_superuser(
+            "admin", "admin@example.com", "pw"
+        )
+        self.client.force_login(admin)
+
+        def get_changelist(model):
+            url = reverse(f"admin:units_{model._meta.model_name}_changelist")
+            self.client.get(url)  # warm up
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+            return response, len(context.captured_queries)
+
+        response, university_queries = get_changelist(University)
+        self.assertContains(response, "Wydział 1")
+        response, faculty_queries = get_changelist(Faculty)
+        self.assertContains(response, "Katedra 1")
+
+        university = University.objects.create(name="Uniwersytet", code="U")
+        for i in range(3):
+            faculty = Faculty.objects.create(
+                name=f"Wydział {i}", code=f"W{i}", university=university
+            )
+            Department.objects.create(name="Katedra", code="K", faculty=faculty)
+
+        self.assertEqual(get_changelist(University)[1], university_queries)
+        self.assertEqual(get_changelist(Faculty)[1], faculty_queries)
+
+        # The tree is resolved once per list, not per row
+        for model in (University, Faculty):
+            with self.subTest(model=model), mock.patch(
+                "units.admin.get_unit_tree", wraps=tree.get_unit_tree
+            ) as get_unit_tree:
+                get_changelist(model)
+            self.assertEqual(get_unit_tree.call_count, 2)  # warm-up and list
+
+
+class UnitTreeApiTests(TestCase):
+    """Tests of the JSON API of the tree of the units."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_tree(self):
+        university = University.objects.create(name="Politechnika", code="P")
+        for i in range(3):
+            faculty = Faculty.objects.create(
+                name=f"Wydział {i}", code=f"W{i}", university=university
+            )
+            Department.objects.create(name="Katedra", code="K", faculty=faculty)
+
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("units:tree"))
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.client.get(reverse("units:tree")).json(), response.json()
+            )
+
+        [data] = response.json()["results"]
+        self.assertEqual(data["code"], "P")
+        self.assertEqual(len(data["faculties"]), 3)
+        self.assertEqual(
+            data["faculties"][0]["departments"][0]["full_code"], "K / W0 / P"
+        )
+        self.assertEqual(
+            self.client.get(
+                reverse("units:tree"), HTTP_IF_NONE_MATCH=response["ETag"]
+            ).status_code,
+            304,
+        )
@@ -0,0 +1,160 @@
+from project.utils.cache import get_model_versions, get_or_build, make_key
+
+from .models import (
+    FULL_CODE_DELIMITER,
+    FULL_NAME_DELIMITER,
+    Department,
+    Faculty,
+    University,
+)
+
+# Models of the units, from the root of the tree to its leaves
+
+UNIT_MODELS = (University, Faculty, Department)
+
+TREE_KEY_PREFIX = "units_tree"
+TREE_TIMEOUT = 60 * 60 * 24
+
+# Tree last built by the process (see `get_unit_tree`)
+
+_tree = None
+
+
+class UnitNode:
+    """A class to represent the unit in the tree of the units."""
+
+    __slots__ = (
+        "model",
+        "id",
+        "name",
+        "code",
+        "full_name",
+        "full_code",
+        "parent",
+        "ancestors",
+        "children",
+        "descendants",
+    )
+
+    def __init__(self, model, pk, name, code, parent=None):
+        self.model = model
+        self.id = pk
+        self.name = name
+        self.code = code
+        self.parent = parent
+        self.children = []
+        self.descendants = []
+
+        if parent is None:
+            self.full_name, self.full_code = name, code
+            self.ancestors = ()
+        else:
+            self.full_name = f"{name}{FULL_NAME_DELIMITER}{parent.full_name}"
+            self.full_code = f"{code}{FULL_CODE_DELIMITER}{parent.full_code}"
+            self.ancestors = (parent, *parent.ancestors)
+
+            parent.children.append(self)
+            for ancestor in self.ancestors:
+                ancestor.descendants.append(self)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}: {self.model._meta.label} {self.id}>"
+
+    def __str__(self):
+        return self.full_name
+
+
+class UnitTree:
+    """
+    A class to represent the tree of the units.
+
+    The tree is built from the rows of the units of all the levels (see
+    `load_rows`), and its nodes are indexed by the models and primary keys of
+    the units, so that the lookups of the children, ancestors, descendants and
+    full names and codes of the units take constant time. The nodes are
+    ordered by the primary keys within each level.
+    """
+
+    def __init__(self, rows, versions=None):
+        self.versions = versions
+        self.nodes = {}
+        self.roots = []
+
+        for model, model_rows in zip(UNIT_MODELS, rows):
+            parent_model = _get_parent_model(model)
+            for pk, name, code, *parent_pk in model_rows:
+                if parent_model is None:
+                    node = UnitNode(model, pk, name, code)
+                    self.roots.append(node)
+                else:
+                    parent = self.nodes[(parent_model, parent_pk[0])]
+                    node = UnitNode(model, pk, name, code, parent=parent)
+                self.nodes[(model, pk)] = node
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def get_node(self, unit):
+        """Return the node of the unit (None if the unit is not in the tree)."""
+        return self.nodes.get((unit._meta.model, unit.pk))
+
+    def get_children(self, unit):
+        node = self.get_node(unit)
+        return node.children if node is not None else []
+
+    def get_ancestors(self, unit):
+        node = self.get_node(unit)
+        return node.ancestors if node is not None else ()
+
+    def get_descendants(self, unit):
+        node = self.get_node(unit)
+        return node.descendants if node is not None else []
+
+    def get_full_name(self, unit):
+        node = self.get_node(unit)
+        return node.full_name if node is not None else None
+
+    def get_full_code(self, unit):
+        node = self.get_node(unit)
+        return node.full_code if node is not None else None
+
+
+def _get_parent_model(model):
+    if model.parent_field is None:
+        return None
+    return model._meta.get_field(model.parent_field).related_model
+
+
+def load_rows():
+    """Return the rows of the units of all the levels, loaded by one query each."""
+    return tuple(
+        tuple(
+            model.objects.order_by("id").values_list(
+                "id",
+                "name",
+                "code",
+                *([model.parent_field] if model.parent_field else []),
+            )
+        )
+        for model in UNIT_MODELS
+    )
+
+
+def get_unit_tree():
+    """
+    Return the tree of the units.
+
+    The rows the tree is built from are cached per versions of the data of the
+    unit models (see `get_model_versions`), so any save or delete of the unit
+    invalidates them, and the tree built last is reused by the process until
+    the versions change.
+    """
+    global _tree
+
+    versions = get_model_versions(*UNIT_MODELS)
+    if _tree is not None and _tree.versions == versions:
+        return _tree
+
+    rows = get_or_build(make_key(TREE_KEY_PREFIX, *versions), load_rows, TREE_TIMEOUT)
+    _tree = UnitTree(rows, versions=versions)
+    return _tree
@@ -0,0 +1,55 @@
+from project.utils import api
+
+from .models import Department, Faculty, University
+from .tree import UNIT_MODELS, get_unit_tree
+
+# The units are serialized from the nodes of the cached tree (see `get_unit_tree`)
+
+DEPARTMENT_SERIALIZER = api.Serializer(
+    Department,
+    {
+        "id": api.Field(),
+        "name": api.Field(),
+        "code": api.Field(),
+        "full_code": api.Field(),
+    },
+)
+
+FACULTY_SERIALIZER = api.Serializer(
+    Faculty,
+    {
+        "id": api.Field(),
+        "name": api.Field(),
+        "code": api.Field(),
+        "departments": api.Field(
+            "children",
+            serializer=DEPARTMENT_SERIALIZER,
+            many=True,
+        ),
+    },
+)
+
+UNIVERSITY_SERIALIZER = api.Serializer(
+    University,
+    {
+        "id": api.Field(),
+        "name": api.Field(),
+        "code": api.Field(),
+        "faculties": api.Field(
+            "children",
+            serializer=FACULTY_SERIALIZER,
+            many=True,
+        ),
+    },
+)
+
+
+class UnitTreeView(api.ApiListView):
+    """A view to return the tree of the units as JSON data."""
+
+    serializer = UNIVERSITY_SERIALIZER
+    dependencies = UNIT_MODELS
+    staff_required = False  # the structure of the units is public
+
+    def get_objects(self, names, after, limit):
+        return [node for node in get_unit_tree().roots if node.id > after][:limit]